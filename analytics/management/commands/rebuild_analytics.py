@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from analytics.models import DailyRevenue, ProductSales
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily revenue and product sales rollups from the orders tables."
+    )
+
+    def handle(self, *args, **options) -> None:
+        revenue_count = DailyRevenue.objects.rebuild()
+        self.stdout.write(f"Rebuilt {revenue_count} daily revenue rows.")
+
+        sales_count = ProductSales.objects.rebuild()
+        self.stdout.write(f"Rebuilt {sales_count} product sales counters.")
+
+        self.stdout.write(self.style.SUCCESS("Analytics rollups rebuilt."))
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:54
+
+import uuid
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_daily_revenue(apps, schema_editor):
+    """Backfill the rollup from existing orders."""
+    Order = apps.get_model("orders", "Order")
+    DailyRevenue = apps.get_model("analytics", "DailyRevenue")
+
+    rows = (
+        Order.objects.annotate(date=TruncDate("created_at"))
+        .values("date", "status")
+        .annotate(total=Sum("total_price"), order_count=Count("id"))
+        .order_by()
+    )
+    DailyRevenue.objects.bulk_create(
+        (DailyRevenue(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("orders", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, null=True)),
+                ("date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "PENDING"),
+                            ("COMPLETED", "COMPLETED"),
+                            ("CANCELLED", "CANCELLED"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("order_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Daily Revenue",
+                "verbose_name_plural": "Daily Revenue",
+                "ordering": ("-date",),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "status"), name="unique_daily_revenue"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_daily_revenue, migrations.RunPython.noop),
+    ]
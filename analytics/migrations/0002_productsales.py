@@ -0,0 +1,116 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:56
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def build_product_sales(apps, schema_editor):
+    """Backfill sales counters and daily buckets from existing order items."""
+    OrderItem = apps.get_model("orders", "OrderItem")
+    ProductSales = apps.get_model("analytics", "ProductSales")
+    DailyProductSales = apps.get_model("analytics", "DailyProductSales")
+
+    totals = (
+        OrderItem.objects.values("product_id")
+        .annotate(total_sold=Sum("quantity"))
+        .order_by()
+    )
+    ProductSales.objects.bulk_create(
+        (ProductSales(**row) for row in totals.iterator()), batch_size=1000
+    )
+
+    buckets = (
+        OrderItem.objects.annotate(date=TruncDate("created_at"))
+        .values("product_id", "date")
+        .annotate(quantity=Sum("quantity"))
+        .order_by()
+    )
+    DailyProductSales.objects.bulk_create(
+        (DailyProductSales(**row) for row in buckets.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0001_initial"),
+        ("products", "0006_categoryclosure"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSales",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, null=True)),
+                ("total_sold", models.IntegerField(db_index=True, default=0)),
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Product Sales",
+                "verbose_name_plural": "Product Sales",
+                "ordering": ("-total_sold",),
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, null=True)),
+                ("date", models.DateField()),
+                ("quantity", models.IntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Product Sales",
+                "verbose_name_plural": "Daily Product Sales",
+                "ordering": ("-date",),
+                "indexes": [
+                    models.Index(
+                        fields=["date", "product"], name="analytics_d_date_1c5927_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "date"), name="unique_daily_product_sales"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_product_sales, migrations.RunPython.noop),
+    ]
@@ -1 +1,485 @@
-# Create your models here.
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Coalesce, Rank, Round, Trunc, TruncDate
+from django.utils.timezone import localdate, localtime, make_aware
+
+from commons.cache import get_cache_version
+from commons.constants import (
+    SUPPLIER_PAYOUTS_CACHE_NAMESPACE,
+    SUPPLIER_PAYOUTS_CACHE_TIMEOUT,
+    SUPPLIER_SHARE,
+    OrderStatus,
+    RevenueInterval,
+)
+from commons.models import Base
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+def start_of_day(day: date) -> datetime:
+    """Timezone-aware midnight at the start of `day`."""
+    return make_aware(datetime.combine(day, time.min))
+
+
+def day_range(
+    start_date: date | None, end_date: date | None
+) -> tuple[datetime | None, datetime | None]:
+    """Bounds of the half-open range [start, end) covering both dates."""
+    start = start_of_day(start_date) if start_date else None
+    end = start_of_day(end_date + timedelta(days=1)) if end_date else None
+    return start, end
+
+
+def month_range(month: date) -> tuple[datetime, datetime]:
+    """Bounds of the half-open range [start, end) covering the month of `month`."""
+    first_day = month.replace(day=1)
+    next_month = (first_day + timedelta(days=32)).replace(day=1)
+    return start_of_day(first_day), start_of_day(next_month)
+
+
+def supplier_payouts(start: datetime, end: datetime) -> list[dict]:
+    """
+    Revenue and payout (SUPPLIER_SHARE of the revenue) per supplier from
+    the items of COMPLETED orders created in [start, end), computed in one
+    aggregate query. Item revenue is net of the order's discount; sums are
+    exact numerics rounded half up to cents once, per supplier.
+    """
+    item_revenue = models.ExpressionWrapper(
+        F("price")
+        * F("quantity")
+        * (1 - Coalesce(F("order__discount_applied"), Decimal("0")) / 100),
+        output_field=models.DecimalField(),
+    )
+    return list(
+        OrderItem.objects.filter(
+            order__status=OrderStatus.COMPLETED.value,
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+            product__supplier__isnull=False,
+        )
+        .values(
+            supplier_id=F("product__supplier_id"),
+            supplier_name=F("product__supplier__name"),
+            supplier_email=F("product__supplier__email"),
+        )
+        .annotate(
+            units_sold=Sum("quantity"),
+            revenue=Round(Sum(item_revenue), 2),
+            payout=Round(Sum(item_revenue) * SUPPLIER_SHARE, 2),
+        )
+        .order_by("supplier_name", "supplier_id")
+    )
+
+
+def monthly_supplier_payouts(month: date) -> list[dict]:
+    """
+    supplier_payouts() of the month of `month`. Months that have ended are
+    cached; the cache is dropped when one of their orders changes.
+    """
+    start, end = month_range(month)
+    if end > start_of_day(localdate()):
+        return supplier_payouts(start, end)
+
+    version = get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+    key = f"supplier-payouts:{version}:{start:%Y-%m}"
+    payouts = cache.get(key)
+    if payouts is None:
+        payouts = supplier_payouts(start, end)
+        cache.set(key, payouts, timeout=SUPPLIER_PAYOUTS_CACHE_TIMEOUT)
+    return payouts
+
+
+def revenue_buckets(
+    start_date: date, end_date: date, interval: str
+) -> Iterator[date | datetime]:
+    """
+    Start of every `interval` bucket covering start_date to end_date
+    (inclusive), in order: aware datetimes in TIME_ZONE for hours and
+    dates for days, weeks (from Monday) and months.
+    """
+    if interval == RevenueInterval.HOUR.value:
+        start, end = day_range(start_date, end_date)
+        # Step in UTC so hours repeated or skipped by DST are counted once
+        bucket = start.astimezone(timezone.utc)
+        while bucket < end:
+            yield localtime(bucket)
+            bucket += timedelta(hours=1)
+        return
+
+    if interval == RevenueInterval.WEEK.value:
+        bucket = start_date - timedelta(days=start_date.weekday())
+    elif interval == RevenueInterval.MONTH.value:
+        bucket = start_date.replace(day=1)
+    else:
+        bucket = start_date
+
+    while bucket <= end_date:
+        yield bucket
+        if interval == RevenueInterval.WEEK.value:
+            bucket += timedelta(days=7)
+        elif interval == RevenueInterval.MONTH.value:
+            bucket = (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            bucket += timedelta(days=1)
+
+
+def count_revenue_buckets(start_date: date, end_date: date, interval: str) -> int:
+    """Number of buckets revenue_buckets() yields, without generating them."""
+    if interval == RevenueInterval.HOUR.value:
+        start, end = day_range(start_date, end_date)
+        return int((end - start).total_seconds()) // 3600
+    if interval == RevenueInterval.WEEK.value:
+        first_monday = start_date - timedelta(days=start_date.weekday())
+        return (end_date - first_monday).days // 7 + 1
+    if interval == RevenueInterval.MONTH.value:
+        months = (end_date.year - start_date.year) * 12
+        return months + end_date.month - start_date.month + 1
+    return (end_date - start_date).days + 1
+
+
+class DailyRevenueManager(models.Manager):
+    def record(
+        self,
+        created_at: datetime,
+        status: str,
+        amount: Decimal,
+        order_count: int = 1,
+    ) -> None:
+        """
+        Add `amount` and `order_count` to the rollup row of the day
+        `created_at` falls on. Pass negative values to subtract.
+        """
+        amount = Decimal(amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        rollup, _ = self.get_or_create(date=localdate(created_at), status=status)
+        self.filter(pk=rollup.pk).update(
+            total=F("total") + amount, order_count=F("order_count") + order_count
+        )
+
+    def rebuild(self, dates: list[date] | None = None) -> int:
+        """
+        Recompute rollup rows from the orders table, e.g. after writes
+        that bypass model signals such as QuerySet.update().
+        Only the given `dates` are recomputed when passed.
+        """
+        orders = Order.objects.all()
+        rollup = self.all()
+        if dates is not None:
+            orders = orders.filter(created_at__date__in=dates)
+            rollup = rollup.filter(date__in=dates)
+
+        rows = (
+            orders.annotate(date=TruncDate("created_at"))
+            .values("date", "status")
+            .annotate(total=Sum("total_price"), order_count=Count("id"))
+            .order_by()
+        )
+        with transaction.atomic():
+            rollup.delete()
+            created = self.bulk_create(
+                (DailyRevenue(**row) for row in rows.iterator()), batch_size=1000
+            )
+        return len(created)
+
+    def total_revenue(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        status: str = OrderStatus.COMPLETED.value,
+    ) -> Decimal:
+        """
+        Sum of order totals created in [start, end).
+
+        Whole days are read from the rollup; only the partial days at
+        either edge of the range are summed from the orders table.
+        """
+        total = Decimal("0.00")
+        for queryset, field in self._revenue_sources(start, end, status):
+            total += queryset.aggregate(total=Sum(field))["total"] or 0
+        return total
+
+    async def atotal_revenue(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        status: str = OrderStatus.COMPLETED.value,
+    ) -> Decimal:
+        """Async version of total_revenue()."""
+        total = Decimal("0.00")
+        for queryset, field in self._revenue_sources(start, end, status):
+            total += (await queryset.aaggregate(total=Sum(field)))["total"] or 0
+        return total
+
+    def revenue_series(
+        self,
+        start_date: date,
+        end_date: date,
+        interval: str,
+        status: str = OrderStatus.COMPLETED.value,
+    ) -> models.QuerySet:
+        """
+        `total` and `order_count` per `interval` bucket between the dates
+        (inclusive), ordered by `bucket` as in revenue_buckets(). Buckets
+        without orders are left out. Hours are grouped from the orders
+        table, longer buckets from the daily rollup.
+        """
+        if interval == RevenueInterval.HOUR.value:
+            start, end = day_range(start_date, end_date)
+            return (
+                Order.objects.filter(
+                    status=status, created_at__gte=start, created_at__lt=end
+                )
+                .annotate(bucket=Trunc("created_at", interval))
+                .values("bucket")
+                .annotate(total=Sum("total_price"), order_count=Count("id"))
+                .order_by("bucket")
+            )
+
+        return (
+            self.filter(status=status, date__gte=start_date, date__lte=end_date)
+            .annotate(bucket=Trunc("date", interval, output_field=models.DateField()))
+            .values("bucket")
+            .annotate(total=Sum("total"), order_count=Sum("order_count"))
+            .order_by("bucket")
+        )
+
+    def _revenue_sources(
+        self, start: datetime | None, end: datetime | None, status: str
+    ) -> list[tuple[models.QuerySet, str]]:
+        """Querysets, and the field to sum of each, that make up total_revenue()."""
+        orders = Order.objects.filter(status=status)
+
+        if start and end and localdate(start) == localdate(end):
+            return [
+                (
+                    orders.filter(created_at__gte=start, created_at__lt=end),
+                    "total_price",
+                )
+            ]
+
+        rollup = self.filter(status=status)
+        partial_days = Q(pk__in=[])
+        if start:
+            first_day = localdate(start)
+            if start > start_of_day(first_day):
+                first_day += timedelta(days=1)
+                partial_days |= Q(
+                    created_at__gte=start, created_at__lt=start_of_day(first_day)
+                )
+            rollup = rollup.filter(date__gte=first_day)
+        if end:
+            last_day = localdate(end)
+            if end > start_of_day(last_day):
+                partial_days |= Q(
+                    created_at__gte=start_of_day(last_day), created_at__lt=end
+                )
+            rollup = rollup.filter(date__lt=last_day)
+
+        sources = [(rollup, "total")]
+        if start or end:
+            sources.append((orders.filter(partial_days), "total_price"))
+        return sources
+
+
+class DailyRevenue(Base):
+    """Order totals and counts per day (in TIME_ZONE) and order status."""
+
+    date = models.DateField()
+    status = models.CharField(
+        max_length=10,
+        choices=[(status.value, status.value) for status in OrderStatus],
+    )
+    total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    order_count = models.IntegerField(default=0)
+
+    objects = DailyRevenueManager()
+
+    class Meta:
+        verbose_name = "Daily Revenue"
+        verbose_name_plural = "Daily Revenue"
+        ordering = ("-date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "status"], name="unique_daily_revenue"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.status}: {self.total}"
+
+
+class ProductSalesManager(models.Manager):
+    def record(self, product_id, created_at: datetime, quantity: int) -> None:
+        """
+        Add `quantity` to the product's all-time counter and to the
+        daily bucket of `created_at`. Pass a negative value to subtract.
+        """
+        date = localdate(created_at)
+        with transaction.atomic():
+            # Rows only need creating when adding sales; subtracting never
+            # inserts, so cascading product deletes do not recreate them
+            if quantity > 0:
+                self.get_or_create(product_id=product_id)
+                DailyProductSales.objects.get_or_create(
+                    product_id=product_id, date=date
+                )
+
+            self.filter(product_id=product_id).update(
+                total_sold=F("total_sold") + quantity
+            )
+            DailyProductSales.objects.filter(product_id=product_id, date=date).update(
+                quantity=F("quantity") + quantity
+            )
+
+    def rebuild(self) -> int:
+        """Recompute every counter and daily bucket from the order items table."""
+        totals = (
+            OrderItem.objects.values("product_id")
+            .annotate(total_sold=Sum("quantity"))
+            .order_by()
+        )
+        buckets = (
+            OrderItem.objects.annotate(date=TruncDate("created_at"))
+            .values("product_id", "date")
+            .annotate(quantity=Sum("quantity"))
+            .order_by()
+        )
+        with transaction.atomic():
+            self.all().delete()
+            DailyProductSales.objects.all().delete()
+            created = self.bulk_create(
+                (ProductSales(**row) for row in totals.iterator()), batch_size=1000
+            )
+            DailyProductSales.objects.bulk_create(
+                (DailyProductSales(**row) for row in buckets.iterator()),
+                batch_size=1000,
+            )
+        return len(created)
+
+    def best_selling(self, limit: int, days: int | None = None) -> list[Product]:
+        """
+        Top `limit` products by quantity sold, annotated with `total_sold`.
+        With `days`, only sales from the last `days` days (including today)
+        are counted, summed from the daily buckets.
+        """
+        if days is None:
+            return list(self._all_time_best_selling(limit))
+
+        totals = list(self._recent_best_selling(limit, days))
+        products = Product.objects.in_bulk([product_id for product_id, _ in totals])
+        return self._annotate_total_sold(products, totals)
+
+    async def abest_selling(self, limit: int, days: int | None = None) -> list[Product]:
+        """Async version of best_selling()."""
+        if days is None:
+            return [product async for product in self._all_time_best_selling(limit)]
+
+        totals = [row async for row in self._recent_best_selling(limit, days)]
+        products = await Product.objects.ain_bulk(
+            [product_id for product_id, _ in totals]
+        )
+        return self._annotate_total_sold(products, totals)
+
+    def top_products(
+        self,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[Product]:
+        """
+        Products ranked by quantity sold between the dates (inclusive),
+        annotated with `total_sold` and `rank` from the daily buckets in
+        one query. Products tied with the last of the top `limit` are kept.
+        """
+        # One filter() call, so both bounds apply to the same join
+        dates = Q()
+        if start_date:
+            dates &= Q(daily_sales__date__gte=start_date)
+        if end_date:
+            dates &= Q(daily_sales__date__lte=end_date)
+
+        total_sold = Sum("daily_sales__quantity")
+        return list(
+            Product.objects.filter(dates)
+            .annotate(
+                total_sold=total_sold,
+                rank=Window(Rank(), order_by=total_sold.desc()),
+            )
+            .filter(total_sold__gt=0, rank__lte=limit)
+            .order_by("rank", "name")
+            .only("id", "name")
+        )
+
+    @staticmethod
+    def _all_time_best_selling(limit: int) -> models.QuerySet:
+        return (
+            Product.objects.filter(sales__total_sold__gt=0)
+            .annotate(total_sold=F("sales__total_sold"))
+            .order_by("-total_sold")[:limit]
+        )
+
+    @staticmethod
+    def _recent_best_selling(limit: int, days: int) -> models.QuerySet:
+        since = localdate() - timedelta(days=days - 1)
+        return (
+            DailyProductSales.objects.filter(date__gte=since)
+            .values_list("product_id")
+            .annotate(total_sold=Sum("quantity"))
+            .filter(total_sold__gt=0)
+            .order_by("-total_sold")[:limit]
+        )
+
+    @staticmethod
+    def _annotate_total_sold(products: dict, totals: list[tuple]) -> list[Product]:
+        for product_id, total_sold in totals:
+            products[product_id].total_sold = total_sold
+        return [products[product_id] for product_id, _ in totals]
+
+
+class ProductSales(Base):
+    """All-time quantity sold per product."""
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, related_name="sales"
+    )
+    total_sold = models.IntegerField(default=0, db_index=True)
+
+    objects = ProductSalesManager()
+
+    class Meta:
+        verbose_name = "Product Sales"
+        verbose_name_plural = "Product Sales"
+        ordering = ("-total_sold",)
+
+    def __str__(self) -> str:
+        return f"{self.product}: {self.total_sold}"
+
+
+class DailyProductSales(Base):
+    """Quantity sold per product per day (in TIME_ZONE)."""
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    date = models.DateField()
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Product Sales"
+        verbose_name_plural = "Daily Product Sales"
+        ordering = ("-date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "date"], name="unique_daily_product_sales"
+            )
+        ]
+        indexes = [models.Index(fields=["date", "product"])]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.product}: {self.quantity}"
@@ -1,15 +1,20 @@
 from django.urls import path
 
+from analytics.views.dashboard import DashboardView
 from analytics.views.products import BestSellingProductsView
-from analytics.views.revenue import TotalRevenueView
+from analytics.views.revenue import RevenueSeriesView, TotalRevenueView
+from analytics.views.suppliers import SupplierPayoutsView
 
 app_name = "analytics"
 
 urlpatterns = [
     path("revenue/", TotalRevenueView.as_view(), name="total-revenue"),
+    path("revenue/series/", RevenueSeriesView.as_view(), name="revenue-series"),
     path(
         "best-selling-products/",
         BestSellingProductsView.as_view(),
         name="best-selling-products",
     ),
+    path("dashboard/", DashboardView.as_view(), name="dashboard"),
+    path("supplier-payouts/", SupplierPayoutsView.as_view(), name="supplier-payouts"),
 ]
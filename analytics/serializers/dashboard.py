@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from analytics.serializers.products import BestSellingProductSerializer
+from analytics.serializers.revenue import TotalRevenueInputSerializer
+
+
+class DashboardInputSerializer(TotalRevenueInputSerializer):
+    limit = serializers.IntegerField(required=False, min_value=0)
+
+
+class DashboardProductSerializer(BestSellingProductSerializer):
+    rank = serializers.IntegerField()
+
+    class Meta(BestSellingProductSerializer.Meta):
+        fields = BestSellingProductSerializer.Meta.fields + ["rank"]
+
+
+class DashboardSerializer(serializers.Serializer):
+    total_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_order_value = serializers.DecimalField(
+        max_digits=10, decimal_places=2, allow_null=True
+    )
+    order_counts = serializers.DictField(child=serializers.IntegerField())
+    revenue_by_membership = serializers.DictField(
+        child=serializers.DecimalField(max_digits=14, decimal_places=2)
+    )
+    best_selling_products = DashboardProductSerializer(many=True)
@@ -13,3 +13,4 @@ class BestSellingProductSerializer(serializers.ModelSerializer):
 
 class BestSellingProductInputSerializer(serializers.Serializer):
     limit = serializers.IntegerField(required=False, min_value=0)
+    days = serializers.IntegerField(required=False, min_value=1)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from analytics.models import count_revenue_buckets
+from commons.constants import REVENUE_SERIES_MAX_BUCKETS, RevenueInterval
 from commons.errors import ErrorCodes
 
 
@@ -23,3 +25,38 @@ class TotalRevenueInputSerializer(serializers.Serializer):
                 ErrorCodes.START_DATE_IS_GREATER_THAN_END_DATE
             )
         return attrs
+
+
+class RevenueSeriesInputSerializer(TotalRevenueInputSerializer):
+    start_date = serializers.DateField(format="%Y-%m-%d", input_formats=["%Y-%m-%d"])
+    end_date = serializers.DateField(format="%Y-%m-%d", input_formats=["%Y-%m-%d"])
+    interval = serializers.ChoiceField(
+        choices=[interval.value for interval in RevenueInterval],
+        default=RevenueInterval.DAY.value,
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        interval = attrs["interval"]
+        try:
+            buckets = count_revenue_buckets(
+                attrs["start_date"], attrs["end_date"], interval
+            )
+        except OverflowError:
+            # Ranges ending on the last representable day
+            buckets = None
+        if buckets is None or buckets > REVENUE_SERIES_MAX_BUCKETS[interval]:
+            raise serializers.ValidationError(ErrorCodes.TOO_MANY_REVENUE_BUCKETS)
+        return attrs
+
+
+class RevenueBucketSerializer(serializers.Serializer):
+    bucket = serializers.SerializerMethodField()
+    total_revenue = serializers.DecimalField(
+        max_digits=14, decimal_places=2, source="total"
+    )
+    order_count = serializers.IntegerField()
+
+    def get_bucket(self, row: dict) -> str:
+        """Start of the bucket: a date, or a datetime in TIME_ZONE for hours."""
+        return row["bucket"].isoformat()
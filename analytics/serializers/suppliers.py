@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+
+class SupplierPayoutInputSerializer(serializers.Serializer):
+    month = serializers.DateField(
+        required=False, format="%Y-%m", input_formats=["%Y-%m"]
+    )
+
+
+class SupplierPayoutSerializer(serializers.Serializer):
+    supplier_id = serializers.UUIDField()
+    supplier_name = serializers.CharField()
+    supplier_email = serializers.EmailField()
+    units_sold = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    payout = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SupplierPayoutsSerializer(serializers.Serializer):
+    month = serializers.DateField(format="%Y-%m")
+    share = serializers.DecimalField(max_digits=3, decimal_places=2)
+    total_payout = serializers.DecimalField(max_digits=14, decimal_places=2)
+    suppliers = SupplierPayoutSerializer(many=True)
@@ -0,0 +1,210 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.timezone import localdate
+
+from analytics.models import DailyRevenue, ProductSales, month_range, start_of_day
+from commons.cache import invalidate_cache
+from commons.constants import (
+    BEST_SELLING_PRODUCTS_CACHE_NAMESPACE,
+    REVENUE_CACHE_NAMESPACE,
+    SUPPLIER_PAYOUTS_CACHE_NAMESPACE,
+)
+from orders.models import Order, OrderItem
+from orders.signals import (
+    order_items_bulk_created,
+    order_totals_changed,
+    orders_bulk_created,
+    orders_bulk_updated,
+)
+from products.models import Product
+
+
+def invalidate_closed_supplier_payouts(*created_ats) -> None:
+    """Drop cached payouts when orders created before this month change."""
+    start_of_month, _ = month_range(localdate())
+    if any(created_at < start_of_month for created_at in created_ats):
+        invalidate_cache(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_revenue(sender, instance: Order, **kwargs) -> None:
+    """Keep the stored day, status and total so post_save can apply a delta."""
+    instance._previous_revenue = (
+        None
+        if instance._state.adding
+        else Order.objects.filter(pk=instance.pk)
+        .values_list("created_at", "status", "total_price")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Order)
+def update_daily_revenue(sender, instance: Order, **kwargs) -> None:
+    previous = getattr(instance, "_previous_revenue", None)
+    current = (instance.created_at, instance.status, instance.total_price)
+    if previous == current:
+        return
+
+    if previous:
+        created_at, status, total_price = previous
+        DailyRevenue.objects.record(created_at, status, -total_price, order_count=-1)
+        invalidate_closed_supplier_payouts(created_at)
+    DailyRevenue.objects.record(*current)
+    invalidate_cache(REVENUE_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(instance.created_at)
+
+
+@receiver(post_delete, sender=Order)
+def remove_daily_revenue(sender, instance: Order, **kwargs) -> None:
+    DailyRevenue.objects.record(
+        instance.created_at, instance.status, -instance.total_price, order_count=-1
+    )
+    invalidate_cache(REVENUE_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(instance.created_at)
+
+
+@receiver(orders_bulk_created, sender=Order)
+def add_bulk_daily_revenue(sender, orders: list[Order], **kwargs) -> None:
+    # Group by day and status so each rollup row is written once
+    totals: dict[tuple, list] = defaultdict(lambda: [Decimal("0.00"), 0])
+    for order in orders:
+        key = (localdate(order.created_at), order.status)
+        totals[key][0] += order.total_price
+        totals[key][1] += 1
+
+    # Rows are written in a fixed order so concurrent batches cannot deadlock
+    for (day, status), (total, order_count) in sorted(totals.items()):
+        DailyRevenue.objects.record(
+            start_of_day(day), status, total, order_count=order_count
+        )
+    invalidate_cache(REVENUE_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(*(order.created_at for order in orders))
+
+
+@receiver(orders_bulk_updated, sender=Order)
+def refresh_bulk_daily_revenue(sender, order_ids: list, **kwargs) -> None:
+    dates = list(Order.objects.filter(pk__in=order_ids).dates("created_at", "day"))
+    DailyRevenue.objects.rebuild(dates)
+    invalidate_cache(REVENUE_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(*map(start_of_day, dates))
+
+
+@receiver(order_totals_changed, sender=Order)
+def apply_bulk_total_changes(sender, changes: list[tuple], **kwargs) -> None:
+    # Group by day and status so each rollup row is written once
+    amounts: dict[tuple, Decimal] = defaultdict(Decimal)
+    for created_at, status, amount in changes:
+        amounts[(localdate(created_at), status)] += amount
+
+    # Rows are written in a fixed order so concurrent batches cannot deadlock
+    changed = sorted((key, amount) for key, amount in amounts.items() if amount)
+    for (day, status), amount in changed:
+        DailyRevenue.objects.record(start_of_day(day), status, amount, order_count=0)
+    if changed:
+        invalidate_cache(REVENUE_CACHE_NAMESPACE)
+        invalidate_closed_supplier_payouts(
+            *(start_of_day(day) for (day, _), _ in changed)
+        )
+
+
+def order_created_ats(order_items: list[OrderItem]) -> list[datetime]:
+    """
+    created_at of the orders of `order_items`, which supplier payouts are
+    grouped by. Orders already loaded on the items are not read again.
+    """
+    created_ats = {
+        item.order_id: item.order.created_at
+        for item in order_items
+        if OrderItem.order.is_cached(item)
+    }
+    missing = {item.order_id for item in order_items} - created_ats.keys()
+    if missing:
+        created_ats.update(
+            Order.objects.filter(pk__in=missing).values_list("pk", "created_at")
+        )
+    return list(created_ats.values())
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_previous_sales(sender, instance: OrderItem, **kwargs) -> None:
+    """
+    Keep the stored product and quantity so post_save can apply a delta,
+    and the stored price and order (with its created_at, in the same query)
+    so it can drop the payouts of the month the item was counted in.
+    """
+    row = (
+        None
+        if instance._state.adding
+        else OrderItem.objects.filter(pk=instance.pk)
+        .values_list(
+            "product_id",
+            "created_at",
+            "quantity",
+            "price",
+            "order_id",
+            "order__created_at",
+        )
+        .first()
+    )
+    instance._previous_sales = row[:3] if row else None
+    instance._previous_order = row[3:] if row else None
+
+
+@receiver(post_save, sender=OrderItem)
+def update_product_sales(sender, instance: OrderItem, **kwargs) -> None:
+    previous = getattr(instance, "_previous_sales", None)
+    current = (instance.product_id, instance.created_at, instance.quantity)
+    if previous != current:
+        if previous:
+            product_id, created_at, quantity = previous
+            ProductSales.objects.record(product_id, created_at, -quantity)
+        ProductSales.objects.record(*current)
+        invalidate_cache(BEST_SELLING_PRODUCTS_CACHE_NAMESPACE)
+
+    previous_order = getattr(instance, "_previous_order", None)
+    if not previous_order:
+        invalidate_closed_supplier_payouts(*order_created_ats([instance]))
+    elif previous != current or previous_order[:2] != (
+        instance.price,
+        instance.order_id,
+    ):
+        price, order_id, order_created_at = previous_order
+        invalidate_closed_supplier_payouts(order_created_at)
+        if order_id != instance.order_id:
+            invalidate_closed_supplier_payouts(*order_created_ats([instance]))
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_product_sales(sender, instance: OrderItem, **kwargs) -> None:
+    ProductSales.objects.record(
+        instance.product_id, instance.created_at, -instance.quantity
+    )
+    invalidate_cache(BEST_SELLING_PRODUCTS_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(*order_created_ats([instance]))
+
+
+@receiver(order_items_bulk_created, sender=OrderItem)
+def add_bulk_product_sales(sender, order_items: list[OrderItem], **kwargs) -> None:
+    # Group by product and day so each counter is written once
+    quantities: dict[tuple, int] = defaultdict(int)
+    for order_item in order_items:
+        day = localdate(order_item.created_at)
+        quantities[(order_item.product_id, day)] += order_item.quantity
+
+    # Rows are written in a fixed order so concurrent batches cannot deadlock
+    for (product_id, day), quantity in sorted(
+        quantities.items(), key=lambda item: (str(item[0][0]), item[0][1])
+    ):
+        ProductSales.objects.record(product_id, start_of_day(day), quantity)
+    invalidate_cache(BEST_SELLING_PRODUCTS_CACHE_NAMESPACE)
+    invalidate_closed_supplier_payouts(*order_created_ats(order_items))
+
+
+@receiver(post_save, sender=Product)
+def invalidate_best_selling_products(sender, instance: Product, **kwargs) -> None:
+    # Product names are part of the cached best-selling responses
+    invalidate_cache(BEST_SELLING_PRODUCTS_CACHE_NAMESPACE)
@@ -0,0 +1,164 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from uuid import uuid4
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localdate, now
+
+from analytics.models import DailyRevenue, ProductSales, month_range, start_of_day
+from commons.cache import get_cache_version
+from commons.constants import SUPPLIER_PAYOUTS_CACHE_NAMESPACE, OrderStatus
+from orders.models import Order, OrderItem
+from products.models import Product
+from users.models import Customer, User
+
+
+class DailyRevenueTests(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            name="john", email="john@email.com", password=uuid4().hex
+        )
+        self.customer = Customer.objects.create(user=user)
+        self.today = localdate(now())
+
+    def get_rollup(self, status: str = OrderStatus.COMPLETED.value) -> DailyRevenue:
+        return DailyRevenue.objects.get(date=self.today, status=status)
+
+    def test_order_creation_updates_rollup(self) -> None:
+        """Test creating orders adds their totals to the day's rollup."""
+        Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("100.50"),
+        )
+        Order.objects.bulk_create(
+            [
+                Order(
+                    customer=self.customer,
+                    status=OrderStatus.COMPLETED.value,
+                    total_price=Decimal("200.25"),
+                )
+            ]
+        )
+
+        rollup = self.get_rollup()
+        self.assertEqual(rollup.total, Decimal("300.75"))
+        self.assertEqual(rollup.order_count, 2)
+
+    def test_status_and_total_changes_move_revenue(self) -> None:
+        """Test updating an order moves its total between status rollups."""
+        order = Order.objects.create(
+            customer=self.customer, total_price=Decimal("100.00")
+        )
+        self.assertEqual(
+            self.get_rollup(OrderStatus.PENDING.value).total, Decimal("100.00")
+        )
+
+        order.status = OrderStatus.COMPLETED.value
+        order.total_price = Decimal("80.00")
+        order.save()
+
+        pending = self.get_rollup(OrderStatus.PENDING.value)
+        self.assertEqual(pending.total, Decimal("0.00"))
+        self.assertEqual(pending.order_count, 0)
+        self.assertEqual(self.get_rollup().total, Decimal("80.00"))
+
+    def test_order_deletion_updates_rollup(self) -> None:
+        """Test deleting an order subtracts it from the rollup."""
+        order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("100.00"),
+        )
+        order.delete()
+
+        rollup = self.get_rollup()
+        self.assertEqual(rollup.total, Decimal("0.00"))
+        self.assertEqual(rollup.order_count, 0)
+
+    def test_total_revenue_reads_partial_days_from_orders(self) -> None:
+        """Test a range with partial edge days only counts orders inside it."""
+        order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("100.00"),
+        )
+        midnight = start_of_day(self.today)
+
+        self.assertEqual(
+            DailyRevenue.objects.total_revenue(midnight - timedelta(days=2)),
+            Decimal("100.00"),
+        )
+        self.assertEqual(
+            DailyRevenue.objects.total_revenue(
+                order.created_at - timedelta(seconds=1),
+                order.created_at + timedelta(seconds=1),
+            ),
+            Decimal("100.00"),
+        )
+        self.assertEqual(
+            DailyRevenue.objects.total_revenue(
+                midnight - timedelta(hours=1), order.created_at
+            ),
+            Decimal("0.00"),
+        )
+
+    def test_rebuild_daily_revenue_command(self) -> None:
+        """Test the rollup is recomputed after writes that bypass signals."""
+        order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("100.00"),
+        )
+        Order.objects.filter(pk=order.pk).update(total_price=Decimal("150.00"))
+
+        call_command("rebuild_analytics", stdout=StringIO())
+
+        self.assertEqual(self.get_rollup().total, Decimal("150.00"))
+
+
+class ProductSalesTests(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            name="john", email="john@email.com", password=uuid4().hex
+        )
+        self.order = Order.objects.create(customer=Customer.objects.create(user=user))
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=10
+        )
+
+    def test_item_changes_invalidate_payouts_of_their_orders_month(self) -> None:
+        """
+        Test adding, repricing and deleting today an item of an order of a
+        closed month drops that month's cached payouts.
+        """
+        start_of_month, _ = month_range(localdate())
+        Order.objects.filter(pk=self.order.pk).update(
+            created_at=start_of_month - timedelta(days=1)
+        )
+        order = Order.objects.get(pk=self.order.pk)
+
+        version = get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+        order_item = OrderItem.objects.create(
+            order=order, product=self.product, quantity=2, price=Decimal("1000.00")
+        )
+        self.assertGreater(get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE), version)
+
+        version = get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+        order_item = OrderItem.objects.get(pk=order_item.pk)
+        with CaptureQueriesContext(connection) as queries:
+            order_item.price = Decimal("900.00")
+            order_item.save()
+        self.assertGreater(get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE), version)
+        # The order's created_at is read in the same query as the stored item
+        for query in queries.captured_queries:
+            self.assertNotIn(f'FROM "{Order._meta.db_table}"', query["sql"])
+
+        version = get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+        OrderItem.objects.get(pk=order_item.pk).delete()
+        self.assertGreater(get_cache_version(SUPPLIER_PAYOUTS_CACHE_NAMESPACE), version)
+        self.assertEqual(ProductSales.objects.get(product=self.product).total_sold, 0)
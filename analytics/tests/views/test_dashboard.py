@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from commons.constants import MembershipLevel, OrderStatus
+from commons.tests.base import UserBaseAPITestCase
+from orders.models import Order, OrderItem
+from products.models import Product
+from users.models import Customer
+
+
+class DashboardViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.user = self.create_user()
+        self.customer = Customer.objects.create(
+            user=self.user, membership=MembershipLevel.BRONZE.value
+        )
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=50
+        )
+        order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("2000.00"),
+        )
+        OrderItem.objects.create(
+            order=order, product=self.product, quantity=2, price=self.product.price
+        )
+        Order.objects.create(customer=self.customer, total_price=Decimal("50.00"))
+
+        self.url = reverse("analytics:dashboard")
+        self.force_authenticate_staff_user()
+
+    def test_dashboard_combines_analytics(self) -> None:
+        """Test revenue, order counts and best-sellers are returned together."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_revenue"], "2000.00")
+        self.assertEqual(response.data["average_order_value"], "2000.00")
+        self.assertEqual(
+            response.data["revenue_by_membership"],
+            {"BRONZE": "2000.00", "SILVER": "0.00", "GOLD": "0.00"},
+        )
+        self.assertEqual(response.data["order_counts"][OrderStatus.COMPLETED.value], 1)
+        self.assertEqual(response.data["order_counts"][OrderStatus.PENDING.value], 1)
+        self.assertEqual(response.data["order_counts"][OrderStatus.CANCELLED.value], 0)
+        self.assertEqual(
+            response.data["best_selling_products"][0]["name"], self.product.name
+        )
+        self.assertEqual(response.data["best_selling_products"][0]["total_sold"], 2)
+        self.assertEqual(response.data["best_selling_products"][0]["rank"], 1)
+
+    def test_dashboard_scans_orders_once(self) -> None:
+        """Test the order figures come from a single query."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        order_queries = [
+            query
+            for query in context.captured_queries
+            if '"orders_order"' in query["sql"]
+        ]
+        self.assertEqual(len(order_queries), 1)
+
+    def test_tied_products_share_a_rank(self) -> None:
+        """Test products selling the same quantity are all listed."""
+        phone = Product.objects.create(
+            name="Phone", price=Decimal("500.00"), stock_quantity=50
+        )
+        order = Order.objects.create(customer=self.customer)
+        OrderItem.objects.create(order=order, product=phone, quantity=2, price=1)
+
+        response = self.client.get(self.url, {"limit": 1})
+
+        products = response.data["best_selling_products"]
+        self.assertEqual([product["name"] for product in products], ["Laptop", "Phone"])
+        self.assertEqual([product["rank"] for product in products], [1, 1])
+
+    def test_dashboard_date_range(self) -> None:
+        """Test revenue and order counts are limited to the date range."""
+        response = self.client.get(
+            self.url, {"start_date": "2020-01-01", "end_date": "2020-01-31"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_revenue"], "0.00")
+        self.assertIsNone(response.data["average_order_value"])
+        self.assertEqual(sum(response.data["order_counts"].values()), 0)
+        self.assertEqual(response.data["best_selling_products"], [])
+
+    def test_invalid_date_range(self) -> None:
+        """Test start_date after end_date is rejected."""
+        response = self.client.get(
+            self.url, {"start_date": "2020-02-01", "end_date": "2020-01-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_staff_users_cannot_view_dashboard(self) -> None:
+        """Test only staff users can view the dashboard."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,6 +1,8 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.urls import reverse
+from django.utils.timezone import now, timedelta
 from rest_framework import status
 
 from commons.constants import MembershipLevel
@@ -65,3 +67,37 @@ class BestSellingProductsViewTests(UserBaseAPITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 0)
+
+    def test_best_selling_products_within_days(self) -> None:
+        """Test only sales from the requested window are counted."""
+        with patch("django.utils.timezone.now") as mock_now:
+            mock_now.return_value = now() - timedelta(days=10)
+            OrderItem.objects.create(
+                order=self.order,
+                product=self.product2,
+                quantity=100,
+                price=self.product2.price,
+            )
+
+        response = self.client.get(self.url, {"days": 7})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["name"], "Laptop")
+        self.assertEqual(response.data[1]["total_sold"], 120)
+
+        response = self.client.get(self.url, {"days": 30})
+        self.assertEqual(response.data[0]["name"], "Smartphone")
+        self.assertEqual(response.data[0]["total_sold"], 220)
+
+    def test_best_selling_products_follow_order_item_changes(self) -> None:
+        """Test updating and deleting order items updates the counters."""
+        order_item = OrderItem.objects.get(product=self.product1)
+        order_item.quantity = 10
+        order_item.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data[0]["name"], "Smartphone")
+        self.assertEqual(response.data[1]["total_sold"], 10)
+
+        order_item.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
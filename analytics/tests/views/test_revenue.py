@@ -1,11 +1,14 @@
+import json
+from datetime import datetime
 from decimal import Decimal
 from unittest.mock import patch
 
+from django.http import StreamingHttpResponse
 from django.urls import reverse
-from django.utils.timezone import now, timedelta
+from django.utils.timezone import make_aware, now, timedelta
 from rest_framework import status
 
-from commons.constants import MembershipLevel, OrderStatus
+from commons.constants import MembershipLevel, OrderStatus, RevenueInterval
 from commons.tests.base import UserBaseAPITestCase
 from orders.models import Order
 from users.models import Customer
@@ -126,3 +129,167 @@ class TotalRevenueViewTests(UserBaseAPITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["total_revenue"], Decimal("100.50"))
+
+    def test_total_revenue_is_cached_until_orders_change(self) -> None:
+        """Test repeated requests are served from the cache until an order changes."""
+        order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            total_price=Decimal("100.50"),
+        )
+        start_date = (now() - timedelta(days=1)).date().isoformat()
+        end_date = now().date().isoformat()
+
+        response = self.client.get(
+            self.url, {"start_date": start_date, "end_date": end_date}
+        )
+        self.assertEqual(response.data["total_revenue"], Decimal("100.50"))
+
+        # Same params in a different order hit the cache without any query
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {"end_date": end_date, "start_date": start_date}
+            )
+        self.assertEqual(response.data["total_revenue"], Decimal("100.50"))
+
+        order.total_price = Decimal("150.00")
+        order.save()
+        response = self.client.get(
+            self.url, {"start_date": start_date, "end_date": end_date}
+        )
+        self.assertEqual(response.data["total_revenue"], Decimal("150.00"))
+
+
+class RevenueSeriesViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.user = self.create_user()
+        self.customer = Customer.objects.create(
+            user=self.user, membership=MembershipLevel.BRONZE.value
+        )
+        self.url = reverse("analytics:revenue-series")
+        self.force_authenticate_staff_user()
+
+    def create_order(self, created_at: datetime, total_price: str, **kwargs) -> None:
+        with patch("django.utils.timezone.now", return_value=make_aware(created_at)):
+            Order.objects.create(
+                customer=self.customer,
+                status=kwargs.get("status", OrderStatus.COMPLETED.value),
+                total_price=Decimal(total_price),
+            )
+
+    def get_series(self, start_date: str, end_date: str, interval: str) -> list:
+        response = self.client.get(
+            self.url,
+            {"start_date": start_date, "end_date": end_date, "interval": interval},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_daily_series_fills_empty_days(self) -> None:
+        """Test every day in the range is listed, with zeros when empty."""
+        self.create_order(datetime(2024, 1, 1, 10), "100.50")
+        self.create_order(datetime(2024, 1, 3, 23, 30), "200.00")
+        self.create_order(
+            datetime(2024, 1, 3, 12), "999.00", status=OrderStatus.PENDING.value
+        )
+
+        series = self.get_series("2024-01-01", "2024-01-04", RevenueInterval.DAY.value)
+
+        self.assertEqual(
+            [
+                (row["bucket"], row["total_revenue"], row["order_count"])
+                for row in series
+            ],
+            [
+                ("2024-01-01", "100.50", 1),
+                ("2024-01-02", "0.00", 0),
+                ("2024-01-03", "200.00", 1),
+                ("2024-01-04", "0.00", 0),
+            ],
+        )
+
+    def test_hourly_series_uses_local_time(self) -> None:
+        """Test hours are bucketed in TIME_ZONE rather than UTC."""
+        self.create_order(datetime(2024, 1, 1, 0, 30), "50.00")
+        self.create_order(datetime(2024, 1, 1, 0, 45), "25.00")
+
+        series = self.get_series("2024-01-01", "2024-01-01", RevenueInterval.HOUR.value)
+
+        self.assertEqual(len(series), 24)
+        self.assertEqual(series[0]["bucket"], "2024-01-01T00:00:00+03:00")
+        self.assertEqual(series[0]["total_revenue"], "75.00")
+        self.assertEqual(series[0]["order_count"], 2)
+        self.assertEqual(series[1]["total_revenue"], "0.00")
+
+    def test_weekly_and_monthly_series(self) -> None:
+        """Test weeks start on Monday and months on the first."""
+        self.create_order(datetime(2024, 1, 3), "10.00")
+        self.create_order(datetime(2024, 1, 10), "20.00")
+        self.create_order(datetime(2024, 2, 5), "30.00")
+
+        weeks = self.get_series("2024-01-03", "2024-01-20", RevenueInterval.WEEK.value)
+        self.assertEqual(
+            [(row["bucket"], row["total_revenue"]) for row in weeks],
+            [("2024-01-01", "10.00"), ("2024-01-08", "20.00"), ("2024-01-15", "0.00")],
+        )
+
+        months = self.get_series(
+            "2024-01-01", "2024-03-31", RevenueInterval.MONTH.value
+        )
+        self.assertEqual(
+            [(row["bucket"], row["total_revenue"]) for row in months],
+            [("2024-01-01", "30.00"), ("2024-02-01", "30.00"), ("2024-03-01", "0.00")],
+        )
+
+    def test_long_series_is_streamed(self) -> None:
+        """Test series with many buckets are streamed as a JSON array."""
+        self.create_order(datetime(2024, 1, 2, 5), "10.00")
+
+        response = self.client.get(
+            self.url,
+            {
+                "start_date": "2024-01-01",
+                "end_date": "2024-02-29",
+                "interval": RevenueInterval.HOUR.value,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        series = json.loads(self.get_streaming_content(response))
+        self.assertEqual(len(series), 60 * 24)
+        self.assertEqual(series[29]["total_revenue"], "10.00")
+
+    def test_ranges_with_too_many_buckets_are_rejected(self) -> None:
+        """Test the number of buckets is capped per interval."""
+        for start_date, end_date, interval in [
+            ("0001-01-01", "9999-12-31", RevenueInterval.HOUR.value),
+            ("2000-01-01", "2024-12-31", RevenueInterval.DAY.value),
+        ]:
+            response = self.client.get(
+                self.url,
+                {"start_date": start_date, "end_date": end_date, "interval": interval},
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.url,
+            {
+                "start_date": "2000-01-01",
+                "end_date": "2024-12-31",
+                "interval": RevenueInterval.MONTH.value,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dates_are_required(self) -> None:
+        """Test the range must be given and the interval must be known."""
+        response = self.client.get(self.url, {"start_date": "2024-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_date", response.data)
+
+        response = self.client.get(
+            self.url,
+            {"start_date": "2024-01-01", "end_date": "2024-01-02", "interval": "year"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
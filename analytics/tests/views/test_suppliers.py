@@ -0,0 +1,102 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate, now, timedelta
+from rest_framework import status
+
+from analytics.models import monthly_supplier_payouts
+from commons.cache import invalidate_cache
+from commons.constants import SUPPLIER_PAYOUTS_CACHE_NAMESPACE, OrderStatus
+from commons.tests.base import UserBaseAPITestCase
+from orders.models import Order, OrderItem
+from products.models import Product, Supplier
+from users.models import Customer
+
+
+class SupplierPayoutsViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.customer = Customer.objects.create(user=self.create_user())
+        self.acme = Supplier.objects.create(name="Acme", email="sales@acme.com")
+        self.globex = Supplier.objects.create(name="Globex", email="orders@globex.com")
+        self.laptop = Product.objects.create(
+            name="Laptop",
+            price=Decimal("999.99"),
+            stock_quantity=50,
+            supplier=self.acme,
+        )
+        self.cable = Product.objects.create(
+            name="Cable", price=Decimal("0.15"), stock_quantity=50, supplier=self.globex
+        )
+        self.last_month = localdate().replace(day=1) - timedelta(days=1)
+        self.url = reverse("analytics:supplier-payouts")
+        self.force_authenticate_staff_user()
+        # Orders are backdated with a patched clock, under which last month
+        # is not closed yet, so drop payouts cached by other tests here
+        invalidate_cache(SUPPLIER_PAYOUTS_CACHE_NAMESPACE)
+
+    def create_order(self, items: list, **kwargs) -> Order:
+        order = Order.objects.create(customer=self.customer, **kwargs)
+        for product, quantity in items:
+            OrderItem.objects.create(
+                order=order, product=product, quantity=quantity, price=product.price
+            )
+        return order
+
+    @patch("django.utils.timezone.now")
+    def create_last_month_orders(self, mock_now) -> None:
+        mock_now.return_value = now().replace(day=1) - timedelta(days=2)
+        self.create_order(
+            [(self.laptop, 3), (self.cable, 7)], status=OrderStatus.COMPLETED.value
+        )
+        self.create_order(
+            [(self.laptop, 1)],
+            status=OrderStatus.COMPLETED.value,
+            discount_applied=Decimal("12.50"),
+        )
+        self.create_order([(self.laptop, 5)], status=OrderStatus.PENDING.value)
+
+    def test_supplier_payouts(self) -> None:
+        """Test payouts are exact, net of discounts and per supplier."""
+        self.create_last_month_orders()
+        # Orders of the current month are not part of last month's payouts
+        self.create_order([(self.laptop, 1)], status=OrderStatus.COMPLETED.value)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["month"], self.last_month.strftime("%Y-%m"))
+        # Acme: 3 * 999.99 + 999.99 * 0.875 = 3874.96125, 70% = 2712.472875
+        # Globex: 7 * 0.15 = 1.05, 70% = 0.735
+        self.assertEqual(
+            [
+                (row["supplier_name"], row["units_sold"], row["revenue"], row["payout"])
+                for row in response.data["suppliers"]
+            ],
+            [("Acme", 4, "3874.96", "2712.47"), ("Globex", 7, "1.05", "0.74")],
+        )
+        self.assertEqual(response.data["total_payout"], "2713.21")
+
+    def test_closed_months_are_cached_until_their_orders_change(self) -> None:
+        """Test ended months are read once and recomputed after order changes."""
+        self.create_last_month_orders()
+        payouts = monthly_supplier_payouts(self.last_month)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(monthly_supplier_payouts(self.last_month), payouts)
+        self.assertEqual(len(context.captured_queries), 0)
+
+        order = Order.objects.get(status=OrderStatus.PENDING.value)
+        order.status = OrderStatus.COMPLETED.value
+        order.save()
+
+        payouts = monthly_supplier_payouts(self.last_month)
+        self.assertEqual(payouts[0]["units_sold"], 9)
+
+    def test_non_staff_users_cannot_view_supplier_payouts(self) -> None:
+        """Test only staff users can view supplier payouts."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,53 @@
+import asyncio
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from analytics.models import ProductSales, day_range
+from analytics.serializers.dashboard import (
+    DashboardInputSerializer,
+    DashboardSerializer,
+)
+from commons.constants import BEST_SELLING_PRODUCTS_LIMIT
+from commons.views import AsyncAPIView, run_query
+from orders.models import Order
+
+
+class DashboardView(AsyncAPIView):
+    """
+    Endpoint for the staff dashboard: revenue, average order value, order
+    counts and revenue per membership level from one pass over the orders
+    in the date range, and the top products sold in it. The two queries
+    run concurrently.
+    """
+
+    serializer_class = DashboardSerializer
+
+    async def get(self, request) -> Response:
+        input_serializer = DashboardInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        validated_data = input_serializer.validated_data
+        start_date = validated_data.get("start_date")
+        end_date = validated_data.get("end_date")
+
+        start, end = day_range(start_date, end_date)
+        orders = Order.objects.all()
+        if start:
+            orders = orders.filter(created_at__gte=start)
+        if end:
+            orders = orders.filter(created_at__lt=end)
+
+        summary, best_selling_products = await asyncio.gather(
+            run_query(orders.summary),
+            run_query(
+                ProductSales.objects.top_products,
+                validated_data.get("limit", BEST_SELLING_PRODUCTS_LIMIT),
+                start_date=start_date,
+                end_date=end_date,
+            ),
+        )
+
+        serializer = DashboardSerializer(
+            {**summary, "best_selling_products": best_selling_products}
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
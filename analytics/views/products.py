@@ -1,20 +1,31 @@
-from django.db.models import Sum
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from analytics.models import ProductSales
 from analytics.serializers.products import (
     BestSellingProductInputSerializer,
     BestSellingProductSerializer,
 )
-from commons.constants import BEST_SELLING_PRODUCTS_LIMIT
-from products.models import Product
+from commons.cache import cache_response
+from commons.constants import (
+    BEST_SELLING_PRODUCTS_CACHE_NAMESPACE,
+    BEST_SELLING_PRODUCTS_CACHE_TIMEOUT,
+    BEST_SELLING_PRODUCTS_LIMIT,
+)
+from commons.views import AsyncAPIView
 
 
-class BestSellingProductsView(APIView):
-    """Endpoint to retrieve the top N best-selling products."""
+class BestSellingProductsView(AsyncAPIView):
+    """
+    Endpoint to retrieve the top N best-selling products,
+    optionally limited to sales from the last `days` days.
+    """
 
-    def get(self, request):
+    @cache_response(
+        BEST_SELLING_PRODUCTS_CACHE_NAMESPACE,
+        timeout=BEST_SELLING_PRODUCTS_CACHE_TIMEOUT,
+    )
+    async def get(self, request):
         # Retrieve the limit from serializers
         input_serializer = BestSellingProductInputSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
@@ -22,11 +33,9 @@ class BestSellingProductsView(APIView):
             "limit", BEST_SELLING_PRODUCTS_LIMIT
         )
 
-        # Annotate products with total quantity sold
-        best_selling_products = (
-            Product.objects.annotate(total_sold=Sum("order_items__quantity"))
-            .filter(total_sold__isnull=False)  # Exclude products with no sales
-            .order_by("-total_sold")[:limit]
+        # Read the top products from the maintained sales counters
+        best_selling_products = await ProductSales.objects.abest_selling(
+            limit, days=input_serializer.validated_data.get("days")
         )
 
         # Serialize the response
@@ -1,25 +1,39 @@
-from datetime import datetime
+from collections.abc import AsyncIterator, Iterable
+from decimal import Decimal
 
-from django.db.models import Sum
-from django.utils.timezone import make_aware
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from analytics.models import (
+    DailyRevenue,
+    count_revenue_buckets,
+    day_range,
+    revenue_buckets,
+)
 from analytics.serializers.revenue import (
+    RevenueBucketSerializer,
+    RevenueSeriesInputSerializer,
     TotalRevenueInputSerializer,
     TotalRevenueSerializer,
 )
-from commons.constants import OrderStatus
-from orders.models import Order
+from commons.cache import cache_response
+from commons.constants import (
+    REVENUE_CACHE_NAMESPACE,
+    REVENUE_CACHE_TIMEOUT,
+    REVENUE_SERIES_STREAM_THRESHOLD,
+)
+from commons.streaming import stream_json_array
+from commons.views import AsyncAPIView
 
 
-class TotalRevenueView(APIView):
+class TotalRevenueView(AsyncAPIView):
     """Endpoint to calculate total revenue within a given date range."""
 
     serializer_class = TotalRevenueSerializer
 
-    def get(self, request) -> Response:
+    @cache_response(REVENUE_CACHE_NAMESPACE, timeout=REVENUE_CACHE_TIMEOUT)
+    async def get(self, request) -> Response:
         # Validate and parse input using the serializer
         input_serializer = TotalRevenueInputSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
@@ -29,21 +43,61 @@ class TotalRevenueView(APIView):
         start_date = validated_data.get("start_date")
         end_date = validated_data.get("end_date")
 
-        # Convert date to datetime and make timezone-aware
-        if start_date:
-            start_date = make_aware(datetime.combine(start_date, datetime.min.time()))
-        if end_date:
-            end_date = make_aware(datetime.combine(end_date, datetime.max.time()))
+        # Convert dates to timezone-aware bounds of the half-open range [start, end)
+        start, end = day_range(start_date, end_date)
 
-        # Filter orders by date range and status
-        orders = Order.objects.filter(status=OrderStatus.COMPLETED.value)
-        if start_date:
-            orders = orders.filter(created_at__gte=start_date)
-        if end_date:
-            orders = orders.filter(created_at__lte=end_date)
-
-        # Calculate total revenue
-        total_revenue = orders.aggregate(total=Sum("total_price"))["total"] or 0
+        # Calculate total revenue from the daily rollup
+        total_revenue = await DailyRevenue.objects.atotal_revenue(start, end)
 
         # Return response
         return Response({"total_revenue": total_revenue}, status=status.HTTP_200_OK)
+
+
+async def _next_row(rows: AsyncIterator[dict]) -> dict | None:
+    try:
+        return await rows.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def fill_gaps(rows: AsyncIterator[dict], buckets: Iterable) -> AsyncIterator:
+    """Serialized rows for every bucket, with zeros where `rows` has none."""
+    row = await _next_row(rows)
+    for bucket in buckets:
+        if row is not None and row["bucket"] == bucket:
+            data = {**row, "bucket": bucket}
+            row = await _next_row(rows)
+        else:
+            data = {"bucket": bucket, "total": Decimal("0.00"), "order_count": 0}
+        yield RevenueBucketSerializer(data).data
+
+
+class RevenueSeriesView(AsyncAPIView):
+    """
+    Endpoint for completed order revenue and counts per hour, day, week or
+    month between two dates, in TIME_ZONE, with empty buckets filled in.
+    Long series are streamed as a JSON array instead of built in memory.
+    """
+
+    serializer_class = RevenueBucketSerializer
+
+    async def get(self, request) -> Response | StreamingHttpResponse:
+        input_serializer = RevenueSeriesInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        start_date = input_serializer.validated_data["start_date"]
+        end_date = input_serializer.validated_data["end_date"]
+        interval = input_serializer.validated_data["interval"]
+
+        rows = DailyRevenue.objects.revenue_series(
+            start_date, end_date, interval
+        ).aiterator()
+        series = fill_gaps(rows, revenue_buckets(start_date, end_date, interval))
+
+        if (
+            count_revenue_buckets(start_date, end_date, interval)
+            > REVENUE_SERIES_STREAM_THRESHOLD
+        ):
+            return StreamingHttpResponse(
+                stream_json_array(series), content_type="application/json"
+            )
+        return Response([row async for row in series], status=status.HTTP_200_OK)
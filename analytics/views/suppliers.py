@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.utils.timezone import localdate
+from rest_framework import status
+from rest_framework.response import Response
+
+from analytics.models import monthly_supplier_payouts
+from analytics.serializers.suppliers import (
+    SupplierPayoutInputSerializer,
+    SupplierPayoutsSerializer,
+)
+from commons.constants import SUPPLIER_SHARE
+from commons.views import AsyncAPIView, run_query
+
+
+class SupplierPayoutsView(AsyncAPIView):
+    """
+    Endpoint for the payout owed to each supplier for a month, by default
+    the previous one, from the completed orders created in it.
+    """
+
+    serializer_class = SupplierPayoutsSerializer
+
+    async def get(self, request) -> Response:
+        input_serializer = SupplierPayoutInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        month = input_serializer.validated_data.get(
+            "month", localdate().replace(day=1) - timedelta(days=1)
+        ).replace(day=1)
+
+        suppliers = await run_query(monthly_supplier_payouts, month)
+
+        serializer = SupplierPayoutsSerializer(
+            {
+                "month": month,
+                "share": SUPPLIER_SHARE,
+                "total_payout": sum(supplier["payout"] for supplier in suppliers),
+                "suppliers": suppliers,
+            }
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
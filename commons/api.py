@@ -0,0 +1,7 @@
+from django.urls import include, path
+
+from commons.routes import metrics
+
+urlpatterns = [
+    path("metrics/", include((metrics.urlpatterns, "metrics"))),
+]
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CommonsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "commons"
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        from commons.metrics import install_query_recorder
+
+        connection_created.connect(install_query_recorder)
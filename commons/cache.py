@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+# Seconds a request holds the lock while computing a missing response
+CACHE_LOCK_TIMEOUT: int = 30
+
+# How long, and how often, other requests wait for the lock holder's response
+CACHE_LOCK_WAIT: float = 5.0
+CACHE_LOCK_POLL_INTERVAL: float = 0.05
+
+
+def _version_key(namespace: str) -> str:
+    return f"response:{namespace}:version"
+
+
+def get_cache_version(namespace: str) -> int:
+    # Start from the clock so an evicted version never reuses an old number
+    return cache.get_or_set(_version_key(namespace), time.time_ns(), timeout=None)
+
+
+async def aget_cache_version(namespace: str) -> int:
+    return await cache.aget_or_set(
+        _version_key(namespace), time.time_ns(), timeout=None
+    )
+
+
+def _bump_cache_version(namespace: str) -> None:
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), time.time_ns(), timeout=None)
+
+
+def invalidate_cache(namespace: str) -> None:
+    """
+    Drop every cached response in `namespace`.
+    The version is bumped immediately and again on commit, so a response
+    computed from data that was not yet committed is never served later.
+    """
+    _bump_cache_version(namespace)
+    transaction.on_commit(lambda: _bump_cache_version(namespace))
+
+
+def _response_key(namespace: str, version: int, request: Request) -> str:
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    digest = hashlib.md5(urlencode(params, doseq=True).encode()).hexdigest()
+    return f"response:{namespace}:{version}:{digest}"
+
+
+def get_cache_key(namespace: str, request: Request) -> str:
+    """Key of `request`'s response, independent of query param order."""
+    return _response_key(namespace, get_cache_version(namespace), request)
+
+
+async def aget_cache_key(namespace: str, request: Request) -> str:
+    return _response_key(namespace, await aget_cache_version(namespace), request)
+
+
+def cache_response(namespace: str, timeout: int):
+    """
+    Cache successful responses of an APIView's `get` for `timeout` seconds,
+    keyed on `namespace` and the normalized query params.
+    Authentication and permissions still run on every request.
+
+    Only one request computes a missing response; concurrent requests for the
+    same key wait for it instead of running the same queries.
+    Async `get` handlers (see commons.views.AsyncAPIView) are supported too.
+    """
+
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            return _async_cache_response(view_method, namespace, timeout)
+
+        @wraps(view_method)
+        def wrapper(view, request: Request, *args, **kwargs) -> Response:
+            key = get_cache_key(namespace, request)
+            cached = cache.get(key)
+            if cached is not None:
+                return Response(cached, status=status.HTTP_200_OK)
+
+            lock_key = f"{key}:lock"
+            if not cache.add(lock_key, 1, timeout=CACHE_LOCK_TIMEOUT):
+                deadline = time.monotonic() + CACHE_LOCK_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(CACHE_LOCK_POLL_INTERVAL)
+                    cached = cache.get(key)
+                    if cached is not None:
+                        return Response(cached, status=status.HTTP_200_OK)
+                lock_key = None  # Lock holder is too slow; compute without it
+
+            try:
+                response = view_method(view, request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    cache.set(key, response.data, timeout=timeout)
+                return response
+            finally:
+                if lock_key:
+                    cache.delete(lock_key)
+
+        return wrapper
+
+    return decorator
+
+
+def _async_cache_response(view_method, namespace: str, timeout: int):
+    """cache_response() for coroutine handlers, waiting without blocking."""
+
+    @wraps(view_method)
+    async def wrapper(view, request: Request, *args, **kwargs) -> Response:
+        key = await aget_cache_key(namespace, request)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        lock_key = f"{key}:lock"
+        if not await cache.aadd(lock_key, 1, timeout=CACHE_LOCK_TIMEOUT):
+            deadline = time.monotonic() + CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return Response(cached, status=status.HTTP_200_OK)
+            lock_key = None
+
+        try:
+            response = await view_method(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                await cache.aset(key, response.data, timeout=timeout)
+            return response
+        finally:
+            if lock_key:
+                await cache.adelete(lock_key)
+
+    return wrapper
@@ -1,7 +1,8 @@
+from decimal import Decimal
 from enum import Enum
 
 # Cut from product price that supplier gets
-SUPPLIER_SHARE: float = 0.7
+SUPPLIER_SHARE: Decimal = Decimal("0.70")
 
 
 # Number of best selling products to show in
@@ -9,6 +10,90 @@ SUPPLIER_SHARE: float = 0.7
 BEST_SELLING_PRODUCTS_LIMIT: int = 50
 
 
+# Maximum number of orders accepted by POST /orders/bulk-create/
+BULK_ORDER_CREATE_LIMIT: int = 1000
+
+# Maximum number of customers accepted by POST /customers/bulk-create/, and
+# of them with a password, as hashing passwords takes a fraction of a second
+# each. Larger batches with passwords go through the import_customers command.
+BULK_CUSTOMER_CREATE_LIMIT: int = 1000
+BULK_CUSTOMER_PASSWORD_LIMIT: int = 50
+
+# Phone numbers whose normalized form each process keeps
+# (see commons.phone_numbers)
+PHONE_NUMBER_CACHE_SIZE: int = 50_000
+
+
+# Rows fetched per round trip, and bytes per streamed chunk, of the exports
+EXPORT_CHUNK_SIZE: int = 2000
+EXPORT_BUFFER_SIZE: int = 64 * 1024
+
+
+# Low-stock products fetched per round trip, and emails sent per SMTP
+# connection, by the send_reorder_alerts command
+REORDER_ALERT_CHUNK_SIZE: int = 2000
+REORDER_ALERT_EMAIL_BATCH_SIZE: int = 100
+
+
+# Requests running the same SQL statement this many times are counted as
+# N+1 queries by commons.middleware.RequestMetricsMiddleware, which keeps
+# this many of the most repeated statements per endpoint
+N_PLUS_ONE_THRESHOLD: int = 5
+REPEATED_QUERIES_KEPT: int = 10
+
+
+# Snapshots of the users authenticated by JWT (see users.authentication):
+# how many each process keeps and for how long, and how long the shared
+# cache keeps them. Changes made by other processes apply within
+# USER_SNAPSHOT_LOCAL_TTL seconds.
+USER_SNAPSHOT_LOCAL_SIZE: int = 10_000
+USER_SNAPSHOT_LOCAL_TTL: float = 5.0
+USER_SNAPSHOT_CACHE_TIMEOUT: int = 60 * 5
+
+# JWT claim holding User.token_version, bumped to revoke a user's tokens
+TOKEN_VERSION_CLAIM: str = "ver"
+
+# Upper bounds, in seconds, of the buckets of the password hashing time
+# recorded at login (see users.passwords)
+PASSWORD_HASHING_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+
+# Cache namespaces and timeouts (in seconds) of the analytics responses.
+# Cached responses are also dropped whenever the underlying data changes.
+REVENUE_CACHE_NAMESPACE: str = "analytics-revenue"
+REVENUE_CACHE_TIMEOUT: int = 60 * 5
+
+BEST_SELLING_PRODUCTS_CACHE_NAMESPACE: str = "analytics-best-selling-products"
+BEST_SELLING_PRODUCTS_CACHE_TIMEOUT: int = 60 * 15
+
+
+# Discounts applied at checkout are read from an index kept in each process,
+# shared through the cache and rebuilt when a discount changes
+DISCOUNTS_CACHE_NAMESPACE: str = "orders-discounts"
+DISCOUNTS_CACHE_TIMEOUT: int = 60 * 60 * 24
+
+
+# Supplier payouts of months that have ended are cached until an order
+# of that month changes, or for at most this many seconds
+SUPPLIER_PAYOUTS_CACHE_NAMESPACE: str = "analytics-supplier-payouts"
+SUPPLIER_PAYOUTS_CACHE_TIMEOUT: int = 60 * 60 * 24
+
+
+# Revenue series longer than this many buckets are streamed
+# by GET /analytics/revenue/series/
+REVENUE_SERIES_STREAM_THRESHOLD: int = 1000
+
+
 # Statuses for order model
 class OrderStatus(str, Enum):
     PENDING = "PENDING"
@@ -16,9 +101,34 @@ class OrderStatus(str, Enum):
     CANCELLED = "CANCELLED"
 
 
+# Bucket sizes of the revenue time series
+class RevenueInterval(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+# Most buckets GET /analytics/revenue/series/ returns per interval, so a
+# long range at a fine interval is rejected instead of generated
+REVENUE_SERIES_MAX_BUCKETS: dict[str, int] = {
+    RevenueInterval.HOUR.value: 24 * 366,
+    RevenueInterval.DAY.value: 366 * 10,
+    RevenueInterval.WEEK.value: 53 * 20,
+    RevenueInterval.MONTH.value: 12 * 50,
+}
+
+
+# Formats of the catalog files read by Product.objects.import_catalog
+class CatalogFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 # Discount Types
 class DiscountType(str, Enum):
-    FLAT = "FLAT"
+    FLAT = "FLAT"  # Amount off the order
+    PERCENTAGE = "PERCENTAGE"  # Percent off the order
 
 
 # Customer Membership Levels
@@ -4,5 +4,17 @@ from enum import Enum
 class ErrorCodes(str, Enum):
     INVALID_PHONE_NUMBER = "This phone number is incorrect. Please try again."
     USER_DOES_NOT_EXIST = "This user does not exist"
+    EMAIL_EXISTS = "A user with this email already exists"
+    PHONE_NUMBER_EXISTS = "A user with this phone number already exists"
+    DUPLICATE_IN_BATCH = "This value is used more than once in the batch"
+    TOO_MANY_PASSWORDS = (
+        "Too many customers with a password, import them with import_customers"
+    )
     CATEGORY_DOES_NOT_EXIST = "Category does not exist"
     START_DATE_IS_GREATER_THAN_END_DATE = "start_date cannot be later than end_date."
+    TOO_MANY_REVENUE_BUCKETS = "The range has too many buckets for this interval."
+    CUSTOMER_DOES_NOT_EXIST = "Customer does not exist"
+    PRODUCT_DOES_NOT_EXIST = "Product does not exist or is inactive"
+    INVALID_CATALOG_COLUMNS = "Catalog needs sku, name and price and no unknown columns"
+    INVALID_CATALOG = "Catalog file is not valid CSV or NDJSON"
+    INSUFFICIENT_STOCK = "Not enough stock for the ordered quantity"
@@ -0,0 +1,61 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, QuerySet
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+
+# Words of a search term: optionally signed, so "+2547" matches E.164 numbers
+SEARCH_TERM_PATTERN = re.compile(r"\+?\w[\w.@-]*")
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Prefix search against the tsvector column named by the view's
+    `search_vector_field`, e.g. `?search=jo 0703` matches "John" with
+    phone number +254703... Results are ranked by relevance unless an
+    OrderingFilter placed after this backend overrides the order.
+    """
+
+    search_param: str = "search"
+    search_config: str = "simple"
+
+    def get_search_query(self, request: Request) -> SearchQuery | None:
+        terms = [
+            term.rstrip(".@-")
+            for term in SEARCH_TERM_PATTERN.findall(
+                request.query_params.get(self.search_param, "")
+            )
+        ]
+        terms = [term for term in terms if term]
+        if not terms:
+            return None
+
+        return SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=self.search_config,
+        )
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        search_query = self.get_search_query(request)
+        if search_query is None:
+            return queryset
+
+        search_vector = F(view.search_vector_field)
+        return (
+            queryset.filter(**{view.search_vector_field: search_query})
+            .annotate(search_rank=SearchRank(search_vector, search_query))
+            .order_by("-search_rank", *queryset.model._meta.ordering)
+        )
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Prefix search on names, emails and phone numbers.",
+                "schema": {"type": "string"},
+            }
+        ]
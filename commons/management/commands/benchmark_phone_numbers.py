@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from commons.phone_numbers import normalize_phone_number, normalize_phone_numbers
+
+
+class Command(BaseCommand):
+    help = (
+        "Time normalizing phone numbers, as UserPhoneNumberField does, "
+        "without the cache, with it and in batches."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--numbers",
+            type=int,
+            default=10_000,
+            help="Number of phone numbers normalized per run.",
+        )
+        parser.add_argument(
+            "--distinct",
+            type=int,
+            default=1_000,
+            help="Number of distinct phone numbers among them.",
+        )
+        parser.add_argument("--region", default="KE")
+
+    def handle(self, *args, **options) -> None:
+        phone_numbers = self.generate(options["numbers"], options["distinct"])
+        region = options["region"]
+
+        def uncached() -> None:
+            for phone_number in phone_numbers:
+                normalize_phone_number.__wrapped__(phone_number, region)
+
+        def cached() -> None:
+            for phone_number in phone_numbers:
+                normalize_phone_number(phone_number, region)
+
+        def batch() -> None:
+            normalize_phone_numbers(phone_numbers, region)
+
+        for name, run in [("uncached", uncached), ("cached", cached), ("batch", batch)]:
+            # Every run starts from an empty cache
+            normalize_phone_number.cache_clear()
+            started = time.perf_counter()
+            run()
+            per_number = (time.perf_counter() - started) / len(phone_numbers)
+            self.stdout.write(f"{name:>8}: {per_number * 1e6:8.2f} µs per number")
+
+    @staticmethod
+    def generate(count: int, distinct: int) -> list[str]:
+        """Kenyan mobile numbers, written the ways users type them."""
+        rng = random.Random(0)
+        subscribers = [f"7{rng.randrange(10**8):08d}" for _ in range(distinct)]
+        formats = ["0{}", "+254{}", "254{}", "{}", "0{} "]
+        return [
+            rng.choice(formats).format(rng.choice(subscribers)) for _ in range(count)
+        ]
@@ -0,0 +1,202 @@
+import json
+import re
+from datetime import timedelta
+from inspect import iscoroutinefunction
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils.timezone import localdate
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from commons.constants import MembershipLevel, RevenueInterval
+from users.models import User
+
+# Name, URL name and query params of every analytics and list endpoint
+ENDPOINTS = [
+    ("total-revenue", "analytics:total-revenue", {}),
+    (
+        "total-revenue-last-30-days",
+        "analytics:total-revenue",
+        {
+            "start_date": (localdate() - timedelta(days=30)).isoformat(),
+            "end_date": localdate().isoformat(),
+        },
+    ),
+    (
+        "revenue-series-daily",
+        "analytics:revenue-series",
+        {
+            "start_date": (localdate() - timedelta(days=30)).isoformat(),
+            "end_date": localdate().isoformat(),
+        },
+    ),
+    (
+        "revenue-series-hourly",
+        "analytics:revenue-series",
+        {
+            "start_date": (localdate() - timedelta(days=6)).isoformat(),
+            "end_date": localdate().isoformat(),
+            "interval": RevenueInterval.HOUR.value,
+        },
+    ),
+    ("best-selling-products", "analytics:best-selling-products", {}),
+    (
+        "best-selling-products-last-30-days",
+        "analytics:best-selling-products",
+        {"days": 30},
+    ),
+    ("dashboard", "analytics:dashboard", {}),
+    ("supplier-payouts", "analytics:supplier-payouts", {}),
+    ("users", "users:list", {}),
+    ("users-cursor", "users:list", {"cursor": ""}),
+    ("users-search", "users:list", {"search": "a"}),
+    ("customers", "customers:list", {}),
+    ("customers-cursor", "customers:list", {"cursor": ""}),
+    (
+        "customers-by-membership",
+        "customers:list",
+        {"membership": MembershipLevel.GOLD.value},
+    ),
+    ("categories", "categories:list", {}),
+    ("reorder-report", "products:reorder-report", {}),
+]
+
+# Queries read through QuerySet.iterator() run in a server-side cursor
+DECLARE_CURSOR = re.compile(r"^DECLARE .+? CURSOR (WITH(OUT)? HOLD )?FOR ", re.DOTALL)
+
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def get_scans(plan: dict) -> list[str]:
+    """How each relation in the plan tree is read, e.g. 'Seq Scan on orders_order'."""
+    scans = []
+    scan = plan["Node Type"]
+    if "Index Name" in plan:
+        scan += f" using {plan['Index Name']}"
+    if "Relation Name" in plan:
+        scans.append(f"{scan} on {plan['Relation Name']}")
+    elif "Index Name" in plan:  # Bitmap Index Scan under a Bitmap Heap Scan
+        scans.append(scan)
+    for child in plan.get("Plans", []):
+        scans += get_scans(child)
+    return scans
+
+
+class Command(BaseCommand):
+    help = (
+        "Record the EXPLAIN plan of every query run by the analytics and list "
+        "endpoints. Save a baseline with --output before a schema change and "
+        "pass it to --compare afterwards to catch plan regressions."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--output", help="Write the plans to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Baseline JSON file written earlier with --output."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative increase of a query's cost over the baseline.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE to include actual timings.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        plans = {
+            name: self.explain_endpoint(url_name, params, options["analyze"])
+            for name, url_name, params in ENDPOINTS
+        }
+
+        for name, queries in plans.items():
+            self.stdout.write(f"{name}: {len(queries)} queries")
+            for query in queries:
+                self.stdout.write(
+                    f"  cost={query['total_cost']} {', '.join(query['scans'])}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(plans, file, indent=2)
+            self.stdout.write(f"Plans written to {options['output']}.")
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+            regressions = self.compare(baseline, plans, options["tolerance"])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} plan regressions found.")
+            self.stdout.write(self.style.SUCCESS("No plan regressions."))
+
+    def explain_endpoint(self, url_name: str, params: dict, analyze: bool) -> list:
+        """Call the endpoint as a staff user and explain each SELECT it runs."""
+        url = reverse(url_name)
+        request = APIRequestFactory().get(url, params, HTTP_HOST="localhost")
+        force_authenticate(request, user=User(is_staff=True, is_active=True))
+        match = resolve(url)
+        view = (
+            async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        )
+
+        # Responses are not cached so every call reaches the database, and
+        # anything the endpoint writes (e.g. rollup rows) is rolled back
+        with override_settings(CACHES=NO_CACHE), transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                response = view(request, *match.args, **match.kwargs)
+            if response.status_code >= 400:
+                raise CommandError(f"{url} returned {response.status_code}.")
+
+            explain = (
+                "EXPLAIN (ANALYZE, FORMAT JSON)" if analyze else "EXPLAIN (FORMAT JSON)"
+            )
+            queries = []
+            with connection.cursor() as cursor:
+                for query in context.captured_queries:
+                    sql = DECLARE_CURSOR.sub("", query["sql"].lstrip())
+                    if not sql.upper().startswith("SELECT"):
+                        continue
+                    cursor.execute(f"{explain} {sql}")
+                    plan = cursor.fetchone()[0]
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    plan = plan[0]
+                    queries.append(
+                        {
+                            "sql": sql,
+                            "total_cost": plan["Plan"]["Total Cost"],
+                            "scans": get_scans(plan["Plan"]),
+                            "plan": plan,
+                        }
+                    )
+            transaction.set_rollback(True)
+        return queries
+
+    @staticmethod
+    def compare(baseline: dict, plans: dict, tolerance: float) -> list[str]:
+        """Queries that got costlier or newly scan a whole table."""
+        regressions = []
+        for name, queries in plans.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if len(queries) > len(before):
+                regressions.append(f"{name}: {len(queries)} queries, was {len(before)}")
+            for index, (old, new) in enumerate(zip(before, queries)):
+                if new["total_cost"] > old["total_cost"] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} query {index}: cost {new['total_cost']}, "
+                        f"was {old['total_cost']}"
+                    )
+                for scan in set(new["scans"]) - set(old["scans"]):
+                    if scan.startswith("Seq Scan"):
+                        regressions.append(f"{name} query {index}: new {scan}")
+        return regressions
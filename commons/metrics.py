@@ -0,0 +1,372 @@
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+from commons.constants import N_PLUS_ONE_THRESHOLD, REPEATED_QUERIES_KEPT
+
+
+@dataclass
+class RequestMetrics:
+    """What one request spent; filled in from every thread serving it."""
+
+    # (sql, seconds) of each query; appends are safe across threads
+    queries: list[tuple[str, float]] = field(default_factory=list)
+    # Time spent rendering serialized data into the response body
+    serializer_times: list[float] = field(default_factory=list)
+
+    @property
+    def sql_time(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    @property
+    def repeated_queries(self) -> Counter:
+        """Statements run more than once, by their SQL with placeholders."""
+        counts = Counter(sql for sql, _ in self.queries)
+        return Counter({sql: count for sql, count in counts.items() if count > 1})
+
+
+# Metrics of the request being served; context variables are copied into
+# the threads sync_to_async() runs queries on, so those are counted too
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing queries of instrumented requests."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries.append((sql, time.perf_counter() - started))
+
+
+def install_query_recorder(sender, connection, **kwargs) -> None:
+    """connection_created receiver adding record_query() to new connections."""
+    # First in the list, so execute_wrapper() blocks popping their own
+    # wrapper from the end never remove it
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@lru_cache(maxsize=None)
+def _redis() -> redis.Redis:
+    """Client of the cache's Redis server, where metrics of every process add up."""
+    return redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+
+
+# Set every field of the hash KEYS[1] named in ARGV to its value in ARGV
+# if it is larger than the stored one, in one atomic step
+SET_MAXIMUMS_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local stored = tonumber(redis.call("HGET", KEYS[1], ARGV[i]))
+    if not stored or stored < tonumber(ARGV[i + 1]) then
+        redis.call("HSET", KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+"""
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    server_errors: int = 0
+    duration: float = 0.0
+    max_duration: float = 0.0
+    queries: int = 0
+    max_queries: int = 0
+    sql_time: float = 0.0
+    duplicate_queries: int = 0
+    n_plus_one_requests: int = 0
+    serializer_time: float = 0.0
+    # Sizes of responses with a body, streamed responses are not measured
+    sized_responses: int = 0
+    response_bytes: int = 0
+    max_response_bytes: int = 0
+    repeated_queries: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def from_redis(cls, values: dict[bytes, bytes], repeated: list) -> "EndpointStats":
+        """Stats from the hash and sorted set RequestStats keeps in Redis."""
+        stats = cls(
+            repeated_queries=Counter(
+                {sql.decode(): int(count) for sql, count in repeated}
+            )
+        )
+        for stat in fields(cls):
+            value = values.get(stat.name.encode())
+            if value is not None and stat.type in (int, float):
+                setattr(stats, stat.name, stat.type(float(value)))
+        return stats
+
+    def as_dict(self) -> dict:
+        """Totals and maximums, with times in seconds, plus a few averages."""
+        return {
+            "requests": self.requests,
+            "server_errors": self.server_errors,
+            "duration": self.duration,
+            "avg_duration": self.duration / self.requests,
+            "max_duration": self.max_duration,
+            "queries": self.queries,
+            "avg_queries": self.queries / self.requests,
+            "max_queries": self.max_queries,
+            "sql_time": self.sql_time,
+            "duplicate_queries": self.duplicate_queries,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "serializer_time": self.serializer_time,
+            "sized_responses": self.sized_responses,
+            "response_bytes": self.response_bytes,
+            "max_response_bytes": self.max_response_bytes,
+            "repeated_queries": [
+                {"sql": sql, "count": count}
+                for sql, count in self.repeated_queries.most_common(
+                    REPEATED_QUERIES_KEPT
+                )
+            ],
+        }
+
+
+class RequestStats:
+    """
+    Totals per endpoint (method and URL route) of the requests served by
+    every worker process, kept in Redis so that any process reports, and
+    resets, the totals of all of them.
+    """
+
+    key_prefix = "metrics:requests"
+
+    def _endpoint_keys(self, endpoint: str) -> tuple[str, str]:
+        return (
+            f"{self.key_prefix}:{endpoint}",
+            f"{self.key_prefix}:{endpoint}:repeated",
+        )
+
+    def add(
+        self,
+        method: str,
+        route: str,
+        metrics: RequestMetrics,
+        duration: float,
+        status_code: int,
+        response_bytes: int | None,
+    ) -> None:
+        endpoint = f"{method} {route}"
+        key, repeated_key = self._endpoint_keys(endpoint)
+        repeated = metrics.repeated_queries
+        maximums = {"max_duration": duration, "max_queries": len(metrics.queries)}
+
+        pipeline = _redis().pipeline(transaction=False)
+        pipeline.sadd(f"{self.key_prefix}:endpoints", endpoint)
+        pipeline.hincrby(key, "requests", 1)
+        pipeline.hincrby(key, "server_errors", int(status_code >= 500))
+        pipeline.hincrbyfloat(key, "duration", duration)
+        pipeline.hincrby(key, "queries", len(metrics.queries))
+        pipeline.hincrbyfloat(key, "sql_time", metrics.sql_time)
+        pipeline.hincrby(
+            key,
+            "duplicate_queries",
+            sum(count - 1 for count in repeated.values()),
+        )
+        pipeline.hincrby(
+            key,
+            "n_plus_one_requests",
+            int(any(count >= N_PLUS_ONE_THRESHOLD for count in repeated.values())),
+        )
+        pipeline.hincrbyfloat(key, "serializer_time", sum(metrics.serializer_times))
+        if response_bytes is not None:
+            pipeline.hincrby(key, "sized_responses", 1)
+            pipeline.hincrby(key, "response_bytes", response_bytes)
+            maximums["max_response_bytes"] = response_bytes
+        pipeline.eval(
+            SET_MAXIMUMS_SCRIPT,
+            1,
+            key,
+            *[item for maximum in maximums.items() for item in maximum],
+        )
+        for sql, count in repeated.items():
+            pipeline.zincrby(repeated_key, count, sql)
+        if repeated:
+            # Keep the most repeated statements only, so memory stays bounded
+            pipeline.zremrangebyrank(repeated_key, 0, -REPEATED_QUERIES_KEPT * 2 - 1)
+        pipeline.execute()
+
+    def snapshot(self) -> list[dict]:
+        client = _redis()
+        endpoints = sorted(
+            endpoint.decode()
+            for endpoint in client.smembers(f"{self.key_prefix}:endpoints")
+        )
+        pipeline = client.pipeline(transaction=False)
+        for endpoint in endpoints:
+            key, repeated_key = self._endpoint_keys(endpoint)
+            pipeline.hgetall(key)
+            pipeline.zrevrange(repeated_key, 0, -1, withscores=True)
+        results = pipeline.execute()
+
+        snapshot = []
+        for index, endpoint in enumerate(endpoints):
+            values, repeated = results[2 * index : 2 * index + 2]
+            # Reset by another process between the two reads
+            if not values:
+                continue
+            method, route = endpoint.split(" ", 1)
+            stats = EndpointStats.from_redis(values, repeated)
+            snapshot.append({"method": method, "route": route, **stats.as_dict()})
+        return snapshot
+
+    def reset(self) -> None:
+        client = _redis()
+        endpoints_key = f"{self.key_prefix}:endpoints"
+        keys = [
+            key
+            for endpoint in client.smembers(endpoints_key)
+            for key in self._endpoint_keys(endpoint.decode())
+        ]
+        client.delete(endpoints_key, *keys)
+
+
+request_stats = RequestStats()
+
+
+class Histogram:
+    """
+    Counts of observed values, e.g. durations, in buckets with the given
+    upper bounds, kept in Redis like request_stats.
+    """
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = sorted(buckets)
+        self.key = f"metrics:histograms:{name}"
+
+    def observe(self, value: float) -> None:
+        pipeline = _redis().pipeline(transaction=False)
+        # Values above the last bound land in the extra +Inf bucket
+        pipeline.hincrby(self.key, str(bisect_left(self.buckets, value)), 1)
+        pipeline.hincrbyfloat(self.key, "sum", value)
+        pipeline.execute()
+
+    def as_dict(self) -> dict:
+        """Cumulative counts per bucket, as Prometheus expects them."""
+        values = _redis().hgetall(self.key)
+        counts, total = [], 0
+        for index, bound in enumerate([*self.buckets, "+Inf"]):
+            total += int(values.get(str(index).encode(), 0))
+            counts.append({"le": bound, "count": total})
+        return {
+            "name": self.name,
+            "help": self.help,
+            "buckets": counts,
+            "count": total,
+            "sum": float(values.get(b"sum", 0)),
+        }
+
+    def reset(self) -> None:
+        _redis().delete(self.key)
+
+
+# Every histogram served by the metrics endpoint
+histograms: list[Histogram] = []
+
+
+def histogram(name: str, help: str, buckets: tuple[float, ...]) -> Histogram:
+    """A new Histogram, registered to be served by the metrics endpoint."""
+    new_histogram = Histogram(name, help, buckets)
+    histograms.append(new_histogram)
+    return new_histogram
+
+
+# Name, type, help and EndpointStats.as_dict() key of each Prometheus metric
+PROMETHEUS_METRICS = [
+    ("leta_http_requests_total", "counter", "Requests served.", "requests"),
+    (
+        "leta_http_server_errors_total",
+        "counter",
+        "Requests answered with a 5xx status.",
+        "server_errors",
+    ),
+    (
+        "leta_http_request_duration_seconds_total",
+        "counter",
+        "Time spent serving requests.",
+        "duration",
+    ),
+    ("leta_db_queries_total", "counter", "SQL statements run.", "queries"),
+    (
+        "leta_db_query_duration_seconds_total",
+        "counter",
+        "Time spent running SQL statements.",
+        "sql_time",
+    ),
+    (
+        "leta_db_duplicate_queries_total",
+        "counter",
+        "SQL statements repeated within a request.",
+        "duplicate_queries",
+    ),
+    (
+        "leta_db_n_plus_one_requests_total",
+        "counter",
+        "Requests repeating a statement at least N_PLUS_ONE_THRESHOLD times.",
+        "n_plus_one_requests",
+    ),
+    (
+        "leta_serializer_duration_seconds_total",
+        "counter",
+        "Time spent serializing response data.",
+        "serializer_time",
+    ),
+    (
+        "leta_http_response_bytes_total",
+        "counter",
+        "Bytes of response bodies, streamed responses excluded.",
+        "response_bytes",
+    ),
+    (
+        "leta_http_max_queries",
+        "gauge",
+        "Most SQL statements run by one request.",
+        "max_queries",
+    ),
+]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(endpoints: list[dict], histograms: list[dict]) -> str:
+    """
+    request_stats.snapshot() and Histogram.as_dict() of each histogram in
+    the Prometheus text exposition format.
+    """
+    lines = []
+    for name, type, help, source in PROMETHEUS_METRICS:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+        for endpoint in endpoints:
+            labels = (
+                f'method="{_escape_label(endpoint["method"])}",'
+                f'route="{_escape_label(endpoint["route"])}"'
+            )
+            lines.append(f"{name}{{{labels}}} {endpoint[source]}")
+    for histogram in histograms:
+        name = histogram["name"]
+        lines += [f"# HELP {name} {histogram['help']}", f"# TYPE {name} histogram"]
+        for bucket in histogram["buckets"]:
+            lines.append(f'{name}_bucket{{le="{bucket["le"]}"}} {bucket["count"]}')
+        lines += [
+            f"{name}_sum {histogram['sum']}",
+            f"{name}_count {histogram['count']}",
+        ]
+    return "\n".join(lines) + "\n"
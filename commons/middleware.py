@@ -0,0 +1,97 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+
+from commons.constants import N_PLUS_ONE_THRESHOLD
+from commons.metrics import RequestMetrics, current_metrics, request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the duration, SQL statements and their time, time rendering the
+    response and response size of every request, and add them to the totals
+    per endpoint in commons.metrics.request_stats. Requests repeating a statement at
+    least N_PLUS_ONE_THRESHOLD times are logged as likely N+1 queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def process_template_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        # DRF responses are rendered right after this hook, so the time to
+        # the post-render callback is the time spent serializing their data
+        metrics = current_metrics.get()
+        if metrics is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: metrics.serializer_times.append(
+                    time.perf_counter() - started
+                )
+            )
+        return response
+
+    @staticmethod
+    def record(
+        request: HttpRequest,
+        response: HttpResponse,
+        metrics: RequestMetrics,
+        duration: float,
+    ) -> None:
+        match = request.resolver_match
+        route = f"/{match.route}" if match else "<unmatched>"
+        response_bytes = None if response.streaming else len(response.content)
+        request_stats.add(
+            request.method,
+            route,
+            metrics,
+            duration,
+            response.status_code,
+            response_bytes,
+        )
+
+        for sql, count in metrics.repeated_queries.items():
+            if count >= N_PLUS_ONE_THRESHOLD:
+                logger.warning(
+                    "%s %s ran the same query %d times [request %s]: %s",
+                    request.method,
+                    request.path,
+                    count,
+                    getattr(request, "id", "-"),
+                    sql,
+                )
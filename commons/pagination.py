@@ -1,4 +1,15 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+
+from django.db.models import Q, QuerySet
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardPageNumberPagination(pagination.PageNumberPagination):
@@ -6,3 +17,222 @@ class StandardPageNumberPagination(pagination.PageNumberPagination):
     max_page_size: int = 100
     page_query_param: str = "page"
     page_size_query_param = "page_size"
+
+
+class StandardCursorPagination(pagination.BasePagination):
+    """
+    Keyset pagination on (created_at, id), the default ordering of
+    commons.models.Base. Each page is a range scan from the previous one
+    instead of an OFFSET, stays stable while rows are inserted, and never
+    runs COUNT(*). Pass `count=approximate` for the planner's row estimate.
+    Results are ascending when the queryset is ordered by `created_at`,
+    descending otherwise; querysets ordered by anything else, e.g. search
+    rank or another `?ordering=`, are rejected rather than reordered.
+    """
+
+    page_size: int = 100
+    max_page_size: int = 100
+    page_size_query_param: str = "page_size"
+    cursor_query_param: str = "cursor"
+    count_query_param: str = "count"
+    invalid_cursor_message: str = "Invalid cursor"
+    invalid_ordering_message: str = (
+        "Cursor pages can only be ordered by created_at or -created_at."
+    )
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        if not self.is_keyset_ordered(queryset):
+            raise ValidationError({"ordering": [self.invalid_ordering_message]})
+
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == "approximate":
+            self.approximate_count = self.get_approximate_count(queryset)
+
+        # The cursor is built from created_at, so keep it loaded under only()
+        fields, deferred = queryset.query.deferred_loading
+        if fields and not deferred:
+            queryset = queryset.only(*fields, "created_at")
+
+        # Walking backwards from a cursor flips the direction of the scan
+        descending = self.is_ascending(queryset) == reverse
+        if descending:
+            queryset = queryset.order_by("-created_at", "-id")
+        else:
+            queryset = queryset.order_by("created_at", "id")
+        if position:
+            queryset = queryset.filter(self.after(*position, descending=descending))
+
+        results = list(queryset[: page_size + 1])
+        has_more = len(results) > page_size
+        self.page = results[:page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else position is not None
+        return self.page
+
+    def get_paginated_response(self, data) -> Response:
+        response = [
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ]
+        if self.approximate_count is not None:
+            response.append(("count", self.approximate_count))
+        response.append(("results", data))
+        return Response(OrderedDict(response))
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {
+                    "type": "integer",
+                    "description": "Estimated total, only with count=approximate.",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pass 'approximate' to include an estimated count.",
+                "schema": {"type": "string", "enum": ["approximate"]},
+            },
+        ]
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        position = [obj.created_at.isoformat(), str(obj.pk), reverse]
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request) -> tuple[tuple | None, bool]:
+        """Return the ((created_at, id), reverse) position of the cursor."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(cursor))
+            created_at = datetime.fromisoformat(created_at)
+            if created_at.tzinfo is None:
+                raise ValueError("Cursor dates are timezone aware")
+            # Primary keys are UUIDs (commons.models.Base)
+            return (created_at, UUID(pk)), bool(reverse)
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def after(created_at: datetime, pk, descending: bool) -> Q:
+        """Rows following (created_at, pk) in the scan direction."""
+        if descending:
+            return Q(created_at__lte=created_at) & (
+                Q(created_at__lt=created_at) | Q(pk__lt=pk)
+            )
+        return Q(created_at__gte=created_at) & (
+            Q(created_at__gt=created_at) | Q(pk__gt=pk)
+        )
+
+    @staticmethod
+    def get_ordering(queryset: QuerySet) -> list[str]:
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return [str(field) for field in ordering]
+
+    @classmethod
+    def is_keyset_ordered(cls, queryset: QuerySet) -> bool:
+        """Whether the queryset's order is the (created_at, id) of the keyset."""
+        ordering = cls.get_ordering(queryset)
+        return not ordering or (
+            ordering[0] in ("created_at", "-created_at")
+            and all(field in ("id", "-id", "pk", "-pk") for field in ordering[1:])
+        )
+
+    @classmethod
+    def is_ascending(cls, queryset: QuerySet) -> bool:
+        ordering = cls.get_ordering(queryset)
+        return bool(ordering) and ordering[0] == "created_at"
+
+    @staticmethod
+    def get_approximate_count(queryset: QuerySet) -> int:
+        """Row estimate from the query plan, without scanning the table."""
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class PageNumberOrCursorPagination(pagination.BasePagination):
+    """
+    Keyset pages (see StandardCursorPagination) when a `cursor` param is
+    passed, left empty for the first page; numbered pages otherwise.
+    """
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list | None:
+        if StandardCursorPagination.cursor_query_param in request.query_params:
+            self.paginator = StandardCursorPagination()
+        else:
+            self.paginator = StandardPageNumberPagination()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data) -> Response:
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return StandardPageNumberPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        page_parameters = (
+            StandardPageNumberPagination().get_schema_operation_parameters(view)
+        )
+        cursor_parameters = StandardCursorPagination().get_schema_operation_parameters(
+            view
+        )
+        return page_parameters + [
+            parameter
+            for parameter in cursor_parameters
+            if parameter["name"] != StandardCursorPagination.page_size_query_param
+        ]
@@ -0,0 +1,52 @@
+from collections.abc import Iterable
+from functools import lru_cache
+
+from phonenumbers import (
+    NumberParseException,
+    PhoneNumberFormat,
+    PhoneNumberType,
+    format_number,
+    is_valid_number,
+    number_type,
+)
+from phonenumbers import parse as parse_phone_number
+
+from commons.constants import PHONE_NUMBER_CACHE_SIZE
+
+# Types of numbers users can register with
+USER_PHONE_NUMBER_TYPES = frozenset(
+    {PhoneNumberType.MOBILE, PhoneNumberType.FIXED_LINE_OR_MOBILE}
+)
+
+
+@lru_cache(maxsize=PHONE_NUMBER_CACHE_SIZE)
+def normalize_phone_number(phone_number: str, region: str) -> str | None:
+    """
+    The E.164 form, e.g. +254732567432, of a mobile `phone_number` dialled
+    from `region` (an ISO 3166-1 country code), or None if it is not one.
+
+    Parsing is slow, so results are kept for the PHONE_NUMBER_CACHE_SIZE
+    most recently normalized inputs of this process.
+    """
+    try:
+        parsed = parse_phone_number(phone_number, region)
+    except NumberParseException:
+        return None
+
+    if number_type(parsed) not in USER_PHONE_NUMBER_TYPES or not is_valid_number(
+        parsed
+    ):
+        return None
+    return format_number(parsed, PhoneNumberFormat.E164)
+
+
+def normalize_phone_numbers(
+    phone_numbers: Iterable[str], region: str
+) -> list[str | None]:
+    """normalize_phone_number() of each number, parsing repeated ones once."""
+    phone_numbers = list(phone_numbers)
+    normalized = {
+        phone_number: normalize_phone_number(phone_number, region)
+        for phone_number in set(phone_numbers)
+    }
+    return [normalized[phone_number] for phone_number in phone_numbers]
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from datetime import date, datetime
+
+from rest_framework.renderers import BaseRenderer
+
+from commons.metrics import to_prometheus
+
+
+def export_value(value):
+    """
+    `value` as a JSON type. Decimals, UUIDs and phone numbers become
+    strings, so amounts stay exact.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV with a header row, for exports (see commons.views.ExportView)."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        # Only used for error responses; exports are streamed with (a)stream()
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows and isinstance(rows[0], dict) else []
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([export_value(row.get(field)) for field in fields])
+        return buffer.getvalue().encode(self.charset)
+
+    @staticmethod
+    def line_writer():
+        """Function returning each row it is given as a CSV line."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def write(row) -> str:
+            writer.writerow(row)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+
+        return write
+
+    def stream(self, rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+        write = self.line_writer()
+        yield write(fields)
+        for row in rows:
+            yield write([export_value(row[field]) for field in fields])
+
+    async def astream(
+        self, rows: AsyncIterable[dict], fields: list[str]
+    ) -> AsyncIterator[str]:
+        write = self.line_writer()
+        yield write(fields)
+        async for row in rows:
+            yield write([export_value(row[field]) for field in fields])
+
+
+class NDJSONRenderer(BaseRenderer):
+    """One JSON object per line, for exports (see commons.views.ExportView)."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        rows = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(row) + "\n" for row in rows).encode(self.charset)
+
+    def stream(self, rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+        for row in rows:
+            yield json.dumps({field: export_value(row[field]) for field in fields})
+            yield "\n"
+
+    async def astream(
+        self, rows: AsyncIterable[dict], fields: list[str]
+    ) -> AsyncIterator[str]:
+        async for row in rows:
+            yield json.dumps({field: export_value(row[field]) for field in fields})
+            yield "\n"
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Request metrics in the Prometheus text format (see commons.metrics)."""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if "endpoints" not in data:
+            # Error responses, e.g. {"detail": ...}, as a comment
+            return f"# {json.dumps(data)}\n".encode(self.charset)
+        return to_prometheus(data["endpoints"], data["histograms"]).encode(self.charset)
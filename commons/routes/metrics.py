@@ -0,0 +1,9 @@
+from django.urls import path
+
+from commons.views import RequestMetricsView
+
+app_name = "metrics"
+
+urlpatterns = [
+    path("", RequestMetricsView.as_view(), name="list"),
+]
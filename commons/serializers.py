@@ -1,16 +1,13 @@
+from dataclasses import dataclass
+from functools import cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
 from django.utils.translation import gettext_lazy as _
-from phonenumbers import (
-    NumberParseException,
-    PhoneNumberFormat,
-    PhoneNumberType,
-    format_number,
-    is_valid_number,
-    number_type,
-)
-from phonenumbers import parse as parse_phone_number
 from rest_framework import serializers
 
 from commons.errors import ErrorCodes
+from commons.phone_numbers import normalize_phone_number, normalize_phone_numbers
 
 
 class UserPhoneNumberField(serializers.CharField):
@@ -23,22 +20,120 @@ class UserPhoneNumberField(serializers.CharField):
         """
         super().__init__(*args, **kwargs)
         self.region = region or "KE"
+        self.normalized: dict[str, str | None] = {}
 
-    def to_internal_value(self, phone_number) -> str:
-        """Format the phone number to international format: +254732567432"""
-        PHONE_NUMBER_TYPES = (
-            PhoneNumberType.MOBILE,
-            PhoneNumberType.FIXED_LINE_OR_MOBILE,
+    def normalize_batch(self, phone_numbers: list[str]) -> None:
+        """
+        Normalize `phone_numbers` together (see normalize_phone_numbers), for
+        to_internal_value() to look up as the rows of a batch are validated.
+        """
+        self.normalized = dict(
+            zip(phone_numbers, normalize_phone_numbers(phone_numbers, self.region))
         )
 
-        try:
-            phone_number = parse_phone_number(phone_number, self.region)
-        except NumberParseException:
+    def to_internal_value(self, phone_number) -> str:
+        """Format the phone number to international format: +254732567432"""
+        phone_number = str(phone_number)
+        if phone_number in self.normalized:
+            normalized = self.normalized[phone_number]
+        else:
+            normalized = normalize_phone_number(phone_number, self.region)
+        if normalized is None:
             raise serializers.ValidationError(self.error_messages["invalid"])
+        return normalized
 
-        if number_type(phone_number) not in PHONE_NUMBER_TYPES or not is_valid_number(
-            phone_number
-        ):
-            raise serializers.ValidationError(self.error_messages["invalid"])
 
-        return format_number(phone_number, PhoneNumberFormat.E164)
+@dataclass(frozen=True)
+class QueryPlan:
+    """Relations and columns a serializer reads from its model's queryset."""
+
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[str, ...] = ()
+    # None when a field reads something other than a model field (e.g. a
+    # property or method), since deferring columns could then add queries
+    only: tuple[str, ...] | None = None
+
+    def apply(self, queryset: QuerySet, only: bool = True) -> QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if only and self.only is not None:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+@cache
+def get_query_plan(serializer_class: type[serializers.Serializer]) -> QueryPlan:
+    """
+    Work out the select_related, prefetch_related and only() a queryset needs
+    so that `serializer_class` reads it without a query per row.
+
+    Dotted sources and nested serializers are followed through the model's
+    relations. Relations read by SerializerMethodFields can't be inferred and
+    are declared with `select_related`/`prefetch_related` on the Meta class.
+    """
+    serializer = serializer_class()
+    meta = getattr(serializer_class, "Meta", None)
+    select_related = set(getattr(meta, "select_related", ()))
+    prefetch_related = set(getattr(meta, "prefetch_related", ()))
+    model = serializer_class.Meta.model
+    only: set[str] | None = {model._meta.pk.name}
+
+    def walk(serializer, model, prefix: str, prefetched: bool) -> None:
+        nonlocal only
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                only = None
+                continue
+
+            nested = (
+                field.child if isinstance(field, serializers.ListSerializer) else field
+            )
+            if field.source == "*":
+                if isinstance(nested, serializers.ModelSerializer):
+                    walk(nested, model, prefix, prefetched)
+                continue
+
+            current, path, in_prefetch = model, prefix, prefetched
+            for index, attr in enumerate(field.source_attrs):
+                try:
+                    model_field = current._meta.get_field(attr)
+                except (AttributeError, FieldDoesNotExist):
+                    only = None  # Property, method or non-model attribute
+                    break
+
+                lookup = f"{path}{attr}"
+                is_last = index == len(field.source_attrs) - 1
+                if not model_field.is_relation:
+                    if only is not None and not in_prefetch:
+                        only.add(lookup)
+                    break
+
+                many = model_field.many_to_many or model_field.one_to_many
+                traversed = not is_last or isinstance(
+                    nested, serializers.BaseSerializer
+                )
+                if many or in_prefetch:
+                    prefetch_related.add(lookup)
+                    in_prefetch = True
+                elif traversed:
+                    select_related.add(lookup)
+                if only is not None and not in_prefetch and model_field.concrete:
+                    only.add(lookup)
+
+                current, path = model_field.related_model, f"{lookup}__"
+                if is_last and isinstance(nested, serializers.ModelSerializer):
+                    walk(nested, current, path, in_prefetch)
+                elif is_last and isinstance(nested, serializers.BaseSerializer):
+                    only = None  # Plain serializers may read any attribute
+
+    walk(serializer, model, "", False)
+
+    return QueryPlan(
+        select_related=tuple(sorted(select_related)),
+        prefetch_related=tuple(sorted(prefetch_related)),
+        only=tuple(sorted(only)) if only is not None else None,
+    )
@@ -0,0 +1,71 @@
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+async def stream_json_array(items: AsyncIterable) -> AsyncIterator[str]:
+    """Encode `items` as one JSON array, an item at a time."""
+    yield "["
+    separator = ""
+    async for item in items:
+        yield separator + json.dumps(item, cls=JSONEncoder)
+        separator = ","
+    yield "]"
+
+
+def buffer_chunks(
+    parts: Iterable[str], size: int, encoding: str = "utf-8"
+) -> Iterator[bytes]:
+    """Join small string `parts` into encoded chunks of about `size` bytes."""
+    buffer, buffered = [], 0
+    for part in parts:
+        data = part.encode(encoding)
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def abuffer_chunks(
+    parts: AsyncIterable[str], size: int, encoding: str = "utf-8"
+) -> AsyncIterator[bytes]:
+    """buffer_chunks() of async `parts`."""
+    buffer, buffered = [], 0
+    async for part in parts:
+        data = part.encode(encoding)
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzip_compressor():
+    return zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress `chunks` as a single gzip stream, a chunk at a time."""
+    compressor = _gzip_compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def agzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """gzip_chunks() of async `chunks`."""
+    compressor = _gzip_compressor()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,5 +1,11 @@
+from typing import Callable
 from uuid import uuid4
 
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -54,3 +60,34 @@ class UserBaseAPITestCase(APITestCase):
     def create_access_token(self, user) -> str:
         refresh = RefreshToken.for_user(user)
         return str(refresh.access_token)
+
+    def get_streaming_content(self, response: StreamingHttpResponse) -> bytes:
+        """Body of a response streamed from a sync or async iterator."""
+        if not response.is_async:
+            return b"".join(response.streaming_content)
+
+        async def read() -> bytes:
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        return async_to_sync(read)()
+
+    def assertQueryCountIsConstant(
+        self, url: str, add_rows: Callable[[], None], **params
+    ) -> None:
+        """
+        Assert GET `url` runs the same number of queries after `add_rows`
+        adds more rows, i.e. the endpoint has no per-row (N+1) queries.
+        """
+        query_counts = []
+        for _ in range(2):
+            add_rows()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(
+            query_counts[0],
+            query_counts[1],
+            f"{url} ran {query_counts[0]} then {query_counts[1]} queries.",
+        )
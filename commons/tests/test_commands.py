@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from commons.management.commands.explain_endpoints import ENDPOINTS
+from users.models import Customer, User
+
+
+class ExplainEndpointsCommandTestCase(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            name="john", email="john@email.com", password="password"
+        )
+        Customer.objects.create(user=user)
+        self.output = os.path.join(tempfile.mkdtemp(), "plans.json")
+
+    def test_plans_are_recorded_for_every_endpoint(self) -> None:
+        """Test each endpoint's queries are written with their plans."""
+        call_command("explain_endpoints", output=self.output, stdout=StringIO())
+
+        with open(self.output) as file:
+            plans = json.load(file)
+        self.assertEqual(set(plans), {name for name, _, _ in ENDPOINTS})
+        for query in plans["customers"]:
+            self.assertIn("Plan", query["plan"])
+            self.assertTrue(query["scans"])
+
+    def test_compare_against_baseline(self) -> None:
+        """Test only plans costlier than the baseline are reported."""
+        call_command("explain_endpoints", output=self.output, stdout=StringIO())
+        stdout = StringIO()
+        call_command("explain_endpoints", compare=self.output, stdout=stdout)
+        self.assertIn("No plan regressions.", stdout.getvalue())
+
+        with open(self.output) as file:
+            plans = json.load(file)
+        for query in plans["users"]:
+            query["total_cost"] = 0.01
+        with open(self.output, "w") as file:
+            json.dump(plans, file)
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "explain_endpoints",
+                compare=self.output,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+
+class BenchmarkPhoneNumbersCommandTestCase(TestCase):
+    def test_timings_are_reported(self) -> None:
+        """Test the time per number is reported for each way of normalizing."""
+        stdout = StringIO()
+        call_command("benchmark_phone_numbers", numbers=50, distinct=5, stdout=stdout)
+
+        for name in ["uncached", "cached", "batch"]:
+            self.assertIn(f"{name}:", stdout.getvalue())
@@ -0,0 +1,97 @@
+from django.urls import reverse
+from rest_framework import status
+
+from commons.metrics import RequestMetrics, RequestStats, request_stats
+from commons.tests.base import UserBaseAPITestCase
+from products.models import Category
+
+
+class RequestMetricsMiddlewareTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        Category.objects.create(name="Electronics")
+        self.url = reverse("metrics:list")
+        self.force_authenticate_staff_user()
+        request_stats.reset()
+
+    def get_endpoint(self, method: str, route: str) -> dict:
+        [endpoint] = [
+            endpoint
+            for endpoint in request_stats.snapshot()
+            if (endpoint["method"], endpoint["route"]) == (method, route)
+        ]
+        return endpoint
+
+    def test_requests_are_measured_per_route(self) -> None:
+        """Test queries, serializer time and response size are recorded."""
+        for _ in range(2):
+            response = self.client.get(reverse("categories:list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        endpoint = self.get_endpoint("GET", "/api/categories/")
+        self.assertEqual(endpoint["requests"], 2)
+        self.assertGreater(endpoint["queries"], 0)
+        self.assertGreater(endpoint["sql_time"], 0)
+        self.assertGreater(endpoint["serializer_time"], 0)
+        self.assertEqual(endpoint["response_bytes"], 2 * len(response.content))
+
+    def test_queries_of_async_views_are_counted(self) -> None:
+        """Test queries run off the event loop count towards the request."""
+        self.client.get(reverse("analytics:dashboard"))
+
+        endpoint = self.get_endpoint("GET", "/api/analytics/dashboard/")
+        self.assertGreaterEqual(endpoint["queries"], 2)
+
+    def test_repeated_queries_are_detected(self) -> None:
+        """Test statements run once per row are reported as N+1 queries."""
+        metrics = RequestMetrics()
+        metrics.queries = [("SELECT 1 WHERE id = %s", 0.001)] * 6 + [
+            ("SELECT 2", 0.001)
+        ]
+        request_stats.add("GET", "/api/example/", metrics, 0.1, 200, 10)
+
+        endpoint = self.get_endpoint("GET", "/api/example/")
+        self.assertEqual(endpoint["duplicate_queries"], 5)
+        self.assertEqual(endpoint["n_plus_one_requests"], 1)
+        self.assertEqual(
+            endpoint["repeated_queries"],
+            [{"sql": "SELECT 1 WHERE id = %s", "count": 6}],
+        )
+
+    def test_stats_are_shared_by_worker_processes(self) -> None:
+        """Test stats added by one process are read and reset by any other."""
+        metrics = RequestMetrics()
+        request_stats.add("GET", "/api/example/", metrics, 0.2, 200, 10)
+        other_process_stats = RequestStats()
+        other_process_stats.add("GET", "/api/example/", metrics, 0.1, 500, None)
+
+        [endpoint] = other_process_stats.snapshot()
+        self.assertEqual(endpoint["requests"], 2)
+        self.assertEqual(endpoint["server_errors"], 1)
+        self.assertEqual(endpoint["max_duration"], 0.2)
+        self.assertEqual(endpoint["sized_responses"], 1)
+
+        other_process_stats.reset()
+        self.assertEqual(request_stats.snapshot(), [])
+
+    def test_metrics_in_prometheus_format(self) -> None:
+        """Test the endpoint serves counters labelled by method and route."""
+        self.client.get(reverse("categories:list"))
+
+        response = self.client.get(self.url, {"format": "prometheus"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        self.assertIn("# TYPE leta_db_queries_total counter", content)
+        self.assertIn(
+            'leta_http_requests_total{method="GET",route="/api/categories/"} 1',
+            content,
+        )
+        self.assertIn("# TYPE leta_password_hashing_seconds histogram", content)
+        self.assertIn('leta_password_hashing_seconds_bucket{le="+Inf"}', content)
+
+    def test_non_staff_users_cannot_view_metrics(self) -> None:
+        """Test only staff users can view request metrics."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from commons.phone_numbers import normalize_phone_number, normalize_phone_numbers
+
+
+class NormalizePhoneNumberTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        normalize_phone_number.cache_clear()
+
+    def test_normalize_phone_number(self) -> None:
+        """Test mobile numbers are formatted as E.164 and others rejected."""
+        for phone_number in ["0712345678", "+254712345678", "254712345678"]:
+            self.assertEqual(
+                normalize_phone_number(phone_number, "KE"), "+254712345678"
+            )
+        # Landlines, invalid numbers and text are not mobile numbers
+        for phone_number in ["0202345678", "07123", "phone"]:
+            self.assertIsNone(normalize_phone_number(phone_number, "KE"))
+
+    def test_results_are_cached(self) -> None:
+        """Test repeated inputs are parsed once."""
+        for _ in range(3):
+            normalize_phone_number("0712345678", "KE")
+        info = normalize_phone_number.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_normalize_phone_numbers(self) -> None:
+        """Test a batch is normalized in order, parsing each distinct number once."""
+        self.assertEqual(
+            normalize_phone_numbers(["0712345678", "07123", "0712345678"], "KE"),
+            ["+254712345678", None, "+254712345678"],
+        )
+        self.assertEqual(normalize_phone_number.cache_info().misses, 2)
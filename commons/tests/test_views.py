@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from commons.views import run_query
+
+
+class RunQueryTestCase(SimpleTestCase):
+    def test_gathered_calls_overlap(self) -> None:
+        """Test gathered calls take as long as the slowest, not their sum."""
+
+        async def gather() -> list:
+            return await asyncio.gather(*(run_query(time.sleep, 0.2) for _ in range(3)))
+
+        started = time.monotonic()
+        async_to_sync(gather)()
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class RunQueryInTransactionTestCase(TestCase):
+    def test_transaction_connection_is_used(self) -> None:
+        """Test calls inside a transaction share its connection."""
+        used = async_to_sync(run_query)(lambda: connection.connection)
+        self.assertIs(used, connection.connection)
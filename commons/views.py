@@ -1 +1,188 @@
-# Create your views here.
+import re
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, connection
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.timezone import localdate
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, status
+from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from commons.constants import EXPORT_BUFFER_SIZE, EXPORT_CHUNK_SIZE
+from commons.metrics import histograms, request_stats
+from commons.renderers import CSVRenderer, NDJSONRenderer, PrometheusRenderer
+from commons.serializers import get_query_plan
+from commons.streaming import abuffer_chunks, agzip_chunks, buffer_chunks, gzip_chunks
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class QueryPlanMixin:
+    """
+    Apply the select_related, prefetch_related and only() needed by the
+    view's serializer (see commons.serializers.get_query_plan) to its
+    queryset, so list and retrieve endpoints run a fixed number of queries.
+    Columns are only deferred on safe methods, where nothing gets saved.
+    """
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()  # type: ignore
+        plan = get_query_plan(self.get_serializer_class())  # type: ignore
+        return plan.apply(
+            queryset,
+            only=self.request.method in permissions.SAFE_METHODS,  # type: ignore
+        )
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines (`async def get`), so under ASGI a
+    request waiting on the database does not hold a worker thread.
+    Authentication, permissions and throttling run as in APIView.
+    """
+
+    async def dispatch(self, request, *args, **kwargs) -> Response:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authenticating may load the user, so it runs off the event loop
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if not isinstance(response, Response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _in_transaction() -> bool:
+    return connection.in_atomic_block
+
+
+def _run_with_own_connection(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_query(func, *args, **kwargs):
+    """
+    Await the blocking database call `func(*args, **kwargs)`.
+
+    The async ORM runs every query on one shared thread, so queries awaited
+    together with asyncio.gather still run one after another. This runs
+    `func` on a pool thread with its own connection instead, so gathered
+    calls overlap. Inside a transaction `func` uses the transaction's
+    connection, as other connections would not see its uncommitted writes.
+    """
+    # Connections are per thread, so ask the thread the ORM would use
+    if await sync_to_async(_in_transaction)():
+        return await sync_to_async(func)(*args, **kwargs)
+    return await sync_to_async(_run_with_own_connection, thread_sensitive=False)(
+        func, *args, **kwargs
+    )
+
+
+class ExportView(AsyncAPIView, GenericAPIView):
+    """
+    Stream the `export_fields` of every row in the filtered queryset as CSV,
+    or NDJSON with `?format=ndjson`, gzipped when the client accepts it.
+    Rows are read from a server-side cursor `chunk_size` at a time, so
+    memory use stays the same however many rows are exported: through
+    async iterators under ASGI, and sync ones under WSGI (gunicorn), where
+    Django would otherwise read an async stream whole before sending it.
+    """
+
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    filter_backends = [DjangoFilterBackend]
+    pagination_class = None
+    export_name: str = "export"
+    export_fields: list[str] = []
+    chunk_size: int = EXPORT_CHUNK_SIZE
+
+    async def get(self, request) -> StreamingHttpResponse:
+        queryset = self.filter_queryset(self.get_queryset())
+        # Unordered, so rows stream in table order without a sort
+        rows = queryset.order_by().values(*self.export_fields)
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            content_type=f"{renderer.media_type}; charset={renderer.charset}"
+        )
+        gzipped = ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", ""))
+        if isinstance(request._request, ASGIRequest):
+            content = abuffer_chunks(
+                renderer.astream(
+                    rows.aiterator(chunk_size=self.chunk_size), self.export_fields
+                ),
+                EXPORT_BUFFER_SIZE,
+                renderer.charset,
+            )
+            if gzipped:
+                content = agzip_chunks(content)
+        else:
+            content = buffer_chunks(
+                renderer.stream(
+                    rows.iterator(chunk_size=self.chunk_size), self.export_fields
+                ),
+                EXPORT_BUFFER_SIZE,
+                renderer.charset,
+            )
+            if gzipped:
+                content = gzip_chunks(content)
+
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="{self.export_name}-{localdate()}.{renderer.format}"'
+        )
+        response.streaming_content = content
+        return response
+
+
+class RequestMetricsView(APIView):
+    """
+    Per endpoint totals of the requests served by every worker process:
+    durations, SQL statements and time, repeated statements, serializer
+    time and response sizes, followed by the histograms registered in
+    commons.metrics. `?format=prometheus` returns them for Prometheus.
+    """
+
+    renderer_classes = [JSONRenderer, PrometheusRenderer]
+
+    def get(self, request) -> Response:
+        return Response(
+            {
+                "endpoints": request_stats.snapshot(),
+                "histograms": [histogram.as_dict() for histogram in histograms],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request) -> Response:
+        request_stats.reset()
+        for histogram in histograms:
+            histogram.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
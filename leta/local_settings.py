@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third party apps
     "phonenumber_field",
     "rest_framework",
@@ -62,6 +63,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "log_request_id.middleware.RequestIDMiddleware",
+    "commons.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -126,6 +129,37 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+
+# New passwords are hashed with PASSWORD_HASHER: "pbkdf2", "scrypt" or
+# "argon2" (requires argon2-cffi). Passwords hashed with the others still
+# verify and are rehashed with it when the user logs in.
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+_PASSWORD_HASHERS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(PASSWORD_HASHER),
+    *_PASSWORD_HASHERS.values(),
+]
+
+# Threads hashing passwords at login in each worker process. By default
+# the cores are shared among the WEB_CONCURRENCY workers gunicorn starts,
+# so all the processes together run about one hashing thread per core.
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get(
+        "PASSWORD_HASHING_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+    )
+)
+
+# Threads hashing the passwords of POST /customers/bulk-create/
+BULK_PASSWORD_HASHING_WORKERS = int(os.environ.get("BULK_PASSWORD_HASHING_WORKERS", 2))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -162,13 +196,15 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.auth.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.auth.TokenRefreshSerializer",
     "BLACKLIST_AFTER_ROTATION": True,
     "ROTATE_REFRESH_TOKENS": True,
 }
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -27,7 +27,9 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("users.api")),
     path("api/", include("products.api")),
+    path("api/", include("orders.api")),
     path("api/", include("analytics.api")),
+    path("api/", include("commons.api")),
     # Swagger documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -0,0 +1,7 @@
+from django.urls import include, path
+
+from orders.routes import orders
+
+urlpatterns = [
+    path("orders/", include((orders.urlpatterns, "orders"))),
+]
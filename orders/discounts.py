@@ -0,0 +1,74 @@
+import heapq
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from commons.constants import DiscountType
+
+
+class DiscountIndex:
+    """
+    Interval index of discounts by validity period.
+
+    The periods cut the timeline into segments over which the set of valid
+    discounts does not change; each segment keeps the largest flat amount
+    and the largest percentage valid in it, so the best discount at any
+    moment is found with a binary search.
+    """
+
+    def __init__(self, discounts: list[tuple]) -> None:
+        """`discounts` holds (valid_from, valid_until, type, value) tuples."""
+        # Discounts are valid up to and including valid_until
+        periods = sorted(
+            (valid_from, valid_until + timedelta(microseconds=1), type, value)
+            for valid_from, valid_until, type, value in discounts
+            if valid_from <= valid_until
+        )
+        boundaries = sorted(
+            {start for start, *_ in periods} | {end for _, end, *_ in periods}
+        )
+
+        self.starts: list[datetime] = []
+        self.best: list[tuple[Decimal, Decimal]] = []
+        # Max-heaps of (-value, end) per type; expired entries are popped lazily
+        heaps = {type: [] for type in DiscountType}
+        position = 0
+        for boundary in boundaries:
+            while position < len(periods) and periods[position][0] <= boundary:
+                _, end, type, value = periods[position]
+                heapq.heappush(heaps[DiscountType(type)], (-value, end))
+                position += 1
+
+            best = []
+            for type in (DiscountType.FLAT, DiscountType.PERCENTAGE):
+                heap = heaps[type]
+                while heap and heap[0][1] <= boundary:
+                    heapq.heappop(heap)
+                best.append(-heap[0][0] if heap else Decimal("0"))
+
+            self.starts.append(boundary)
+            self.best.append(tuple(best))
+
+    def best_at(self, moment: datetime) -> tuple[Decimal, Decimal]:
+        """Largest flat amount and largest percentage valid at `moment`."""
+        segment = bisect_right(self.starts, moment) - 1
+        if segment < 0:
+            return Decimal("0"), Decimal("0")
+        return self.best[segment]
+
+    def discount_applied(
+        self, subtotal: Decimal, moment: datetime, membership_discount: float = 0
+    ) -> Decimal | None:
+        """
+        Percentage off an order of `subtotal` placed at `moment`: the best
+        discount valid then, a flat amount counted as its share of the
+        subtotal, plus the customer's membership discount, capped at 100.
+        None when there is nothing to take off.
+        """
+        flat, percentage = self.best_at(moment)
+        if flat and subtotal > 0:
+            percentage = max(percentage, min(flat, subtotal) / subtotal * 100)
+
+        discount = min(percentage + Decimal(str(membership_discount)), Decimal("100"))
+        discount = discount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return discount or None
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from commons.constants import OrderStatus
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Recompute total_price of orders from their items in batched updates."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--status",
+            choices=[status.value for status in OrderStatus],
+            help="Only recalculate orders with this status.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of orders updated per statement.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        orders = Order.objects.all()
+        if options["status"]:
+            orders = orders.filter(status=options["status"])
+        count = orders.count()
+
+        def report(updated: int) -> None:
+            self.stdout.write(f"Updated {updated}/{count} orders.")
+
+        updated = orders.recalculate_total_prices(
+            batch_size=options["batch_size"], progress=report
+        )
+        self.stdout.write(self.style.SUCCESS(f"Recalculated {updated} orders."))
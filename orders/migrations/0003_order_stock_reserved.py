@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0002_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="stock_reserved",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0003_order_stock_reserved"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="discount",
+            name="type",
+            field=models.CharField(
+                choices=[("FLAT", "FLAT"), ("PERCENTAGE", "PERCENTAGE")],
+                default="FLAT",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -1,13 +1,65 @@
-from decimal import Decimal
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable
 
-from django.db import models
+from django.core.cache import cache
+from django.db import connections, models, router, transaction
 from django.utils.timezone import now
 
-from commons.constants import DiscountType, OrderStatus
+from commons.cache import get_cache_version
+from commons.constants import (
+    DISCOUNTS_CACHE_NAMESPACE,
+    DISCOUNTS_CACHE_TIMEOUT,
+    DiscountType,
+    MembershipLevel,
+    OrderStatus,
+)
 from commons.models import Base
+from orders.discounts import DiscountIndex
+from orders.signals import (
+    order_items_bulk_created,
+    order_totals_changed,
+    orders_bulk_created,
+    orders_bulk_updated,
+)
 from products.models import Product
 from users.models import Customer
 
+# Version of the discounts and the index built from them, in this process
+_discount_index: tuple[int | None, DiscountIndex | None] = (None, None)
+
+
+class DiscountQuerySet(models.QuerySet):
+    def index(self) -> DiscountIndex:
+        """
+        Index of the discounts that have not expired, for pricing orders.
+
+        Each process keeps the last index it built, and the discounts it was
+        built from are shared through the cache, so the discounts table is
+        only read after a discount changes. Checking the index is current
+        costs one cache read.
+        """
+        global _discount_index
+
+        version = get_cache_version(DISCOUNTS_CACHE_NAMESPACE)
+        index_version, index = _discount_index
+        if index_version == version:
+            return index
+
+        key = f"discounts:{version}"
+        discounts = cache.get(key)
+        if discounts is None:
+            discounts = list(
+                self.filter(valid_until__gte=now()).values_list(
+                    "valid_from", "valid_until", "type", "value"
+                )
+            )
+            cache.set(key, discounts, timeout=DISCOUNTS_CACHE_TIMEOUT)
+
+        index = DiscountIndex(discounts)
+        _discount_index = (version, index)
+        return index
+
 
 class Discount(Base):
     """Discount Model"""
@@ -22,6 +74,8 @@ class Discount(Base):
     valid_from = models.DateTimeField()
     valid_until = models.DateTimeField()
 
+    objects = DiscountQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Discount"
         verbose_name_plural = "Discounts"
@@ -35,6 +89,256 @@ class Discount(Base):
         return self.valid_from <= now() <= self.valid_until
 
 
+def calculate_total(order_items, discount_applied: Decimal | None) -> Decimal:
+    """Sum of the items' price times quantity, less the discount percentage."""
+    total = sum((item.price * item.quantity for item in order_items), Decimal("0"))
+    if discount_applied:
+        total -= total * (discount_applied / Decimal("100"))
+    return total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+# Locks the batch's orders to read their previous totals, so the change
+# of each total can be returned and applied to the revenue rollup
+RECALCULATE_TOTAL_PRICES_SQL = """
+UPDATE {order_table} AS o
+SET total_price = totals.total_price,
+    updated_at = NOW()
+FROM (
+    SELECT previous.id,
+        previous.total_price AS previous_total,
+        ROUND(
+            COALESCE(SUM(item.price * item.quantity), 0)
+                * (1 - COALESCE(previous.discount_applied, 0) / 100),
+            2
+        ) AS total_price
+    FROM (
+        SELECT id, total_price, discount_applied FROM {order_table}
+        WHERE id = ANY(%s::uuid[])
+        FOR NO KEY UPDATE
+    ) AS previous
+    LEFT JOIN {order_item_table} AS item ON item.order_id = previous.id
+    GROUP BY previous.id, previous.total_price, previous.discount_applied
+) AS totals
+WHERE o.id = totals.id
+RETURNING o.created_at, o.status, totals.total_price - totals.previous_total
+"""
+
+
+CANCEL_ORDERS_SQL = """
+UPDATE {order_table} AS o
+SET status = %s, stock_reserved = FALSE, updated_at = NOW()
+FROM (
+    SELECT id, stock_reserved FROM {order_table}
+    WHERE id = ANY(%s::uuid[]) AND status <> %s
+    FOR NO KEY UPDATE
+) AS previous
+WHERE o.id = previous.id AND o.status <> %s
+RETURNING o.id, previous.stock_reserved
+"""
+
+
+class OrderQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        orders = super().bulk_create(objs, *args, **kwargs)
+        orders_bulk_created.send(sender=self.model, orders=orders)
+        return orders
+
+    def recalculate_total_prices(
+        self,
+        batch_size: int = 1000,
+        progress: Callable[[int], None] | None = None,
+    ) -> int:
+        """
+        Set-based equivalent of Order.calculate_total_price() for every
+        order in the queryset. Each batch of `batch_size` orders is
+        recomputed with one UPDATE ... FROM (SELECT SUM(...)) in its own
+        transaction, which also applies the change of each total to the
+        revenue rollup (see order_totals_changed). `progress` is called
+        with the running total of updated orders after each batch.
+        """
+        sql = RECALCULATE_TOTAL_PRICES_SQL.format(
+            order_table=self.model._meta.db_table,
+            order_item_table=OrderItem._meta.db_table,
+        )
+        queryset = self.order_by("pk")
+        updated = 0
+        last_id = None
+
+        while True:
+            batch = queryset if last_id is None else queryset.filter(pk__gt=last_id)
+            order_ids = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not order_ids:
+                return updated
+
+            with transaction.atomic(using=self.db):
+                with connections[self.db].cursor() as cursor:
+                    cursor.execute(sql, [[str(order_id) for order_id in order_ids]])
+                    changes = cursor.fetchall()
+                updated += len(changes)
+                order_totals_changed.send(sender=self.model, changes=changes)
+
+            if progress:
+                progress(updated)
+            last_id = order_ids[-1]
+
+    def summary(self) -> dict:
+        """
+        Revenue and average value of the COMPLETED orders in the queryset,
+        revenue per customer membership level and the number of orders
+        per status, computed in a single pass with conditional aggregates.
+        """
+        completed = models.Q(status=OrderStatus.COMPLETED.value)
+        aggregates = {
+            "total_revenue": models.Sum(
+                "total_price", filter=completed, default=Decimal("0.00")
+            ),
+            "average_order_value": models.Avg("total_price", filter=completed),
+        }
+        for status in OrderStatus:
+            aggregates[f"count_{status.value}"] = models.Count(
+                "id", filter=models.Q(status=status.value)
+            )
+        for level in MembershipLevel:
+            aggregates[f"revenue_{level.value}"] = models.Sum(
+                "total_price",
+                filter=completed & models.Q(customer__membership=level.value),
+                default=Decimal("0.00"),
+            )
+
+        result = self.order_by().aggregate(**aggregates)
+        return {
+            "total_revenue": result["total_revenue"],
+            "average_order_value": result["average_order_value"],
+            "order_counts": {
+                status.value: result[f"count_{status.value}"] for status in OrderStatus
+            },
+            "revenue_by_membership": {
+                level.value: result[f"revenue_{level.value}"]
+                for level in MembershipLevel
+            },
+        }
+
+    def create_orders(self, orders: list[dict], batch_size: int = 500) -> list:
+        """
+        Create many orders with their items.
+
+        Each entry holds a `customer`, an optional `status` and
+        `discount_applied`, and `items` as dicts of `product` and `quantity`,
+        with customers and products already loaded. Item prices and order
+        totals are computed in memory, and every batch of `batch_size`
+        orders is written with two bulk inserts in one transaction.
+
+        Orders without a `discount_applied` get the best discount valid now
+        plus the customer's membership discount, from Discount.objects.index().
+
+        Stock for the items of orders that are not CANCELLED is reserved in
+        the same transaction, so a batch with an item short of stock is not
+        created and raises ValidationError (see Product.objects.reserve_stock).
+        Earlier batches stay created unless the caller wraps the call in a
+        transaction, as BulkOrderCreateView does.
+        """
+        discounts = Discount.objects.using(self.db).index()
+        priced_at = now()
+        created = []
+        for start in range(0, len(orders), batch_size):
+            order_objs, order_items = [], []
+            for data in orders[start : start + batch_size]:
+                status = data.get("status", OrderStatus.PENDING.value)
+                order = self.model(
+                    customer=data["customer"],
+                    status=status,
+                    stock_reserved=status != OrderStatus.CANCELLED.value,
+                )
+                items = [
+                    OrderItem(
+                        order=order,
+                        product=item["product"],
+                        quantity=item["quantity"],
+                        price=item["product"].price,
+                    )
+                    for item in data["items"]
+                ]
+                order.discount_applied = data.get("discount_applied")
+                if order.discount_applied is None:
+                    order.discount_applied = discounts.discount_applied(
+                        calculate_total(items, None), priced_at, order.customer.discount
+                    )
+                order.total_price = calculate_total(items, order.discount_applied)
+                order_objs.append(order)
+                order_items += items
+
+            quantities: dict = defaultdict(int)
+            for item in order_items:
+                if item.order.stock_reserved:
+                    quantities[item.product.pk] += item.quantity
+
+            with transaction.atomic(using=self.db):
+                Product.objects.using(self.db).reserve_stock(quantities)
+                created += self.bulk_create(order_objs)
+                OrderItem.objects.using(self.db).bulk_create(order_items)
+
+        return created
+
+    def cancel(self) -> int:
+        """
+        Set the orders in the queryset to CANCELLED and put the stock they
+        reserved back, in one transaction. Orders that are already cancelled
+        are left alone, so stock is never released twice. Returns the number
+        of orders cancelled.
+        """
+        order_ids = [str(pk) for pk in self.values_list("pk", flat=True)]
+        cancelled = OrderStatus.CANCELLED.value
+        sql = CANCEL_ORDERS_SQL.format(
+            order_table=connections[self.db].ops.quote_name(self.model._meta.db_table)
+        )
+
+        with transaction.atomic(using=self.db):
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(sql, [cancelled, order_ids, cancelled, cancelled])
+                rows = cursor.fetchall()
+
+            self._release_stock_of(
+                [order_id for order_id, stock_reserved in rows if stock_reserved]
+            )
+            if rows:
+                orders_bulk_updated.send(
+                    sender=self.model, order_ids=[order_id for order_id, _ in rows]
+                )
+
+        return len(rows)
+
+    def release_stock(self) -> int:
+        """
+        Put back the stock reserved by the orders in the queryset that still
+        hold it, whatever their status, and mark it released so it is never
+        put back twice. Returns the number of orders released.
+        """
+        with transaction.atomic(using=self.db):
+            order_ids = list(
+                self.filter(stock_reserved=True)
+                .select_for_update(no_key=True)
+                .values_list("pk", flat=True)
+            )
+            self.model.objects.using(self.db).filter(pk__in=order_ids).update(
+                stock_reserved=False
+            )
+            self._release_stock_of(order_ids)
+
+        return len(order_ids)
+
+    def _release_stock_of(self, order_ids: list) -> None:
+        quantities = (
+            OrderItem.objects.using(self.db)
+            .filter(order_id__in=order_ids)
+            .values("product_id")
+            .annotate(quantity=models.Sum("quantity"))
+            .order_by()
+        )
+        Product.objects.using(self.db).release_stock(
+            {row["product_id"]: row["quantity"] for row in quantities}
+        )
+
+
 class Order(Base):
     customer = models.ForeignKey(
         Customer, on_delete=models.CASCADE, related_name="orders"
@@ -50,38 +354,95 @@ class Order(Base):
     discount_applied = models.DecimalField(
         max_digits=5, decimal_places=2, null=True, blank=True
     )
+    # Whether the items' quantities are held out of product stock
+    stock_reserved = models.BooleanField(default=False)
+
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Order"
         verbose_name_plural = "Orders"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["status", "-created_at"], name="order_status_created_idx"
+            ),
+            # Revenue sums read completed orders by date without the table
+            models.Index(
+                fields=["created_at"],
+                include=["total_price"],
+                condition=models.Q(status=OrderStatus.COMPLETED.value),
+                name="order_completed_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Order #{self.id} - {self.customer.user.name}"
 
+    def save(self, *args, **kwargs) -> None:
+        """
+        Save the order, putting its reserved stock back in the same
+        transaction when it is saved as cancelled (admin, serializers), not
+        only through cancel().
+        """
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if not self._state.adding and self.status == OrderStatus.CANCELLED.value:
+                # The stored flag decides, so a stale instance never releases twice
+                Order.objects.using(using).filter(pk=self.pk).release_stock()
+                self.stock_reserved = False
+            super().save(*args, **kwargs)
+
+    def cancel(self) -> None:
+        """Cancel the order and put its reserved stock back."""
+        Order.objects.filter(pk=self.pk).cancel()
+        self.refresh_from_db(fields=["status", "stock_reserved", "updated_at"])
+
     def calculate_total_price(self):
         """Recalculate total_price based on associated OrderItems."""
-        total = sum(item.price * item.quantity for item in self.order_items.all())
-        if self.discount_applied:
-            total -= total * (self.discount_applied / Decimal("100"))
-        self.total_price = total
+        self.total_price = calculate_total(
+            self.order_items.all(), self.discount_applied
+        )
         self.save()
 
 
+class OrderItemQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        order_items = super().bulk_create(objs, *args, **kwargs)
+        order_items_bulk_created.send(sender=self.model, order_items=order_items)
+        return order_items
+
+
 class OrderItem(Base):
+    # Looked up through the covering indexes in Meta instead of plain FK indexes
     order = models.ForeignKey(
-        Order, on_delete=models.CASCADE, related_name="order_items"
+        Order, on_delete=models.CASCADE, related_name="order_items", db_index=False
     )
     product = models.ForeignKey(
-        Product, on_delete=models.CASCADE, related_name="order_items"
+        Product, on_delete=models.CASCADE, related_name="order_items", db_index=False
     )
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = OrderItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Order Item"
         verbose_name_plural = "Order Items"
         ordering = ("-created_at",)
+        indexes = [
+            # Sales and order totals are summed without reading the table
+            models.Index(
+                fields=["product"],
+                include=["quantity"],
+                name="orderitem_product_qty_idx",
+            ),
+            models.Index(
+                fields=["order"],
+                include=["price", "quantity"],
+                name="orderitem_order_total_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.quantity} x {self.product.name} (Order #{self.order.id})"
@@ -91,7 +452,7 @@ class OrderItem(Base):
         Automatically set the price based on the product's price
         when the OrderItem is created or updated.
         """
-        if not self.pk:  # Only set price on first save
+        if self._state.adding and self.price is None:  # Only set price on first save
             self.price = self.product.price
         super().save(*args, **kwargs)
 
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from commons.cache import invalidate_cache
+from commons.constants import DISCOUNTS_CACHE_NAMESPACE
+from orders.models import Discount
+
+
+@receiver(post_save, sender=Discount)
+@receiver(post_delete, sender=Discount)
+def invalidate_discount_index(sender, instance: Discount, **kwargs) -> None:
+    # Processes rebuild their index on the next order they price. The
+    # version is bumped again on commit, so an index another process
+    # cached from the discounts before the commit is not reused.
+    invalidate_cache(DISCOUNTS_CACHE_NAMESPACE)
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from orders.views.orders import (
+    BulkOrderCreateView,
+    OrderCancelView,
+    OrderExportView,
+    OrderItemExportView,
+)
+
+app_name = "orders"
+
+urlpatterns = [
+    path("bulk-create/", BulkOrderCreateView.as_view(), name="bulk-create"),
+    path("<uuid:id>/cancel/", OrderCancelView.as_view(), name="cancel"),
+    path("export/", OrderExportView.as_view(), name="export"),
+    path("items/export/", OrderItemExportView.as_view(), name="items-export"),
+]
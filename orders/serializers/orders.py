@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from commons.constants import BULK_ORDER_CREATE_LIMIT, OrderStatus
+from commons.errors import ErrorCodes
+from orders.models import Order
+from products.models import Product
+from users.models import Customer
+
+
+class OrderItemCreateSerializer(serializers.Serializer):
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class OrderCreateSerializer(serializers.Serializer):
+    customer = serializers.UUIDField()
+    status = serializers.ChoiceField(
+        choices=[status.value for status in OrderStatus],
+        default=OrderStatus.PENDING.value,
+    )
+    discount_applied = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=Decimal("0"),
+        max_value=Decimal("100"),
+        required=False,
+    )
+    items = OrderItemCreateSerializer(many=True, allow_empty=False)
+
+
+class BulkOrderCreateSerializer(serializers.Serializer):
+    orders = OrderCreateSerializer(
+        many=True, allow_empty=False, max_length=BULK_ORDER_CREATE_LIMIT
+    )
+
+    def validate_orders(self, orders: list[dict]) -> list[dict]:
+        """Replace customer and product ids with instances, one query each."""
+        customers = Customer.objects.in_bulk({order["customer"] for order in orders})
+        products = (
+            Product.objects.filter(is_active=True)
+            .only("id", "price")
+            .in_bulk({item["product"] for order in orders for item in order["items"]})
+        )
+
+        errors = []
+        for order in orders:
+            order_errors = {}
+            if order["customer"] not in customers:
+                order_errors["customer"] = [ErrorCodes.CUSTOMER_DOES_NOT_EXIST.value]
+            else:
+                order["customer"] = customers[order["customer"]]
+
+            item_errors = []
+            for item in order["items"]:
+                if item["product"] not in products:
+                    item_errors.append(
+                        {"product": [ErrorCodes.PRODUCT_DOES_NOT_EXIST.value]}
+                    )
+                else:
+                    item["product"] = products[item["product"]]
+                    item_errors.append({})
+            if any(item_errors):
+                order_errors["items"] = item_errors
+            errors.append(order_errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return orders
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "created_at",
+            "customer",
+            "status",
+            "total_price",
+            "discount_applied",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,17 @@
+from django.dispatch import Signal
+
+# Sent with `orders=[...]` after Order.objects.bulk_create(),
+# which does not send post_save for the created orders.
+orders_bulk_created = Signal()
+
+# Sent with `order_items=[...]` after OrderItem.objects.bulk_create().
+order_items_bulk_created = Signal()
+
+# Sent with `order_ids=[...]` after Order.objects.cancel() rewrites
+# statuses with a single UPDATE, bypassing post_save.
+orders_bulk_updated = Signal()
+
+# Sent with `changes=[(created_at, status, amount), ...]` after
+# Order.objects.recalculate_total_prices() adds `amount` to the totals of
+# orders with a single UPDATE, bypassing post_save.
+order_totals_changed = Signal()
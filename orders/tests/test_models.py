@@ -1,9 +1,22 @@
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from uuid import uuid4
 
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now, timedelta
 
-from orders.models import Discount, DiscountType
+from analytics.models import DailyRevenue
+from commons.cache import get_cache_version, invalidate_cache
+from commons.constants import DISCOUNTS_CACHE_NAMESPACE, MembershipLevel, OrderStatus
+from orders.discounts import DiscountIndex
+from orders.models import Discount, DiscountType, Order, OrderItem
+from products.models import Product
+from users.models import Customer, User
 
 
 class DiscountModelTestCase(TestCase):
@@ -55,3 +68,229 @@ class DiscountModelTestCase(TestCase):
     def test_discount_str(self) -> None:
         """Test the __str__ method."""
         self.assertEqual(str(self.active_discount), "Active Discount (Flat: 50.00)")
+
+
+class DiscountIndexTestCase(TestCase):
+    def setUp(self) -> None:
+        self.now = now()
+        day = timedelta(days=1)
+        self.index = DiscountIndex(
+            [
+                (self.now - 10 * day, self.now + 10 * day, "PERCENTAGE", Decimal("5")),
+                (self.now - day, self.now + day, "PERCENTAGE", Decimal("20")),
+                (self.now - day, self.now, "FLAT", Decimal("50.00")),
+                (self.now + 5 * day, self.now + 6 * day, "FLAT", Decimal("500.00")),
+            ]
+        )
+
+    def test_best_at(self) -> None:
+        """Test the largest amount and percentage valid at a moment are found."""
+        day = timedelta(days=1)
+        self.assertEqual(self.index.best_at(self.now - 20 * day), (0, 0))
+        self.assertEqual(self.index.best_at(self.now - 5 * day), (0, 5))
+        # Discounts are still valid at their valid_until
+        self.assertEqual(self.index.best_at(self.now), (50, 20))
+        self.assertEqual(self.index.best_at(self.now + 2 * day), (0, 5))
+        self.assertEqual(self.index.best_at(self.now + 5 * day), (500, 5))
+        self.assertEqual(self.index.best_at(self.now + 20 * day), (0, 0))
+
+    def test_discount_applied(self) -> None:
+        """Test the better of amount and percentage is added to membership."""
+        # 50.00 off 100.00 is 50%, better than 20%
+        self.assertEqual(
+            self.index.discount_applied(Decimal("100.00"), self.now), Decimal("50.00")
+        )
+        # 50.00 off 1000.00 is 5%, so 20% applies, plus 10% for gold members
+        self.assertEqual(
+            self.index.discount_applied(
+                Decimal("1000.00"), self.now, MembershipLevel.GOLD.discount
+            ),
+            Decimal("30.00"),
+        )
+        # Amounts larger than the order take everything off
+        self.assertEqual(
+            self.index.discount_applied(Decimal("20.00"), self.now + timedelta(days=5)),
+            Decimal("100.00"),
+        )
+        self.assertIsNone(
+            self.index.discount_applied(Decimal("20.00"), self.now + timedelta(days=20))
+        )
+
+
+class DiscountPricingTestCase(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            name="john", email="john@email.com", password=uuid4().hex
+        )
+        self.customer = Customer.objects.create(
+            user=user, membership=MembershipLevel.SILVER.value
+        )
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=50
+        )
+        Discount.objects.create(
+            name="Sale",
+            type=DiscountType.PERCENTAGE.value,
+            value=Decimal("15.00"),
+            valid_from=now() - timedelta(days=1),
+            valid_until=now() + timedelta(days=1),
+        )
+        # Indexes built here hold discounts rolled back after each test
+        self.addCleanup(invalidate_cache, DISCOUNTS_CACHE_NAMESPACE)
+
+    def create_order(self, **kwargs) -> Order:
+        [order] = Order.objects.create_orders(
+            [
+                {
+                    "customer": self.customer,
+                    "items": [{"product": self.product, "quantity": 2}],
+                    **kwargs,
+                }
+            ]
+        )
+        return order
+
+    def test_orders_get_best_discount_and_membership_discount(self) -> None:
+        """Test 15% off plus 5% for silver members is applied to the total."""
+        order = self.create_order()
+        self.assertEqual(order.discount_applied, Decimal("20.00"))
+        self.assertEqual(order.total_price, Decimal("1600.00"))
+
+    def test_given_discount_is_kept(self) -> None:
+        """Test an explicit discount_applied is not replaced."""
+        order = self.create_order(discount_applied=Decimal("1.00"))
+        self.assertEqual(order.total_price, Decimal("1980.00"))
+
+    def test_discounts_are_not_queried_per_order(self) -> None:
+        """Test the index is reused until a discount changes."""
+        self.create_order()
+        with CaptureQueriesContext(connection) as context:
+            self.create_order()
+        self.assertFalse(
+            any("orders_discount" in query["sql"] for query in context.captured_queries)
+        )
+
+        Discount.objects.create(
+            name="Flash sale",
+            type=DiscountType.FLAT.value,
+            value=Decimal("1000.00"),
+            valid_from=now() - timedelta(hours=1),
+            valid_until=now() + timedelta(hours=1),
+        )
+        # 1000.00 off 2000.00 is 50%, plus 5% for silver members
+        self.assertEqual(self.create_order().discount_applied, Decimal("55.00"))
+
+    def test_index_cached_before_commit_is_not_reused(self) -> None:
+        """Test discounts read by another process before a commit are dropped."""
+        with self.captureOnCommitCallbacks(execute=True):
+            discount = Discount.objects.create(
+                name="Flash sale",
+                type=DiscountType.FLAT.value,
+                value=Decimal("1000.00"),
+                valid_from=now() - timedelta(hours=1),
+                valid_until=now() + timedelta(hours=1),
+            )
+            # Another process prices an order before the discount is committed
+            version = get_cache_version(DISCOUNTS_CACHE_NAMESPACE)
+            cache.set(f"discounts:{version}", [])
+            self.assertEqual(Discount.objects.index().best_at(now()), (0, 0))
+
+        self.assertEqual(Discount.objects.index().best_at(now()), (discount.value, 15))
+
+
+class OrderTotalPriceTestCase(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            name="john", email="john@email.com", password=uuid4().hex
+        )
+        self.customer = Customer.objects.create(user=user)
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock_quantity=50
+        )
+
+        self.order = Order.objects.create(
+            customer=self.customer, status=OrderStatus.COMPLETED.value
+        )
+        self.discounted_order = Order.objects.create(
+            customer=self.customer,
+            status=OrderStatus.COMPLETED.value,
+            discount_applied=Decimal("12.50"),
+        )
+        self.empty_order = Order.objects.create(
+            customer=self.customer, total_price=Decimal("10.00")
+        )
+        for order, quantity in [(self.order, 2), (self.discounted_order, 3)]:
+            OrderItem.objects.create(
+                order=order,
+                product=self.product,
+                quantity=quantity,
+                price=self.product.price,
+            )
+
+    def test_recalculate_total_prices_matches_calculate_total_price(self) -> None:
+        """Test the bulk update gives the same totals as the per-order method."""
+        updated = Order.objects.recalculate_total_prices(batch_size=2)
+        self.assertEqual(updated, 3)
+
+        for order in [self.order, self.discounted_order, self.empty_order]:
+            order.refresh_from_db()
+            bulk_total = order.total_price
+            order.calculate_total_price()
+            order.refresh_from_db()
+            self.assertEqual(bulk_total, order.total_price)
+
+        self.assertEqual(self.empty_order.total_price, Decimal("0.00"))
+
+    def test_recalculate_total_prices_refreshes_daily_revenue(self) -> None:
+        """Test the changes of the totals are applied to the revenue rollup."""
+        # Applied as deltas per batch rather than by re-aggregating the orders
+        with patch.object(DailyRevenue.objects, "rebuild") as rebuild:
+            Order.objects.recalculate_total_prices(batch_size=1)
+        rebuild.assert_not_called()
+
+        rollup = DailyRevenue.objects.get(status=OrderStatus.COMPLETED.value)
+        self.assertEqual(rollup.total, Decimal("4624.95"))
+        self.assertEqual(rollup.order_count, 2)
+        rollup = DailyRevenue.objects.get(status=OrderStatus.PENDING.value)
+        self.assertEqual(rollup.total, Decimal("0.00"))
+
+    def test_recalculate_order_totals_command(self) -> None:
+        """Test the command only recalculates orders with the given status."""
+        stdout = StringIO()
+        call_command(
+            "recalculate_order_totals",
+            status=OrderStatus.PENDING.value,
+            stdout=stdout,
+        )
+
+        self.assertIn("Recalculated 1 orders.", stdout.getvalue())
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal("0.00"))
+
+
+class OrderIndexTestCase(TestCase):
+    def explain(self, queryset) -> str:
+        # Tables are tiny in tests, so only check the indexes can be used
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        return queryset.explain()
+
+    def test_completed_revenue_uses_covering_partial_index(self) -> None:
+        """Test completed order totals by date are read from the index alone."""
+        plan = self.explain(
+            Order.objects.filter(
+                status=OrderStatus.COMPLETED.value,
+                created_at__gte=now() - timedelta(days=1),
+            )
+            .order_by()
+            .values("total_price")
+        )
+        self.assertIn("Index Only Scan using order_completed_created_idx", plan)
+
+    def test_sales_by_product_use_covering_index(self) -> None:
+        """Test quantities sold per product are read from the index alone."""
+        plan = self.explain(
+            OrderItem.objects.filter(product_id=uuid4()).order_by().values("quantity")
+        )
+        self.assertIn("Index Only Scan using orderitem_product_qty_idx", plan)
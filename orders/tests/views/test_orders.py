@@ -0,0 +1,321 @@
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+from functools import partial
+from unittest.mock import patch
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from analytics.models import ProductSales
+from commons.constants import MembershipLevel, OrderStatus
+from commons.tests.base import UserBaseAPITestCase
+from orders.models import Order, OrderItem
+from orders.views.orders import OrderExportView
+from products.models import Product
+from users.models import Customer
+
+
+class BulkOrderCreateViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.user = self.create_user()
+        self.customer = Customer.objects.create(
+            user=self.user, membership=MembershipLevel.BRONZE.value
+        )
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=100
+        )
+        self.phone = Product.objects.create(
+            name="Smartphone", price=Decimal("500.00"), stock_quantity=100
+        )
+        self.url = reverse("orders:bulk-create")
+        self.force_authenticate_staff_user()
+
+    def build_order(self, **kwargs) -> dict:
+        return {
+            "customer": str(self.customer.id),
+            "items": [
+                {"product": str(self.laptop.id), "quantity": 2},
+                {"product": str(self.phone.id), "quantity": 1},
+            ],
+            **kwargs,
+        }
+
+    def test_bulk_create_orders(self) -> None:
+        """Test orders and items are created with prices and totals."""
+        data = {
+            "orders": [
+                self.build_order(),
+                self.build_order(
+                    status=OrderStatus.COMPLETED.value, discount_applied="10.00"
+                ),
+            ]
+        }
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]["total_price"], "2500.00")
+        self.assertEqual(response.data[1]["total_price"], "2250.00")
+        self.assertEqual(response.data[1]["status"], OrderStatus.COMPLETED.value)
+
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.filter(product=self.laptop).count(), 2)
+        self.assertEqual(
+            OrderItem.objects.filter(product=self.phone).first().price,
+            self.phone.price,
+        )
+        self.assertEqual(ProductSales.objects.get(product=self.laptop).total_sold, 4)
+
+    def test_bulk_create_query_count_is_independent_of_size(self) -> None:
+        """Test prices and inserts are batched rather than issued per item."""
+        # The first request also creates the analytics rollup rows
+        query_counts = []
+        for size in [1, 5, 20]:
+            data = {"orders": [self.build_order() for _ in range(size)]}
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(query_counts[1], query_counts[2])
+
+    def test_bulk_create_reserves_stock(self) -> None:
+        """Test stock is taken for open orders but not for cancelled ones."""
+        data = {
+            "orders": [
+                self.build_order(),
+                self.build_order(status=OrderStatus.CANCELLED.value),
+            ]
+        }
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.laptop.refresh_from_db()
+        self.phone.refresh_from_db()
+        self.assertEqual(self.laptop.stock_quantity, 98)
+        self.assertEqual(self.phone.stock_quantity, 99)
+
+    def test_insufficient_stock_is_rejected(self) -> None:
+        """Test no orders are created or stock taken when a product runs out."""
+        order = self.build_order()
+        order["items"][0]["quantity"] = 60
+        response = self.client.post(self.url, {"orders": [order, order]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["products"], [str(self.laptop.id)])
+        self.assertFalse(Order.objects.exists())
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock_quantity, 100)
+
+    def test_insufficient_stock_in_a_later_batch_is_rejected(self) -> None:
+        """Test earlier batches are rolled back when a later one runs out."""
+        order = self.build_order()
+        order["items"][0]["quantity"] = 60
+        create_orders = partial(Order.objects.create_orders, batch_size=1)
+        with patch.object(Order.objects, "create_orders", create_orders):
+            response = self.client.post(
+                self.url, {"orders": [order, order]}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock_quantity, 100)
+
+    def test_unknown_product_is_rejected(self) -> None:
+        """Test no orders are created when a product does not exist."""
+        order = self.build_order()
+        order["items"].append({"product": str(uuid4()), "quantity": 1})
+        response = self.client.post(self.url, {"orders": [order]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("product", response.data["orders"][0]["items"][2])
+        self.assertFalse(Order.objects.exists())
+
+    def test_non_staff_users_cannot_bulk_create_orders(self) -> None:
+        """Test only staff users can create orders."""
+        self.force_authenticate_user()
+        response = self.client.post(
+            self.url, {"orders": [self.build_order()]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrderCancelViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        customer = Customer.objects.create(user=self.create_user())
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=10
+        )
+        [self.order] = Order.objects.create_orders(
+            [
+                {
+                    "customer": customer,
+                    "items": [{"product": self.product, "quantity": 4}],
+                }
+            ]
+        )
+        self.url = reverse("orders:cancel", kwargs={"id": self.order.id})
+        self.force_authenticate_staff_user()
+
+    def test_cancel_order_releases_stock(self) -> None:
+        """Test cancelling puts stock back once, however often it is repeated."""
+        for _ in range(2):
+            response = self.client.post(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["status"], OrderStatus.CANCELLED.value)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 10)
+
+    def test_saving_an_order_as_cancelled_releases_stock(self) -> None:
+        """Test stock is put back once when the order is cancelled via save()."""
+        stale = Order.objects.get(pk=self.order.pk)
+        self.order.status = OrderStatus.CANCELLED.value
+        self.order.save()
+        stale.status = OrderStatus.CANCELLED.value
+        stale.save()
+
+        self.order.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertFalse(self.order.stock_reserved)
+        self.assertEqual(self.product.stock_quantity, 10)
+
+    def test_failed_save_as_cancelled_keeps_stock_reserved(self) -> None:
+        """Test stock is only put back if the cancelled order is saved."""
+        self.order.status = OrderStatus.CANCELLED.value
+        with patch.object(Model, "save", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.order.save()
+
+        self.order.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertTrue(self.order.stock_reserved)
+        self.assertEqual(self.product.stock_quantity, 6)
+
+    def test_cancel_unknown_order(self) -> None:
+        """Test cancelling an order that does not exist is not found."""
+        url = reverse("orders:cancel", kwargs={"id": uuid4()})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderExportViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.user = self.create_user()
+        self.customer = Customer.objects.create(user=self.user)
+        self.completed_orders = [
+            Order.objects.create(
+                customer=self.customer,
+                status=OrderStatus.COMPLETED.value,
+                total_price=Decimal("10.10") * index,
+            )
+            for index in range(1, 6)
+        ]
+        Order.objects.create(customer=self.customer, total_price=Decimal("99.99"))
+        self.url = reverse("orders:export")
+        self.force_authenticate_staff_user()
+
+    def read_csv(self, content: bytes) -> list[dict]:
+        return list(csv.DictReader(io.StringIO(content.decode())))
+
+    def test_export_orders_as_csv(self) -> None:
+        """Test every order is streamed as a CSV row with exact totals."""
+        # Fetch a row at a time to cover reading across cursor chunks
+        with patch.object(OrderExportView, "chunk_size", 1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        rows = self.read_csv(self.get_streaming_content(response))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(list(rows[0]), OrderExportView.export_fields)
+        self.assertEqual(
+            sorted(row["total_price"] for row in rows),
+            ["10.10", "20.20", "30.30", "40.40", "50.50", "99.99"],
+        )
+
+    def test_export_filtered_orders_as_ndjson(self) -> None:
+        """Test NDJSON exports have one object per line and honour filters."""
+        response = self.client.get(
+            self.url, {"format": "ndjson", "status": OrderStatus.COMPLETED.value}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = self.get_streaming_content(response).decode().splitlines()
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual(
+            {order["id"] for order in orders},
+            {str(order.id) for order in self.completed_orders},
+        )
+        self.assertEqual(orders[0]["customer_id"], str(self.customer.id))
+
+    def test_export_is_gzipped_when_accepted(self) -> None:
+        """Test the stream is compressed for clients accepting gzip."""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(self.get_streaming_content(response))
+        self.assertEqual(len(self.read_csv(content)), 6)
+
+    def test_export_is_streamed_in_chunks_under_wsgi(self) -> None:
+        """Test WSGI responses are read from a sync iterator, a chunk at a time."""
+        with (
+            patch.object(OrderExportView, "chunk_size", 2),
+            patch("commons.views.EXPORT_BUFFER_SIZE", 100),
+        ):
+            response = self.client.get(self.url)
+            self.assertFalse(response.is_async)
+
+            chunks = iter(response.streaming_content)
+            first_chunk = next(chunks)
+            self.assertTrue(first_chunk.startswith(b"id,customer_id,status"))
+            self.assertLess(len(first_chunk), 250)
+            rest = list(chunks)
+
+        self.assertGreater(len(rest), 1)
+        self.assertEqual(len(self.read_csv(first_chunk + b"".join(rest))), 6)
+
+    async def test_export_is_streamed_asynchronously_under_asgi(self) -> None:
+        """Test ASGI responses are read from an async iterator."""
+        token = await sync_to_async(self.create_access_token)(self.staff_user)
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(self.read_csv(content)), 6)
+
+    def test_export_order_items(self) -> None:
+        """Test order items are exported with their order and product."""
+        product = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=50
+        )
+        OrderItem.objects.create(
+            order=self.completed_orders[0], product=product, quantity=3
+        )
+
+        response = self.client.get(reverse("orders:items-export"))
+
+        rows = self.read_csv(self.get_streaming_content(response))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["product_id"], str(product.id))
+        self.assertEqual(rows[0]["price"], "1000.00")
+
+    def test_non_staff_users_cannot_export_orders(self) -> None:
+        """Test only staff users can export orders."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
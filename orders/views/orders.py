@@ -0,0 +1,83 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from commons.views import ExportView
+from orders.models import Order, OrderItem
+from orders.serializers.orders import BulkOrderCreateSerializer, OrderSerializer
+
+
+class BulkOrderCreateView(APIView):
+    """Create many orders and their items in one request."""
+
+    @extend_schema(
+        request=BulkOrderCreateSerializer, responses=OrderSerializer(many=True)
+    )
+    def post(self, request) -> Response:
+        input_serializer = BulkOrderCreateSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        # All batches commit together, so a rejected request leaves nothing
+        # behind and can be retried without creating duplicates
+        try:
+            with transaction.atomic():
+                orders = Order.objects.create_orders(
+                    input_serializer.validated_data["orders"]
+                )
+        except ValidationError as error:
+            raise serializers.ValidationError(
+                {"stock": error.messages, "products": error.params["product_ids"]}
+            )
+
+        serializer = OrderSerializer(orders, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class OrderCancelView(APIView):
+    """Cancel an order and put the stock it reserved back."""
+
+    @extend_schema(request=None, responses=OrderSerializer)
+    def post(self, request, id) -> Response:
+        order = get_object_or_404(Order, id=id)
+        order.cancel()
+
+        serializer = OrderSerializer(order)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class OrderExportView(ExportView):
+    """Export orders as CSV or NDJSON."""
+
+    queryset = Order.objects.all()
+    export_name = "orders"
+    export_fields = [
+        "id",
+        "customer_id",
+        "status",
+        "total_price",
+        "discount_applied",
+        "created_at",
+        "updated_at",
+    ]
+    filterset_fields = {"status": ["exact"], "created_at": ["gte", "lt"]}
+
+
+class OrderItemExportView(ExportView):
+    """Export order items as CSV or NDJSON."""
+
+    queryset = OrderItem.objects.all()
+    export_name = "order-items"
+    export_fields = [
+        "id",
+        "order_id",
+        "product_id",
+        "quantity",
+        "price",
+        "created_at",
+        "updated_at",
+    ]
+    filterset_fields = {"created_at": ["gte", "lt"]}
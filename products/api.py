@@ -1,7 +1,8 @@
 from django.urls import include, path
 
-from products.routes import categories
+from products.routes import categories, products
 
 urlpatterns = [
     path("categories/", include((categories.urlpatterns, "categories"))),
+    path("products/", include((products.urlpatterns, "products"))),
 ]
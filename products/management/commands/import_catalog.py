@@ -0,0 +1,44 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from commons.constants import CatalogFormat
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Create or update products, matched by sku, from a CSV or NDJSON file."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="Path of the catalog file.")
+        parser.add_argument(
+            "--format",
+            choices=[format.value for format in CatalogFormat],
+            help="Format of the file, by default taken from its extension.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        path = options["path"]
+        format = options["format"] or (
+            CatalogFormat.NDJSON.value
+            if path.endswith((".ndjson", ".jsonl"))
+            else CatalogFormat.CSV.value
+        )
+
+        try:
+            with open(path, "rb") as file:
+                result = Product.objects.import_catalog(file, format=format)
+        except OSError as error:
+            raise CommandError(error)
+        except ValidationError as error:
+            raise CommandError(" ".join(error.messages))
+
+        if result.unknown_suppliers:
+            self.stderr.write(
+                f"Unknown suppliers: {', '.join(result.unknown_suppliers)}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, updated {result.updated} and "
+                f"rejected {result.rejected} products."
+            )
+        )
@@ -0,0 +1,69 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+
+from commons.constants import REORDER_ALERT_CHUNK_SIZE, REORDER_ALERT_EMAIL_BATCH_SIZE
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Email each supplier one list of their products that are below the "
+        "reorder threshold. Meant to be run periodically, e.g. from cron."
+    )
+
+    def handle(self, *args, **options) -> None:
+        # Streamed in supplier order, straight off product_low_stock_idx,
+        # so only one supplier's products are held in memory at a time
+        rows = (
+            Product.objects.low_stock()
+            .filter(supplier__isnull=False)
+            .order_by("supplier_id", "name")
+            .values_list(
+                "supplier_id",
+                "supplier__name",
+                "supplier__email",
+                "sku",
+                "name",
+                "stock_quantity",
+                "reorder_threshold",
+            )
+            .iterator(chunk_size=REORDER_ALERT_CHUNK_SIZE)
+        )
+
+        messages, sent = [], 0
+        for (_, name, email), products in groupby(rows, key=lambda row: row[:3]):
+            messages.append(self.build_message(name, email, list(products)))
+            if len(messages) == REORDER_ALERT_EMAIL_BATCH_SIZE:
+                sent += self.send(messages)
+                messages = []
+        sent += self.send(messages)
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reorder alerts."))
+
+    @staticmethod
+    def build_message(name: str, email: str, products: list[tuple]) -> EmailMessage:
+        lines = [
+            f"- {product_name}{f' ({sku})' if sku else ''}: "
+            f"{stock_quantity} in stock, reorder at {reorder_threshold}"
+            for *_, sku, product_name, stock_quantity, reorder_threshold in products
+        ]
+        body = "\n".join(
+            [f"Hello {name},", "", "The following products need restocking:", ""]
+            + lines
+        )
+        return EmailMessage(
+            subject=f"Reorder request: {len(products)} products",
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+        )
+
+    @staticmethod
+    def send(messages: list[EmailMessage]) -> int:
+        if not messages:
+            return 0
+        # One SMTP connection per batch rather than per supplier
+        return get_connection().send_messages(messages) or 0
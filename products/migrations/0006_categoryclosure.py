@@ -0,0 +1,74 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    """Backfill closure rows for categories created before the table existed."""
+    Category = apps.get_model("products", "Category")
+    CategoryClosure = apps.get_model("products", "CategoryClosure")
+
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    links = []
+    for category_id in parents:
+        ancestor_id, depth = category_id, 0
+        while ancestor_id is not None:
+            links.append(
+                CategoryClosure(
+                    ancestor_id=ancestor_id, descendant_id=category_id, depth=depth
+                )
+            )
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    CategoryClosure.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0005_alter_category_options_category_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryClosure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField()),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="products.category",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="products.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Category Closure",
+                "verbose_name_plural": "Category Closures",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ancestor", "descendant"),
+                        name="unique_category_closure",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
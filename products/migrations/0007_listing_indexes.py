@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0006_categoryclosure"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-created_at"], name="product_category_created_idx"
+            ),
+        ),
+    ]
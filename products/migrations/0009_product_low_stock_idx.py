@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0008_product_sku"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_active", True),
+                    ("stock_quantity__lt", models.F("reorder_threshold")),
+                ),
+                fields=["supplier", "name"],
+                name="product_low_stock_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,18 @@
-from django.db import models
+import csv
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import BinaryIO
 
-from commons.constants import SUPPLIER_SHARE
+from django.core.exceptions import ValidationError
+from django.db import DataError, connections, models, transaction
+
+from commons.cache import invalidate_cache
+from commons.constants import (
+    BEST_SELLING_PRODUCTS_CACHE_NAMESPACE,
+    SUPPLIER_SHARE,
+    CatalogFormat,
+)
+from commons.errors import ErrorCodes
 from commons.models import Base
 
 
@@ -22,6 +34,102 @@ class Category(Base):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Keep the closure table in sync when a category is created
+        or moved under a different parent.
+        """
+        with transaction.atomic():
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                self._insert_closure()
+                return
+
+            old_parent_id = (
+                Category.objects.filter(pk=self.pk)
+                .values_list("parent_id", flat=True)
+                .first()
+            )
+            super().save(*args, **kwargs)
+            if old_parent_id != self.parent_id:
+                self._move_closure()
+
+    def get_descendants(self, include_self: bool = False) -> models.QuerySet:
+        """Return every category below this one, at any depth."""
+        descendants = Category.objects.filter(ancestor_links__ancestor=self)
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
+
+    def _insert_closure(self) -> None:
+        """Link a new category to itself and to all ancestors of its parent."""
+        links = [CategoryClosure(ancestor_id=self.pk, descendant_id=self.pk, depth=0)]
+        if self.parent_id:
+            links += [
+                CategoryClosure(
+                    ancestor_id=ancestor_id, descendant_id=self.pk, depth=depth + 1
+                )
+                for ancestor_id, depth in CategoryClosure.objects.filter(
+                    descendant_id=self.parent_id
+                ).values_list("ancestor_id", "depth")
+            ]
+        CategoryClosure.objects.bulk_create(links)
+
+    def _move_closure(self) -> None:
+        """Detach this subtree from its old ancestors and attach it to the new ones."""
+        subtree = dict(
+            CategoryClosure.objects.filter(ancestor_id=self.pk).values_list(
+                "descendant_id", "depth"
+            )
+        )
+        if self.parent_id in subtree:
+            raise ValidationError("A category cannot be moved under its own subtree.")
+
+        CategoryClosure.objects.filter(descendant_id__in=subtree).exclude(
+            ancestor_id__in=subtree
+        ).delete()
+
+        if not self.parent_id:
+            return
+
+        ancestors = CategoryClosure.objects.filter(
+            descendant_id=self.parent_id
+        ).values_list("ancestor_id", "depth")
+        CategoryClosure.objects.bulk_create(
+            CategoryClosure(
+                ancestor_id=ancestor_id,
+                descendant_id=descendant_id,
+                depth=ancestor_depth + 1 + descendant_depth,
+            )
+            for ancestor_id, ancestor_depth in ancestors
+            for descendant_id, descendant_depth in subtree.items()
+        )
+
+
+class CategoryClosure(models.Model):
+    """
+    Ancestor/descendant pairs for every category, including a
+    zero-depth link from each category to itself.
+    Rows are removed together with either category through CASCADE.
+    """
+
+    ancestor = models.ForeignKey(
+        "Category", on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        "Category", on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "Category Closure"
+        verbose_name_plural = "Category Closures"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="unique_category_closure"
+            )
+        ]
+
 
 class Supplier(Base):
     name = models.CharField(max_length=255)
@@ -36,7 +144,354 @@ class Supplier(Base):
         return self.name
 
 
+# Fields of a catalog import; sku, name and price are required
+CATALOG_COLUMNS = [
+    "sku",
+    "name",
+    "description",
+    "price",
+    "stock_quantity",
+    "reorder_threshold",
+    "is_active",
+    "category",
+    "supplier",
+]
+CATALOG_REQUIRED_COLUMNS = {"sku", "name", "price"}
+
+CREATE_CATALOG_STAGING_SQL = """
+CREATE TEMPORARY TABLE product_import (
+    line bigserial,
+    {columns}
+) ON COMMIT DROP
+""".format(
+    columns=", ".join(f"{column} text" for column in CATALOG_COLUMNS),
+)
+
+# NDJSON is loaded a line at a time into `doc`; the quote and delimiter
+# are control characters so COPY passes the JSON text through untouched
+CREATE_CATALOG_LINES_SQL = """
+CREATE TEMPORARY TABLE product_import_lines (
+    line bigserial,
+    doc text
+) ON COMMIT DROP
+"""
+
+COPY_CATALOG_LINES_SQL = """
+COPY product_import_lines (doc) FROM STDIN
+WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02', ENCODING 'UTF8')
+"""
+
+INSERT_CATALOG_LINES_SQL = """
+INSERT INTO product_import ({columns})
+SELECT {fields}
+FROM (
+    SELECT line, doc::jsonb AS doc FROM product_import_lines
+    WHERE btrim(doc) <> ''
+) AS lines
+ORDER BY line
+""".format(
+    columns=", ".join(CATALOG_COLUMNS),
+    fields=", ".join(f"doc->>'{column}'" for column in CATALOG_COLUMNS),
+)
+
+# Rows without a sku, name or valid number are left out of the import
+REJECT_INVALID_CATALOG_ROWS_SQL = r"""
+DELETE FROM product_import
+WHERE NULLIF(btrim(sku), '') IS NULL
+    OR NULLIF(btrim(name), '') IS NULL
+    OR length(btrim(sku)) > %(sku_length)s
+    OR length(btrim(name)) > %(name_length)s
+    OR length(btrim(category)) > %(category_length)s
+    OR btrim(price) !~ '^\d{1,8}(\.\d{1,2})?$'
+    OR btrim(stock_quantity) !~ '^\d{0,9}$'
+    OR btrim(reorder_threshold) !~ '^\d{0,9}$'
+    OR lower(btrim(is_active)) NOT IN ('', 'true', 'false', '1', '0', 'yes', 'no')
+"""
+
+# Of several rows with the same sku, the last one wins
+DEDUPLICATE_CATALOG_ROWS_SQL = """
+DELETE FROM product_import
+WHERE line IN (
+    SELECT line FROM (
+        SELECT line,
+            row_number() OVER (PARTITION BY btrim(sku) ORDER BY line DESC) AS n
+        FROM product_import
+    ) AS duplicates
+    WHERE n > 1
+)
+"""
+
+MISSING_CATALOG_CATEGORIES_SQL = """
+SELECT DISTINCT btrim(category) FROM product_import
+WHERE NULLIF(btrim(category), '') IS NOT NULL
+EXCEPT
+SELECT name FROM {category_table}
+"""
+
+REJECT_UNKNOWN_SUPPLIER_ROWS_SQL = """
+DELETE FROM product_import
+WHERE NULLIF(btrim(supplier), '') IS NOT NULL
+    AND btrim(supplier) NOT IN (SELECT name FROM {supplier_table})
+RETURNING btrim(supplier)
+"""
+
+# Rows with their category and supplier resolved by name, the oldest
+# one winning when several share a name. Optional fields left blank are
+# NULL, so updates keep the current values and inserts use the defaults.
+RESOLVED_CATALOG_ROWS_SQL = """
+SELECT
+    btrim(i.sku) AS sku,
+    btrim(i.name) AS name,
+    NULLIF(i.description, '') AS description,
+    btrim(i.price)::numeric AS price,
+    NULLIF(btrim(i.stock_quantity), '')::integer AS stock_quantity,
+    NULLIF(btrim(i.reorder_threshold), '')::integer AS reorder_threshold,
+    lower(NULLIF(btrim(i.is_active), '')) IN ('true', '1', 'yes') AS is_active,
+    NULLIF(btrim(i.is_active), '') IS NULL AS is_active_blank,
+    c.id AS category_id,
+    s.id AS supplier_id
+FROM product_import AS i
+LEFT JOIN (
+    SELECT DISTINCT ON (name) name, id FROM {category_table}
+    ORDER BY name, created_at
+) AS c ON c.name = btrim(i.category)
+LEFT JOIN (
+    SELECT DISTINCT ON (name) name, id FROM {supplier_table}
+    ORDER BY name, created_at
+) AS s ON s.name = btrim(i.supplier)
+"""
+
+UPDATE_CATALOG_PRODUCTS_SQL = """
+UPDATE {product_table} AS p
+SET name = r.name,
+    description = COALESCE(r.description, p.description),
+    price = r.price,
+    stock_quantity = COALESCE(r.stock_quantity, p.stock_quantity),
+    reorder_threshold = COALESCE(r.reorder_threshold, p.reorder_threshold),
+    is_active = CASE WHEN r.is_active_blank THEN p.is_active ELSE r.is_active END,
+    category_id = COALESCE(r.category_id, p.category_id),
+    supplier_id = COALESCE(r.supplier_id, p.supplier_id),
+    updated_at = NOW()
+FROM ({resolved}) AS r
+WHERE p.sku = r.sku
+"""
+
+INSERT_CATALOG_PRODUCTS_SQL = """
+INSERT INTO {product_table} (
+    id, created_at, updated_at, sku, name, description, price,
+    stock_quantity, reorder_threshold, is_active, category_id, supplier_id
+)
+SELECT gen_random_uuid(), NOW(), NOW(), r.sku, r.name, r.description, r.price,
+    COALESCE(r.stock_quantity, 0), COALESCE(r.reorder_threshold, 10),
+    r.is_active OR r.is_active_blank, r.category_id, r.supplier_id
+FROM ({resolved}) AS r
+WHERE NOT EXISTS (SELECT 1 FROM {product_table} AS p WHERE p.sku = r.sku)
+ON CONFLICT (sku) DO NOTHING
+"""
+
+
+# Rows are locked in id order before they are updated, so concurrent
+# reservations sharing products queue on them instead of deadlocking.
+# The stock condition is re-checked against the latest committed row.
+RESERVE_STOCK_SQL = """
+WITH requested AS (
+    SELECT id, quantity FROM unnest(%s::uuid[], %s::integer[]) AS r(id, quantity)
+), locked AS (
+    SELECT p.id FROM {product_table} AS p
+    WHERE p.id IN (SELECT id FROM requested)
+    ORDER BY p.id
+    FOR NO KEY UPDATE
+)
+UPDATE {product_table} AS p
+SET stock_quantity = p.stock_quantity {operator} r.quantity,
+    updated_at = NOW()
+FROM requested AS r, locked AS l
+WHERE p.id = r.id AND l.id = r.id {condition}
+RETURNING p.id
+"""
+
+
+LOW_STOCK = models.Q(is_active=True, stock_quantity__lt=models.F("reorder_threshold"))
+
+
+@dataclass
+class CatalogImportResult:
+    created: int = 0
+    updated: int = 0
+    rejected: int = 0
+    unknown_suppliers: list[str] = field(default_factory=list)
+
+
+class ProductQuerySet(models.QuerySet):
+    def import_catalog(
+        self, file: BinaryIO, format: str = CatalogFormat.CSV.value
+    ) -> CatalogImportResult:
+        """
+        Create or update products, matched by sku, from a UTF-8 `file` in
+        CSV (with a header row) or NDJSON `format` with CATALOG_COLUMNS.
+
+        The file is loaded with COPY into a temporary table and merged
+        into the products table with set-based statements, all in one
+        transaction. Categories are matched by name and created when
+        missing; rows naming an unknown supplier, or with invalid values,
+        are rejected. Blank optional fields keep the current values.
+        """
+        connection = connections[self.db]
+        tables = {
+            "product_table": connection.ops.quote_name(self.model._meta.db_table),
+            "category_table": connection.ops.quote_name(Category._meta.db_table),
+            "supplier_table": connection.ops.quote_name(Supplier._meta.db_table),
+        }
+        resolved = RESOLVED_CATALOG_ROWS_SQL.format(**tables)
+        result = CatalogImportResult()
+
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            cursor.execute(CREATE_CATALOG_STAGING_SQL)
+            try:
+                # copy_expert() bypasses Django's wrapping of driver errors
+                with connection.wrap_database_errors:
+                    if format == CatalogFormat.NDJSON.value:
+                        cursor.execute(CREATE_CATALOG_LINES_SQL)
+                        cursor.copy_expert(COPY_CATALOG_LINES_SQL, file)
+                        cursor.execute(INSERT_CATALOG_LINES_SQL)
+                    else:
+                        self._copy_catalog_csv(cursor, file)
+            except DataError:
+                raise ValidationError(ErrorCodes.INVALID_CATALOG.value)
+            cursor.execute("ANALYZE product_import")
+
+            cursor.execute(
+                REJECT_INVALID_CATALOG_ROWS_SQL,
+                {
+                    "sku_length": self.model._meta.get_field("sku").max_length,
+                    "name_length": self.model._meta.get_field("name").max_length,
+                    "category_length": Category._meta.get_field("name").max_length,
+                },
+            )
+            result.rejected = cursor.rowcount
+            cursor.execute(DEDUPLICATE_CATALOG_ROWS_SQL)
+
+            cursor.execute(REJECT_UNKNOWN_SUPPLIER_ROWS_SQL.format(**tables))
+            unknown_suppliers = [name for (name,) in cursor.fetchall()]
+            result.rejected += len(unknown_suppliers)
+            result.unknown_suppliers = sorted(set(unknown_suppliers))
+
+            # Only the rows left are imported, so categories are created for
+            # those alone. Few distinct names, created through the ORM to
+            # keep the category closure table in sync.
+            cursor.execute(MISSING_CATALOG_CATEGORIES_SQL.format(**tables))
+            for (name,) in cursor.fetchall():
+                Category.objects.using(self.db).create(name=name)
+
+            cursor.execute(
+                UPDATE_CATALOG_PRODUCTS_SQL.format(resolved=resolved, **tables)
+            )
+            result.updated = cursor.rowcount
+            cursor.execute(
+                INSERT_CATALOG_PRODUCTS_SQL.format(resolved=resolved, **tables)
+            )
+            result.created = cursor.rowcount
+
+        invalidate_cache(BEST_SELLING_PRODUCTS_CACHE_NAMESPACE)
+        return result
+
+    def low_stock(self) -> "ProductQuerySet":
+        """
+        Active products with stock below their reorder threshold, the
+        database-side equivalent of Product.needs_reorder(). The filter
+        matches the condition of the partial `product_low_stock_idx`,
+        so only products that need reordering are read.
+        """
+        return self.filter(LOW_STOCK)
+
+    def reorder_report(self) -> models.QuerySet:
+        """
+        Per supplier, the number of low-stock products and the units needed
+        to bring them back to their reorder thresholds.
+        """
+        return (
+            self.low_stock()
+            .filter(supplier__isnull=False)
+            .values("supplier_id", "supplier__name", "supplier__email")
+            .annotate(
+                product_count=models.Count("id"),
+                shortfall=models.Sum(
+                    models.F("reorder_threshold") - models.F("stock_quantity")
+                ),
+            )
+            .order_by("supplier__name", "supplier_id")
+        )
+
+    def reserve_stock(self, quantities: dict) -> None:
+        """
+        Take `quantities`, a mapping of product id to quantity, out of stock
+        with one conditional UPDATE. Either every product has enough stock
+        and all are decremented, or none are and ValidationError is raised
+        with the ids of the products short of stock in `params`.
+        """
+        with transaction.atomic(using=self.db):
+            updated = self._update_stock(quantities, reserve=True)
+            missing = sorted(
+                str(product_id)
+                for product_id, quantity in quantities.items()
+                if quantity and str(product_id) not in updated
+            )
+            if missing:
+                raise ValidationError(
+                    ErrorCodes.INSUFFICIENT_STOCK.value,
+                    code="insufficient_stock",
+                    params={"product_ids": missing},
+                )
+
+    def release_stock(self, quantities: dict) -> None:
+        """Put `quantities`, a mapping of product id to quantity, back in stock."""
+        self._update_stock(quantities, reserve=False)
+
+    def _update_stock(self, quantities: dict, reserve: bool) -> set[str]:
+        """Apply `quantities` to stock and return the ids of updated products."""
+        quantities = {
+            str(product_id): quantity
+            for product_id, quantity in quantities.items()
+            if quantity
+        }
+        if not quantities:
+            return set()
+
+        sql = RESERVE_STOCK_SQL.format(
+            product_table=connections[self.db].ops.quote_name(
+                self.model._meta.db_table
+            ),
+            operator="-" if reserve else "+",
+            condition="AND p.stock_quantity >= r.quantity" if reserve else "",
+        )
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, [list(quantities), list(quantities.values())])
+            return {str(product_id) for (product_id,) in cursor.fetchall()}
+
+    @staticmethod
+    def _copy_catalog_csv(cursor, file: BinaryIO) -> None:
+        """COPY the rows after the header, into the columns the header names."""
+        header = file.readline().decode("utf-8-sig")
+        try:
+            columns = [
+                column.strip().lower()
+                for column in next(csv.reader([header], skipinitialspace=True), [])
+            ]
+        except csv.Error:
+            raise ValidationError(ErrorCodes.INVALID_CATALOG_COLUMNS.value)
+        known = CATALOG_REQUIRED_COLUMNS <= set(columns) <= set(CATALOG_COLUMNS)
+        if not known or len(set(columns)) != len(columns):
+            raise ValidationError(ErrorCodes.INVALID_CATALOG_COLUMNS.value)
+
+        cursor.copy_expert(
+            f"COPY product_import ({', '.join(columns)}) FROM STDIN "
+            "WITH (FORMAT csv, ENCODING 'UTF8')",
+            file,
+        )
+
+
 class Product(Base):
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -58,18 +513,33 @@ class Product(Base):
         blank=True,
     )
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["category", "-created_at"], name="product_category_created_idx"
+            ),
+            # Only the few products that need reordering, grouped by supplier
+            models.Index(
+                fields=["supplier", "name"],
+                condition=LOW_STOCK,
+                name="product_low_stock_idx",
+            ),
+        ]
 
     def needs_reorder(self) -> bool:
         """Check if the product stock is below the reorder threshold."""
         return self.stock_quantity < self.reorder_threshold
 
-    def supplier_share(self) -> float:
+    def supplier_share(self) -> Decimal:
         """Total cut of revenue for supplier."""
-        return float(self.price) * SUPPLIER_SHARE
+        return (self.price * SUPPLIER_SHARE).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
 
     def __str__(self) -> str:
         return self.name
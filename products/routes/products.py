@@ -0,0 +1,15 @@
+from django.urls import path
+
+from products.views.products import (
+    ProductExportView,
+    ProductImportView,
+    ReorderReportView,
+)
+
+app_name = "products"
+
+urlpatterns = [
+    path("import/", ProductImportView.as_view(), name="import"),
+    path("reorder-report/", ReorderReportView.as_view(), name="reorder-report"),
+    path("export/", ProductExportView.as_view(), name="export"),
+]
@@ -22,10 +22,16 @@ class ProductSerializer(serializers.ModelSerializer):
 
 
 class SubcategorySerializer(serializers.ModelSerializer):
-    """Recursive serializer for nested categories."""
+    """
+    Recursive serializer for nested categories.
+
+    When the context holds a preloaded `subcategories` and `products` map
+    (keyed by category id) the tree is assembled from memory instead of
+    querying each node's relations.
+    """
 
     subcategories = serializers.SerializerMethodField()
-    products = ProductSerializer(many=True, read_only=True)
+    products = serializers.SerializerMethodField()
 
     class Meta:
         model = Category
@@ -34,10 +40,21 @@ class SubcategorySerializer(serializers.ModelSerializer):
 
     def get_subcategories(self, obj) -> list | dict:
         # Recursive logic for subcategories
-        queryset = obj.subcategories.all()
-        serializer = SubcategorySerializer(queryset, many=True)
+        if "subcategories" in self.context:
+            queryset = self.context["subcategories"].get(obj.id, [])
+        else:
+            queryset = obj.subcategories.all()
+        serializer = SubcategorySerializer(queryset, many=True, context=self.context)
         return serializer.data
 
+    @extend_schema_field(ProductSerializer(many=True))
+    def get_products(self, obj):
+        if "products" in self.context:
+            queryset = self.context["products"].get(obj.id, [])
+        else:
+            queryset = obj.products.all()
+        return ProductSerializer(queryset, many=True).data
+
 
 class CategoryBaseSerializer(serializers.ModelSerializer):
     """Base Serializer for creating and listing categories."""
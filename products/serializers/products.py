@@ -0,0 +1,35 @@
+from rest_framework import serializers
+
+from commons.constants import CatalogFormat
+
+
+class ProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(
+        choices=[format.value for format in CatalogFormat], required=False
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        """Take the format from the file extension when it is not given."""
+        if "format" not in attrs:
+            attrs["format"] = (
+                CatalogFormat.NDJSON.value
+                if attrs["file"].name.endswith((".ndjson", ".jsonl"))
+                else CatalogFormat.CSV.value
+            )
+        return attrs
+
+
+class ProductImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    unknown_suppliers = serializers.ListField(child=serializers.CharField())
+
+
+class ReorderReportSerializer(serializers.Serializer):
+    supplier = serializers.UUIDField(source="supplier_id")
+    supplier_name = serializers.CharField(source="supplier__name")
+    supplier_email = serializers.EmailField(source="supplier__email")
+    product_count = serializers.IntegerField()
+    shortfall = serializers.IntegerField()
@@ -1,6 +1,14 @@
+import io
+import json
+import tempfile
+import threading
 from decimal import Decimal
 
-from django.test import TestCase
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 
 from commons.constants import SUPPLIER_SHARE
 from products.models import Category, Product, Supplier
@@ -57,6 +65,50 @@ class CategoryModelTests(TestCase):
         self.assertEqual(subcategory_2.parent, subcategory_1)
         self.assertEqual(subcategory_1.parent, parent_category)
 
+    def test_get_descendants(self) -> None:
+        """Test descendants at any depth are returned from the closure table."""
+        parent_category = Category.objects.create(name="Electronics")
+        subcategory_1 = Category.objects.create(name="Laptops", parent=parent_category)
+        subcategory_2 = Category.objects.create(
+            name="Gaming Laptops", parent=subcategory_1
+        )
+
+        self.assertCountEqual(
+            parent_category.get_descendants(), [subcategory_1, subcategory_2]
+        )
+        self.assertCountEqual(
+            subcategory_1.get_descendants(include_self=True),
+            [subcategory_1, subcategory_2],
+        )
+        self.assertFalse(subcategory_2.get_descendants().exists())
+
+    def test_moving_category_updates_descendants(self) -> None:
+        """Test re-parenting a category moves its whole subtree."""
+        electronics = Category.objects.create(name="Electronics")
+        computers = Category.objects.create(name="Computers")
+        laptops = Category.objects.create(name="Laptops", parent=electronics)
+        gaming_laptops = Category.objects.create(name="Gaming Laptops", parent=laptops)
+
+        laptops.parent = computers
+        laptops.save()
+
+        self.assertFalse(electronics.get_descendants().exists())
+        self.assertCountEqual(computers.get_descendants(), [laptops, gaming_laptops])
+
+        laptops.parent = None
+        laptops.save()
+        self.assertFalse(computers.get_descendants().exists())
+        self.assertCountEqual(laptops.get_descendants(), [gaming_laptops])
+
+    def test_category_cannot_move_under_its_descendant(self) -> None:
+        """Test a category cannot become a child of its own subcategory."""
+        electronics = Category.objects.create(name="Electronics")
+        laptops = Category.objects.create(name="Laptops", parent=electronics)
+
+        electronics.parent = laptops
+        with self.assertRaises(ValidationError):
+            electronics.save()
+
 
 class ProductModelTestCase(TestCase):
     def setUp(self) -> None:
@@ -96,8 +148,275 @@ class ProductModelTestCase(TestCase):
         self.assertTrue(self.product.needs_reorder())
 
     def test_supplier_share(self) -> None:
-        expected_share = float(self.product.price) * SUPPLIER_SHARE
-        self.assertEqual(self.product.supplier_share(), expected_share)
+        # 999.99 * 0.70 = 699.993, rounded to cents without float error
+        self.assertEqual(SUPPLIER_SHARE, Decimal("0.70"))
+        self.assertEqual(self.product.supplier_share(), Decimal("699.99"))
 
     def test_product_str(self) -> None:
         self.assertEqual(str(self.product), "Smartphone")
+
+
+class CatalogImportTestCase(TestCase):
+    def setUp(self) -> None:
+        self.supplier = Supplier.objects.create(name="Acme", email="sales@acme.com")
+        self.laptop = Product.objects.create(
+            sku="LAP-1",
+            name="Laptop",
+            description="14 inch",
+            price=Decimal("1000.00"),
+            stock_quantity=50,
+        )
+
+    def import_csv(self, content: str):
+        return Product.objects.import_catalog(io.BytesIO(content.encode()))
+
+    def test_import_csv_creates_and_updates_products(self) -> None:
+        """Test rows are upserted by sku, keeping fields left blank."""
+        result = self.import_csv(
+            "sku,name,price,stock_quantity,category,supplier\n"
+            "LAP-1,Laptop Pro,1200.50,,Computers,Acme\n"
+            'CAB-1,"Cable, USB-C",5.99,100,Accessories,\n'
+        )
+
+        self.assertEqual((result.created, result.updated, result.rejected), (1, 1, 0))
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.name, "Laptop Pro")
+        self.assertEqual(self.laptop.price, Decimal("1200.50"))
+        self.assertEqual(self.laptop.stock_quantity, 50)
+        self.assertEqual(self.laptop.description, "14 inch")
+        self.assertEqual(self.laptop.category.name, "Computers")
+        self.assertEqual(self.laptop.supplier, self.supplier)
+
+        cable = Product.objects.get(sku="CAB-1")
+        self.assertEqual(cable.name, "Cable, USB-C")
+        self.assertEqual(cable.stock_quantity, 100)
+        self.assertEqual(cable.reorder_threshold, 10)
+        self.assertTrue(cable.is_active)
+        self.assertIsNone(cable.supplier)
+        # Categories are created through the ORM, so they are in the tree
+        self.assertEqual(list(cable.category.get_descendants()), [])
+
+    def test_import_rejects_values_too_long_for_their_columns(self) -> None:
+        """Test rows with an overlong sku, name or category are rejected."""
+        result = self.import_csv(
+            "sku,name,price,category\n"
+            f"{'S' * 65},Cable,5.99,\n"
+            f"CAB-1,{'N' * 256},5.99,\n"
+            f"CAB-2,Cable,5.99,{'C' * 256}\n"
+            f"CAB-3,Cable,5.99,{'C' * 255}\n"
+        )
+
+        self.assertEqual((result.created, result.rejected), (1, 3))
+        self.assertEqual(Product.objects.get(sku="CAB-3").category.name, "C" * 255)
+
+    def test_import_rejects_invalid_rows(self) -> None:
+        """Test invalid rows and unknown suppliers are skipped and counted."""
+        result = self.import_csv(
+            "sku,name,price,supplier,is_active\n"
+            ",No sku,1.00,,\n"
+            "BAD-1,Bad price,abc,,\n"
+            "BAD-2,Bad flag,1.00,,maybe\n"
+            "NEW-1,Unknown supplier,1.00,Globex,\n"
+            "NEW-2,First,1.00,,\n"
+            "NEW-2,Second,2.00,,false\n"
+        )
+
+        self.assertEqual((result.created, result.updated, result.rejected), (1, 0, 4))
+        self.assertEqual(result.unknown_suppliers, ["Globex"])
+        product = Product.objects.get(sku="NEW-2")
+        self.assertEqual(product.name, "Second")
+        self.assertFalse(product.is_active)
+
+    def test_rejected_rows_create_no_categories(self) -> None:
+        """Test categories are only created for rows that are imported."""
+        result = self.import_csv(
+            "sku,name,price,category,supplier\n"
+            "NEW-1,Unknown supplier,1.00,Gadgets,Globex\n"
+            "NEW-2,Bad price,abc,Toys,\n"
+        )
+
+        self.assertEqual((result.created, result.rejected), (0, 2))
+        self.assertFalse(Category.objects.filter(name__in=["Gadgets", "Toys"]).exists())
+
+    def test_import_csv_with_quoted_header(self) -> None:
+        """Test the header is parsed as CSV, quoted column names included."""
+        result = self.import_csv('"sku", "name","price"\nNEW-1,Cable,5.99\n')
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(Product.objects.get(sku="NEW-1").name, "Cable")
+
+    def test_import_ndjson(self) -> None:
+        """Test NDJSON objects are imported one per line."""
+        lines = [
+            {"sku": "LAP-1", "name": "Laptop", "price": "999.99"},
+            {"sku": "MOU-1", "name": 'Mouse "Pro"', "price": 25, "supplier": "Acme"},
+        ]
+        content = "\n".join(json.dumps(line) for line in lines) + "\n\n"
+
+        result = Product.objects.import_catalog(
+            io.BytesIO(content.encode()), format="ndjson"
+        )
+
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual(Product.objects.get(sku="MOU-1").name, 'Mouse "Pro"')
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.price, Decimal("999.99"))
+
+    def test_import_rejects_malformed_files(self) -> None:
+        """Test unknown columns and malformed files import nothing."""
+        with self.assertRaises(ValidationError):
+            self.import_csv("sku,name,colour\nA,B,red\n")
+        with self.assertRaises(ValidationError):
+            self.import_csv("sku,name,price\nA,B\n")
+        with self.assertRaises(ValidationError):
+            Product.objects.import_catalog(io.BytesIO(b"{not json"), format="ndjson")
+
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_import_catalog_command(self) -> None:
+        """Test the command imports a file and reports the counts."""
+        with tempfile.NamedTemporaryFile(suffix=".csv") as file:
+            file.write(b"sku,name,price\nKEY-1,Keyboard,45.00\n")
+            file.flush()
+            stdout = io.StringIO()
+            call_command("import_catalog", file.name, stdout=stdout)
+
+        self.assertIn("Created 1, updated 0 and rejected 0", stdout.getvalue())
+        self.assertTrue(Product.objects.filter(sku="KEY-1").exists())
+
+
+class StockReservationTestCase(TestCase):
+    def setUp(self) -> None:
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("1000.00"), stock_quantity=5
+        )
+        self.phone = Product.objects.create(
+            name="Phone", price=Decimal("500.00"), stock_quantity=1
+        )
+
+    def assertStock(self, laptop: int, phone: int) -> None:
+        self.laptop.refresh_from_db()
+        self.phone.refresh_from_db()
+        self.assertEqual(
+            (self.laptop.stock_quantity, self.phone.stock_quantity), (laptop, phone)
+        )
+
+    def test_reserve_and_release_stock(self) -> None:
+        """Test stock is decremented and put back for every product."""
+        Product.objects.reserve_stock({self.laptop.id: 5, self.phone.id: 1})
+        self.assertStock(0, 0)
+
+        Product.objects.release_stock({self.laptop.id: 2, self.phone.id: 1})
+        self.assertStock(2, 1)
+
+    def test_reservation_is_all_or_nothing(self) -> None:
+        """Test no stock is taken when any product is short."""
+        with self.assertRaises(ValidationError) as context:
+            Product.objects.reserve_stock({self.laptop.id: 2, self.phone.id: 2})
+
+        self.assertEqual(context.exception.params["product_ids"], [str(self.phone.id)])
+        self.assertStock(5, 1)
+
+
+class ConcurrentStockReservationTestCase(TransactionTestCase):
+    def test_concurrent_reservations_never_oversell(self) -> None:
+        """Test parallel checkouts of hot products neither oversell nor deadlock."""
+        products = [
+            Product.objects.create(
+                name=f"Product {index}", price=Decimal("1.00"), stock_quantity=30
+            )
+            for index in range(2)
+        ]
+        results = []
+
+        def checkout(index: int) -> None:
+            # Alternate the order products are listed in between checkouts
+            ordered = products if index % 2 else products[::-1]
+            try:
+                Product.objects.reserve_stock({product.id: 2 for product in ordered})
+                results.append(True)
+            except ValidationError:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 15)
+        self.assertEqual(results.count(False), 5)
+        for product in products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, 0)
+
+
+class LowStockTestCase(TestCase):
+    def setUp(self) -> None:
+        self.acme = Supplier.objects.create(name="Acme", email="sales@acme.com")
+        self.globex = Supplier.objects.create(name="Globex", email="orders@globex.com")
+        for name, stock, supplier in [
+            ("Laptop", 2, self.acme),
+            ("Mouse", 0, self.acme),
+            ("Keyboard", 50, self.acme),
+            ("Monitor", 9, self.globex),
+            ("Cable", 1, None),
+        ]:
+            Product.objects.create(
+                name=name,
+                price=Decimal("1.00"),
+                stock_quantity=stock,
+                supplier=supplier,
+            )
+        Product.objects.create(
+            name="Retired", price=Decimal("1.00"), stock_quantity=0, is_active=False
+        )
+
+    def test_low_stock_matches_needs_reorder(self) -> None:
+        """Test the query returns the active products needing a reorder."""
+        expected = {
+            product.name
+            for product in Product.objects.filter(is_active=True)
+            if product.needs_reorder()
+        }
+        self.assertEqual(
+            set(Product.objects.low_stock().values_list("name", flat=True)), expected
+        )
+
+    def test_low_stock_uses_partial_index(self) -> None:
+        """Test low-stock products per supplier are read from the partial index."""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = (
+            Product.objects.low_stock()
+            .filter(supplier=self.acme)
+            .order_by("supplier_id", "name")
+            .explain()
+        )
+        self.assertIn("product_low_stock_idx", plan)
+
+    def test_reorder_report(self) -> None:
+        """Test counts and shortfalls are grouped by supplier."""
+        report = list(Product.objects.reorder_report())
+
+        self.assertEqual(
+            [
+                (row["supplier__name"], row["product_count"], row["shortfall"])
+                for row in report
+            ],
+            [("Acme", 2, 18), ("Globex", 1, 1)],
+        )
+
+    def test_send_reorder_alerts_command(self) -> None:
+        """Test each supplier gets one email listing their products."""
+        stdout = io.StringIO()
+        call_command("send_reorder_alerts", stdout=stdout)
+
+        self.assertIn("Sent 2 reorder alerts.", stdout.getvalue())
+        emails = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(emails), {"sales@acme.com", "orders@globex.com"})
+        self.assertIn("Laptop", emails["sales@acme.com"].body)
+        self.assertIn("Mouse", emails["sales@acme.com"].body)
+        self.assertNotIn("Keyboard", emails["sales@acme.com"].body)
@@ -82,3 +82,28 @@ class CategoryViewTests(UserBaseAPITestCase):
         self.assertEqual(response.data["name"], "Electronics")
         self.assertEqual(len(response.data["subcategories"]), 1)
         self.assertEqual(len(response.data["subcategories"][0]["products"]), 2)
+
+    def test_nested_category_products_query_count_is_independent_of_depth(
+        self,
+    ) -> None:
+        """Test the nested tree is loaded in a constant number of queries."""
+        parent = self.subcategory
+        for depth in range(5):
+            parent = Category.objects.create(name=f"Level {depth}", parent=parent)
+            Product.objects.create(
+                name=f"Product {depth}",
+                price=Decimal("10.00"),
+                stock_quantity=1,
+                category=parent,
+            )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.nested_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        node = response.data["subcategories"][0]
+        self.assertEqual(len(node["products"]), 2)
+        for depth in range(5):
+            node = node["subcategories"][0]
+            self.assertEqual(node["name"], f"Level {depth}")
+            self.assertEqual(len(node["products"]), 1)
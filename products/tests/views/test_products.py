@@ -0,0 +1,122 @@
+import csv
+import io
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+
+from commons.tests.base import UserBaseAPITestCase
+from products.models import Category, Product, Supplier
+
+
+class ProductExportViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        category = Category.objects.create(name="Electronics")
+        supplier = Supplier.objects.create(name="Acme", email="sales@acme.com")
+        Product.objects.create(
+            name="Laptop",
+            price=Decimal("1000.00"),
+            stock_quantity=50,
+            category=category,
+            supplier=supplier,
+        )
+        Product.objects.create(
+            name="Cable", price=Decimal("5.50"), stock_quantity=0, is_active=False
+        )
+        self.url = reverse("products:export")
+        self.force_authenticate_staff_user()
+
+    def test_export_products_as_csv(self) -> None:
+        """Test products are exported with their category and supplier names."""
+        response = self.client.get(self.url, {"is_active": True})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = self.get_streaming_content(response).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["name"], "Laptop")
+        self.assertEqual(rows[0]["price"], "1000.00")
+        self.assertEqual(rows[0]["category__name"], "Electronics")
+        self.assertEqual(rows[0]["supplier__name"], "Acme")
+
+    def test_non_staff_users_cannot_export_products(self) -> None:
+        """Test only staff users can export products."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProductImportViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.url = reverse("products:import")
+        self.force_authenticate_staff_user()
+
+    def test_import_catalog_file(self) -> None:
+        """Test an uploaded catalog is imported with the format from its name."""
+        file = SimpleUploadedFile(
+            "catalog.ndjson",
+            b'{"sku": "LAP-1", "name": "Laptop", "price": "1000.00"}\n',
+        )
+        response = self.client.post(self.url, {"file": file}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(Product.objects.get(sku="LAP-1").price, Decimal("1000.00"))
+
+    def test_invalid_catalog_is_rejected(self) -> None:
+        """Test a catalog without the required columns is a bad request."""
+        file = SimpleUploadedFile("catalog.csv", b"name,price\nLaptop,1000.00\n")
+        response = self.client.post(self.url, {"file": file}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+
+    def test_non_staff_users_cannot_import_products(self) -> None:
+        """Test only staff users can import products."""
+        self.force_authenticate_user()
+        response = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ReorderReportViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.supplier = Supplier.objects.create(name="Acme", email="sales@acme.com")
+        Product.objects.create(
+            name="Laptop",
+            price=Decimal("1.00"),
+            stock_quantity=4,
+            supplier=self.supplier,
+        )
+        Product.objects.create(
+            name="Mouse",
+            price=Decimal("1.00"),
+            stock_quantity=40,
+            supplier=self.supplier,
+        )
+        self.url = reverse("products:reorder-report")
+        self.force_authenticate_staff_user()
+
+    def test_reorder_report(self) -> None:
+        """Test suppliers are listed with their low-stock products."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "supplier": str(self.supplier.id),
+                    "supplier_name": "Acme",
+                    "supplier_email": "sales@acme.com",
+                    "product_count": 1,
+                    "shortfall": 6,
+                }
+            ],
+        )
+
+    def test_non_staff_users_cannot_view_reorder_report(self) -> None:
+        """Test only staff users can view the reorder report."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
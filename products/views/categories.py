@@ -1,9 +1,11 @@
+from collections import defaultdict
+
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from commons.errors import ErrorCodes
-from products.models import Category
+from products.models import Category, Product
 from products.serializers.categories import (
     CategoryCreateSerializer,
     CategoryListSerializer,
@@ -47,6 +49,21 @@ class NestedCategoryProductsView(APIView):
                 {"detail": ErrorCodes.CATEGORY_DOES_NOT_EXIST.value}, status=404
             )
 
+        # Load the whole subtree and its products up front through the
+        # closure table, then assemble the tree in memory
+        subcategories = defaultdict(list)
+        for subcategory in category.get_descendants():
+            subcategories[subcategory.parent_id].append(subcategory)
+
+        products = defaultdict(list)
+        for product in Product.objects.filter(
+            category__ancestor_links__ancestor=category
+        ).only("id", "name", "is_active", "category_id"):
+            products[product.category_id].append(product)
+
         # Serialize the category with nested products and subcategories
-        serializer = SubcategorySerializer(category)
+        serializer = SubcategorySerializer(
+            category,
+            context={"subcategories": subcategories, "products": products},
+        )
         return Response(serializer.data)
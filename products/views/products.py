@@ -0,0 +1,70 @@
+from django.core.exceptions import ValidationError
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework.generics import ListAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from commons.views import ExportView
+from products.models import Product
+from products.serializers.products import (
+    ProductImportResultSerializer,
+    ProductImportSerializer,
+    ReorderReportSerializer,
+)
+
+
+class ProductImportView(APIView):
+    """Create or update products, matched by sku, from an uploaded catalog file."""
+
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(
+        request=ProductImportSerializer, responses=ProductImportResultSerializer
+    )
+    def post(self, request) -> Response:
+        input_serializer = ProductImportSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        try:
+            result = Product.objects.import_catalog(
+                input_serializer.validated_data["file"],
+                format=input_serializer.validated_data["format"],
+            )
+        except ValidationError as error:
+            raise serializers.ValidationError({"file": error.messages})
+
+        serializer = ProductImportResultSerializer(result)
+        return Response(serializer.data)
+
+
+class ReorderReportView(ListAPIView):
+    """Low-stock products per supplier, with the units needed to restock them."""
+
+    queryset = Product.objects.reorder_report()
+    serializer_class = ReorderReportSerializer
+
+
+class ProductExportView(ExportView):
+    """Export products with their category and supplier names as CSV or NDJSON."""
+
+    queryset = Product.objects.all()
+    export_name = "products"
+    export_fields = [
+        "id",
+        "sku",
+        "name",
+        "description",
+        "price",
+        "stock_quantity",
+        "reorder_threshold",
+        "is_active",
+        "category_id",
+        "category__name",
+        "supplier_id",
+        "supplier__name",
+        "created_at",
+        "updated_at",
+    ]
+    filterset_fields = {"is_active": ["exact"], "category": ["exact"]}
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from commons.constants import (
+    TOKEN_VERSION_CLAIM,
+    USER_SNAPSHOT_CACHE_TIMEOUT,
+    USER_SNAPSHOT_LOCAL_SIZE,
+    USER_SNAPSHOT_LOCAL_TTL,
+)
+from users.models import User
+
+# Everything authentication and the staff permissions read from a user
+USER_SNAPSHOT_FIELDS = ["id", "is_active", "is_staff", "is_superuser", "token_version"]
+
+
+class LocalSnapshotCache:
+    """Least recently used snapshots of this process, each kept for `ttl` seconds."""
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, snapshot = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return snapshot
+
+    def set(self, key: str, snapshot: dict) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+local_snapshots = LocalSnapshotCache(USER_SNAPSHOT_LOCAL_SIZE, USER_SNAPSHOT_LOCAL_TTL)
+
+
+def _snapshot_key(user_id) -> str:
+    return f"user-snapshot:{user_id}"
+
+
+def get_user_snapshot(user_id) -> dict | None:
+    """
+    USER_SNAPSHOT_FIELDS of the user, read from this process,
+    then the shared cache and only then the database. None if there is
+    no such user.
+    """
+    key = _snapshot_key(user_id)
+    snapshot = local_snapshots.get(key)
+    if snapshot is None:
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = (
+                User.objects.filter(id=user_id).values(*USER_SNAPSHOT_FIELDS).first()
+            )
+            if snapshot is None:
+                return None
+            cache.set(key, snapshot, timeout=USER_SNAPSHOT_CACHE_TIMEOUT)
+        local_snapshots.set(key, snapshot)
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id) -> None:
+    """
+    Drop the user's snapshot now and again on commit, so a snapshot read
+    before the change was committed is not kept.
+    """
+    invalidate_user_snapshots([user_id])
+
+
+def invalidate_user_snapshots(user_ids: list) -> None:
+    """invalidate_user_snapshot() of many users, with one cache round trip."""
+    keys = [_snapshot_key(user_id) for user_id in user_ids]
+
+    def drop() -> None:
+        for key in keys:
+            local_snapshots.delete(key)
+        cache.delete_many(keys)
+
+    drop()
+    transaction.on_commit(drop)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication reading users from cached snapshots instead of
+    loading them on every request.
+
+    request.user is a User with only USER_SNAPSHOT_FIELDS loaded; other
+    fields are deferred and read from the database when first accessed.
+    Tokens whose version claim is older than the user's token_version
+    are rejected.
+    """
+
+    def get_user(self, validated_token: Token) -> User:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        # from_db() takes the loaded values in the model's field order
+        fields = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in snapshot
+        ]
+        user = User.from_db("default", fields, [snapshot[field] for field in fields])
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed(
+                _("The token has been revoked."), code="token_revoked"
+            )
+
+        return user
@@ -0,0 +1,64 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from users.models import Customer
+from users.serializers.customers import (
+    CustomerOnboardSerializer,
+    validate_new_customers,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create customers and their users from a CSV file with name, email, "
+        "phone_number, password and membership columns, all or none of them."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="Path of the CSV file.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users and customers inserted per statement.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processes hashing passwords, by default one per core.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            with open(options["path"], newline="") as file:
+                # Empty cells are left out, e.g. for users without a password
+                rows = [
+                    {column: value for column, value in row.items() if value}
+                    for row in csv.DictReader(file)
+                ]
+        except OSError as error:
+            raise CommandError(error)
+
+        serializer = CustomerOnboardSerializer(data=rows, many=True)
+        try:
+            if not serializer.is_valid():
+                raise ValidationError(serializer.errors)
+            validated_data = validate_new_customers(serializer.validated_data)
+        except ValidationError as error:
+            for line, errors in enumerate(error.detail, start=2):
+                if errors:
+                    self.stderr.write(f"Line {line}: {dict(errors)}")
+            raise CommandError("Invalid rows, no customers were created.")
+
+        # Hashed in worker processes, as the import can use every core
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=django.setup
+        ) as executor:
+            customers = Customer.objects.create_customers(
+                validated_data, batch_size=options["batch_size"], executor=executor
+            )
+        self.stdout.write(self.style.SUCCESS(f"Created {len(customers)} customers."))
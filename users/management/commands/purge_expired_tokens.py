@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users.tokens import restore_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted tokens in batches. "
+        "Meant to be run periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of tokens deleted per transaction.",
+        )
+        parser.add_argument(
+            "--restore-blacklist",
+            action="store_true",
+            help=(
+                "Also copy unexpired blacklisted tokens to the cache, "
+                "e.g. after it was flushed."
+            ),
+        )
+
+    def handle(self, *args, **options) -> None:
+        # Short transactions keep locks brief while tokens are being issued
+        expired = OutstandingToken.objects.filter(expires_at__lte=aware_utcnow())
+        purged = 0
+        while ids := list(
+            expired.order_by().values_list("pk", flat=True)[: options["batch_size"]]
+        ):
+            # Blacklist entries of the tokens are deleted with them
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+            purged += len(ids)
+            self.stdout.write(f"Purged {purged} tokens.")
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired tokens."))
+
+        if options["restore_blacklist"]:
+            restored = restore_blacklist()
+            self.stdout.write(
+                self.style.SUCCESS(f"Restored {restored} blacklisted tokens.")
+            )
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0002_alter_customer_options_alter_user_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            "name", config="simple", weight="A"
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "email",
+                            django.db.models.functions.text.Replace(
+                                "email", models.Value("@"), models.Value(" ")
+                            ),
+                            config="simple",
+                            weight="B",
+                        ),
+                        django.contrib.postgres.search.SearchConfig("simple"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "phone_number",
+                        django.db.models.functions.text.Concat(
+                            models.Value("+254"),
+                            django.db.models.functions.text.Right("phone_number", 9),
+                        ),
+                        django.db.models.functions.text.Concat(
+                            models.Value("0"),
+                            django.db.models.functions.text.Right("phone_number", 9),
+                        ),
+                        django.db.models.functions.text.Right("phone_number", 9),
+                        config="simple",
+                        weight="C",
+                    ),
+                    django.contrib.postgres.search.SearchConfig("simple"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="user_search_vector_idx"
+            ),
+        ),
+    ]
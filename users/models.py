@@ -1,21 +1,44 @@
 # Create your models here.
+from concurrent.futures import Executor
 from typing import Any
 
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Replace, Right
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
 from commons.constants import MembershipLevel
 from commons.models import Base
+from users.passwords import bulk_hashing_pool
+from users.signals import users_bulk_updated
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs) -> int:
+        """
+        QuerySet.update() sending users_bulk_updated with the ids of the
+        updated users, so their snapshots (see users.authentication) are
+        dropped as they are on save().
+        """
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.values_list("pk", flat=True))
+            updated = super().update(**kwargs)
+            if user_ids:
+                users_bulk_updated.send(sender=self.model, user_ids=user_ids)
+        return updated
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):  # type: ignore
     def create_user(
         self,
         *,
@@ -40,6 +63,39 @@ class UserManager(BaseUserManager):
 
         return user  # type: ignore
 
+    def create_users(
+        self,
+        users: list[dict],
+        batch_size: int = 1000,
+        executor: Executor | None = None,
+    ) -> list["User"]:
+        """
+        Create many users, each from the `name`, `email`, optional
+        `password` and `phone_number`, and other fields of an entry, with
+        bulk inserts of `batch_size` users.
+
+        Passwords are hashed in parallel on `executor`, by default the bulk
+        hashing pool of users.passwords, which logins do not wait on.
+        Users without a password get an unusable one and have to reset it.
+        Emails and phone numbers are expected to be checked for uniqueness
+        beforehand (see users.validators.find_taken_contacts).
+        """
+        passwords = (executor or bulk_hashing_pool).map(
+            make_password, [user.get("password") for user in users], chunksize=100
+        )
+        objs = [
+            self.model(
+                **{
+                    **user,
+                    "name": user["name"].title(),
+                    "email": self.normalize_email(user["email"]),
+                    "password": password,
+                }
+            )
+            for user, password in zip(users, passwords)
+        ]
+        return self.bulk_create(objs, batch_size=batch_size)
+
     def create_superuser(
         self,
         *,
@@ -76,6 +132,32 @@ class User(AbstractBaseUser, PermissionsMixin, Base):
     is_verified = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Tokens issued before the last bump are rejected (see users.authentication)
+    token_version = models.PositiveIntegerField(default=0)
+    # Kept up to date by the database. Holds the name, the email (whole and
+    # split at "@") and the phone number in its stored, E.164, national and
+    # subscriber forms so prefix searches match however a number is typed.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", config="simple", weight="A")
+            + SearchVector(
+                "email",
+                Replace("email", Value("@"), Value(" ")),
+                config="simple",
+                weight="B",
+            )
+            + SearchVector(
+                "phone_number",
+                Concat(Value("+254"), Right("phone_number", 9)),
+                Concat(Value("0"), Right("phone_number", 9)),
+                Right("phone_number", 9),
+                config="simple",
+                weight="C",
+            )
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     objects = UserManager()
 
@@ -89,8 +171,63 @@ class User(AbstractBaseUser, PermissionsMixin, Base):
     def phone(self) -> str:
         return str(self.phone_number)
 
+    def set_password(self, raw_password: str | None) -> None:
+        super().set_password(raw_password)
+        # Changing the password signs the user out everywhere
+        if not self._state.adding:
+            self.token_version += 1
+
+    def check_password(self, raw_password: str) -> bool:
+        def setter(raw_password: str) -> None:
+            # Rehashing with the preferred hasher is not a password change
+            self.password = make_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return check_password(raw_password, self.password, setter)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            GinIndex(fields=["search_vector"], name="user_search_vector_idx"),
+            # Keyset pages (commons.pagination) scan in (created_at, id) order
+            models.Index(fields=["-created_at", "-id"], name="user_created_id_idx"),
+        ]
+
+
+class CustomerManager(models.Manager):
+    def create_customers(
+        self,
+        customers: list[dict],
+        batch_size: int = 1000,
+        executor: Executor | None = None,
+    ) -> list["Customer"]:
+        """
+        Create many customers and their users in one transaction. Each
+        entry holds the user's fields (see UserManager.create_users) and
+        an optional `membership`.
+        """
+        with transaction.atomic(using=self.db):
+            users = User.objects.db_manager(self.db).create_users(
+                [
+                    {
+                        field: value
+                        for field, value in customer.items()
+                        if field != "membership"
+                    }
+                    for customer in customers
+                ],
+                batch_size=batch_size,
+                executor=executor,
+            )
+            objs = [
+                self.model(
+                    user=user,
+                    membership=customer.get("membership", MembershipLevel.BRONZE.value),
+                )
+                for user, customer in zip(users, customers)
+            ]
+            return self.bulk_create(objs, batch_size=batch_size)
 
 
 class Customer(Base):
@@ -101,10 +238,19 @@ class Customer(Base):
         default=MembershipLevel.BRONZE.value,
     )
 
+    objects = CustomerManager()
+
     class Meta:
         verbose_name = "Customer"
         verbose_name_plural = "Customers"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="customer_created_id_idx"),
+            models.Index(
+                fields=["membership", "-created_at"],
+                name="customer_membership_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.user.email
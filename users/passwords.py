@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from commons.constants import PASSWORD_HASHING_BUCKETS
+from commons.metrics import histogram
+
+# hashlib releases the GIL while hashing, so each thread keeps a core busy.
+# Logins beyond PASSWORD_HASHING_WORKERS queue here instead of slowing
+# down every login in progress.
+hashing_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+# Passwords of bulk onboarding (see User.objects.create_users) are hashed
+# on their own, smaller pool, so an import never queues ahead of logins
+bulk_hashing_pool = ThreadPoolExecutor(
+    max_workers=settings.BULK_PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="bulk-password-hashing",
+)
+
+hashing_seconds = histogram(
+    "leta_password_hashing_seconds",
+    "Time spent hashing the password of a login.",
+    PASSWORD_HASHING_BUCKETS,
+)
+
+
+def verify_password(raw_password: str, encoded: str | None) -> tuple[bool, str | None]:
+    """
+    Whether `raw_password` matches the `encoded` hash, and its new hash if
+    it was hashed with other than the preferred hasher or parameters.
+    """
+    started = time.perf_counter()
+    try:
+        if encoded is None:
+            # Hash anyway, so unknown users take as long as wrong passwords
+            make_password(raw_password)
+            return False, None
+
+        rehashed = []
+        correct = check_password(
+            raw_password,
+            encoded,
+            setter=lambda raw_password: rehashed.append(make_password(raw_password)),
+        )
+        return correct, rehashed[0] if rehashed else None
+    finally:
+        hashing_seconds.observe(time.perf_counter() - started)
+
+
+async def averify_password(
+    raw_password: str, encoded: str | None
+) -> tuple[bool, str | None]:
+    """verify_password() run on the hashing pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hashing_pool, verify_password, raw_password, encoded
+    )
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import invalidate_user_snapshot, invalidate_user_snapshots
+from users.models import User
+from users.signals import users_bulk_updated
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance: User, **kwargs) -> None:
+    # Deactivation, staff and token version changes apply on the next request
+    invalidate_user_snapshot(instance.pk)
+
+
+@receiver(users_bulk_updated, sender=User)
+def invalidate_bulk_updated_users(sender, user_ids: list, **kwargs) -> None:
+    invalidate_user_snapshots(user_ids)
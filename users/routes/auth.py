@@ -1,6 +1,8 @@
 from django.urls import path
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from users.views.auth import TokenObtainPairView
 
 # Extend the schema for the TokenRefreshView
 TokenRefreshView = extend_schema_view(  # type: ignore
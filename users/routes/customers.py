@@ -1,7 +1,9 @@
 from django.urls import path
 
 from users.views.customers import (
+    CustomerBulkCreateView,
     CustomerCreateView,
+    CustomerExportView,
     CustomerListView,
     CustomerRetrieveUpdateView,
 )
@@ -10,6 +12,8 @@ app_name = "customers"
 
 urlpatterns = [
     path("create/", CustomerCreateView.as_view(), name="create"),
+    path("bulk-create/", CustomerBulkCreateView.as_view(), name="bulk-create"),
     path("", CustomerListView.as_view(), name="list"),
+    path("export/", CustomerExportView.as_view(), name="export"),
     path("<str:id>/", CustomerRetrieveUpdateView.as_view(), name="detail"),
 ]
@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from commons.constants import TOKEN_VERSION_CLAIM
+from users.models import User
+from users.tokens import RefreshToken
+
+
+class LoginSerializer(serializers.Serializer):
+    password = jwt_serializers.PasswordField()
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Named after the user model's login field, as in simplejwt
+        self.fields[User.USERNAME_FIELD] = serializers.CharField()
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+    @classmethod
+    def get_token(cls, user: User):
+        """Tokens carry the user's token_version (see users.authentication)."""
+        token = super().get_token(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
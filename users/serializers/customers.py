@@ -1,6 +1,17 @@
+from collections import Counter
+
+from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
-from users.models import Customer
+from commons.constants import (
+    BULK_CUSTOMER_CREATE_LIMIT,
+    BULK_CUSTOMER_PASSWORD_LIMIT,
+    MembershipLevel,
+)
+from commons.errors import ErrorCodes
+from commons.serializers import UserPhoneNumberField
+from users.models import Customer, User
+from users.validators import find_taken_contacts
 
 
 class CustomerCreateSerializer(serializers.ModelSerializer):
@@ -9,6 +20,90 @@ class CustomerCreateSerializer(serializers.ModelSerializer):
         fields = ["user", "membership"]
 
 
+class CustomerOnboardListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        # The phone numbers of the batch are normalized in one pass
+        phone_number_field = self.child.fields["phone_number"]
+        if isinstance(data, list):
+            phone_number_field.normalize_batch(
+                [
+                    str(customer["phone_number"])
+                    for customer in data
+                    if isinstance(customer, dict) and customer.get("phone_number")
+                ]
+            )
+        try:
+            return super().to_internal_value(data)
+        finally:
+            phone_number_field.normalized = {}
+
+
+class CustomerOnboardSerializer(serializers.Serializer):
+    """A customer and their user, see Customer.objects.create_customers."""
+
+    name = serializers.CharField(max_length=20)
+    email = serializers.EmailField()
+    phone_number = UserPhoneNumberField(required=False, allow_null=True)
+    password = serializers.CharField(
+        write_only=True, required=False, validators=[validate_password]
+    )
+    membership = serializers.ChoiceField(
+        choices=[level.value for level in MembershipLevel], required=False
+    )
+
+    class Meta:
+        list_serializer_class = CustomerOnboardListSerializer
+
+
+def validate_new_customers(customers: list[dict]) -> list[dict]:
+    """
+    Normalize the emails of validated CustomerOnboardSerializer data and
+    check they and the phone numbers are unused, with one query in all.
+    """
+    for customer in customers:
+        customer["email"] = User.objects.normalize_email(customer["email"])
+    emails = Counter(customer["email"] for customer in customers)
+    phone_numbers = Counter(
+        customer["phone_number"]
+        for customer in customers
+        if customer.get("phone_number")
+    )
+    taken_emails, taken_phone_numbers = find_taken_contacts(emails, phone_numbers)
+
+    errors = []
+    for customer in customers:
+        customer_errors = {}
+        if customer["email"] in taken_emails:
+            customer_errors["email"] = [ErrorCodes.EMAIL_EXISTS.value]
+        elif emails[customer["email"]] > 1:
+            customer_errors["email"] = [ErrorCodes.DUPLICATE_IN_BATCH.value]
+
+        phone_number = customer.get("phone_number")
+        if phone_number in taken_phone_numbers:
+            customer_errors["phone_number"] = [ErrorCodes.PHONE_NUMBER_EXISTS.value]
+        elif phone_number and phone_numbers[phone_number] > 1:
+            customer_errors["phone_number"] = [ErrorCodes.DUPLICATE_IN_BATCH.value]
+        errors.append(customer_errors)
+
+    if any(errors):
+        raise serializers.ValidationError(errors)
+    return customers
+
+
+class CustomerBulkCreateSerializer(serializers.Serializer):
+    customers = CustomerOnboardSerializer(
+        many=True, allow_empty=False, max_length=BULK_CUSTOMER_CREATE_LIMIT
+    )
+
+    def validate_customers(self, customers: list[dict]) -> list[dict]:
+        # Hashing takes a fraction of a second per password, so long
+        # requests would outlive the worker timeout
+        with_password = sum("password" in customer for customer in customers)
+        if with_password > BULK_CUSTOMER_PASSWORD_LIMIT:
+            raise serializers.ValidationError(ErrorCodes.TOO_MANY_PASSWORDS.value)
+        return validate_new_customers(customers)
+
+
 class CustomerBaseDetailSerializer(serializers.ModelSerializer):
     name = serializers.CharField(source="user.name", read_only=True)
     email = serializers.EmailField(source="user.email", read_only=True)
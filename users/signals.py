@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with `user_ids=[...]` after User.objects.update() changes users
+# with a single UPDATE, bypassing post_save.
+users_bulk_updated = Signal()
@@ -1,8 +1,12 @@
+import os
+from io import StringIO
+from tempfile import NamedTemporaryFile
 from uuid import uuid4
 
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
 from django.db import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from commons.constants import MembershipLevel
 from users.models import Customer, User
@@ -120,6 +124,25 @@ class UserModelTests(TestCase):
         )
         self.assertEqual(str(user), self.user_data["email"])
 
+    def test_password_changes_bump_token_version(self) -> None:
+        """Test changing the password bumps token_version but rehashing does not."""
+        user = User.objects.create_user(**self.user_data)
+        with override_settings(
+            PASSWORD_HASHERS=[
+                "django.contrib.auth.hashers.ScryptPasswordHasher",
+                "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            ]
+        ):
+            self.assertTrue(user.check_password(self.password))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("scrypt$"))
+        self.assertEqual(user.token_version, 0)
+
+        user.set_password(uuid4().hex)
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.token_version, 1)
+
 
 class CustomerModelTests(TestCase):
     def setUp(self) -> None:
@@ -167,3 +190,38 @@ class CustomerModelTests(TestCase):
         """
         customer = Customer.objects.create(user=self.user)
         self.assertEqual(str(customer), self.user.email)
+
+
+class ImportCustomersCommandTests(TestCase):
+    def write_csv(self, content: str) -> str:
+        with NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_import_customers(self) -> None:
+        """Test every row of the file is created as a customer."""
+        path = self.write_csv(
+            "name,email,phone_number,password,membership\n"
+            f"jane,jane@email.com,0712000001,{uuid4().hex},GOLD\n"
+            "john,john@email.com,,,\n"
+        )
+        stdout = StringIO()
+        call_command("import_customers", path, stdout=stdout)
+
+        self.assertIn("Created 2 customers.", stdout.getvalue())
+        customer = Customer.objects.get(user__email="jane@email.com")
+        self.assertEqual(customer.membership, MembershipLevel.GOLD.value)
+        self.assertEqual(str(customer.user.phone_number), "+254712000001")
+        john = User.objects.get(email="john@email.com")
+        self.assertFalse(john.has_usable_password())
+
+    def test_invalid_rows_create_nothing(self) -> None:
+        """Test a file with an invalid row is rejected as a whole."""
+        path = self.write_csv("name,email\njane,jane@email.com\njohn,jane@email.com\n")
+        stderr = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("import_customers", path, stderr=stderr)
+
+        self.assertIn("Line 3", stderr.getvalue())
+        self.assertFalse(User.objects.exists())
@@ -0,0 +1,220 @@
+from io import StringIO
+from uuid import uuid4
+
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from commons.tests.base import UserBaseAPITestCase
+from users.authentication import local_snapshots
+from users.models import User
+from users.passwords import hashing_seconds
+from users.tokens import RefreshToken
+
+
+class CachedJWTAuthenticationTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.staff_user = self.create_staff_user()
+        response = self.client.post(
+            reverse("auth:obtain-token"),
+            {"email": self.staff_email, "password": self.staff_password},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = reverse("categories:list")
+
+    def get_user_queries(self) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if '"users_user"' in query["sql"]
+        ]
+
+    def test_users_are_not_loaded_on_every_request(self) -> None:
+        """Test the user is read from the database once, then from the cache."""
+        self.assertEqual(len(self.get_user_queries()), 1)
+        self.assertEqual(self.get_user_queries(), [])
+
+        # Other processes find the snapshot in the shared cache
+        local_snapshots.delete(f"user-snapshot:{self.staff_user.pk}")
+        self.assertEqual(self.get_user_queries(), [])
+
+    def test_request_user_loads_other_fields_on_access(self) -> None:
+        """Test fields outside the snapshot are still available."""
+        response = self.client.get(
+            reverse("users:detail", kwargs={"id": self.staff_user.id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.staff_email)
+
+    def test_deactivated_users_are_rejected(self) -> None:
+        """Test deactivating a user applies to the next request."""
+        self.get_user_queries()
+        self.staff_user.is_active = False
+        self.staff_user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_users_deactivated_by_update_are_rejected(self) -> None:
+        """Test deactivating users with a queryset update applies immediately."""
+        self.get_user_queries()
+        User.objects.filter(pk=self.staff_user.pk).update(is_active=False)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_changes_apply_immediately(self) -> None:
+        """Test removing staff rights applies to the next request."""
+        self.get_user_queries()
+        self.staff_user.is_staff = False
+        self.staff_user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_password_change_revokes_tokens(self) -> None:
+        """Test tokens issued before a password change are rejected."""
+        self.staff_user.set_password("a-new-password")
+        self.staff_user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenObtainPairViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.create_user()
+        self.url = reverse("auth:obtain-token")
+
+    def login(self, **kwargs):
+        data = {"email": self.email, "password": self.password, **kwargs}
+        return self.client.post(self.url, data)
+
+    def test_login(self) -> None:
+        """Test a token pair is issued and the hashing time recorded."""
+        count = hashing_seconds.as_dict()["count"]
+        response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"refresh", "access"})
+        self.assertEqual(hashing_seconds.as_dict()["count"], count + 1)
+
+    def test_invalid_credentials_are_rejected(self) -> None:
+        """Test wrong passwords, unknown emails and inactive users get 401."""
+        self.assertEqual(
+            self.login(password="wrong").status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.login(email="unknown@email.com").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_failed_logins_send_user_login_failed(self) -> None:
+        """Test failed logins are reported like those of authenticate()."""
+        failures = []
+
+        def receiver(sender, credentials, request, **kwargs) -> None:
+            failures.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(failures, [])
+        self.login(password="wrong")
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0][User.USERNAME_FIELD], self.email)
+        self.assertNotEqual(failures[0]["password"], "wrong")
+
+    def test_passwords_are_rehashed_with_the_preferred_hasher(self) -> None:
+        """Test logging in rehashes the password without revoking tokens."""
+        with override_settings(
+            PASSWORD_HASHERS=[
+                "django.contrib.auth.hashers.ScryptPasswordHasher",
+                "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            ]
+        ):
+            response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertTrue(self.user.check_password(self.password))
+        self.assertEqual(self.user.token_version, 0)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = client.get(reverse("users:detail", kwargs={"id": self.user.id}))
+        self.assertNotEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRefreshViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.create_user()
+        response = self.client.post(
+            reverse("auth:obtain-token"),
+            {"email": self.email, "password": self.password},
+        )
+        self.refresh = response.data["refresh"]
+        self.url = reverse("auth:refresh-token")
+
+    def test_refresh_tokens_are_rotated_once(self) -> None:
+        """Test a refresh token is blacklisted once it has been used."""
+        response = self.client.post(self.url, {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+
+        response = self.client.post(self.url, {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(
+            BlacklistedToken.objects.filter(
+                token__jti=RefreshToken(self.refresh, verify=False)["jti"]
+            ).exists()
+        )
+
+    def test_blacklist_is_checked_in_the_cache(self) -> None:
+        """Test checking a token runs no queries."""
+        with self.assertNumQueries(0):
+            RefreshToken(self.refresh)
+
+    def test_purge_expired_tokens_command(self) -> None:
+        """Test expired tokens are deleted and the blacklist can be restored."""
+        self.client.post(self.url, {"refresh": self.refresh})
+        OutstandingToken.objects.create(
+            jti=uuid4().hex, token="", expires_at=now() - timedelta(days=1)
+        )
+        cache.delete(
+            f"token-blacklist:{RefreshToken(self.refresh, verify=False)['jti']}"
+        )
+
+        stdout = StringIO()
+        call_command(
+            "purge_expired_tokens", batch_size=1, restore_blacklist=True, stdout=stdout
+        )
+
+        self.assertIn("Purged 1 expired tokens.", stdout.getvalue())
+        self.assertIn("Restored 1 blacklisted tokens.", stdout.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        with self.assertRaises(TokenError):
+            RefreshToken(self.refresh)
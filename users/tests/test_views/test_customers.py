@@ -1,10 +1,19 @@
+import json
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from commons.constants import MembershipLevel
+from commons.constants import BULK_CUSTOMER_PASSWORD_LIMIT, MembershipLevel
+from commons.errors import ErrorCodes
+from commons.phone_numbers import normalize_phone_numbers
 from commons.tests.base import UserBaseAPITestCase
-from users.models import Customer
+from users.models import Customer, User
+from users.passwords import hashing_pool
 
 
 class CustomerCreateViewTests(UserBaseAPITestCase):
@@ -48,6 +57,143 @@ class CustomerCreateViewTests(UserBaseAPITestCase):
         self.assertIn("user", response.data)
 
 
+class CustomerBulkCreateViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.url = reverse("customers:bulk-create")
+        self.force_authenticate_staff_user()
+
+    def build_customer(self, index: int, **kwargs) -> dict:
+        return {
+            "name": f"customer {index}",
+            "email": f"customer{index}@Email.com",
+            "phone_number": f"07{index:08d}",
+            "password": uuid4().hex,
+            **kwargs,
+        }
+
+    def test_bulk_create_customers(self) -> None:
+        """Test customers and their users are created, with hashed passwords."""
+        customers = [
+            self.build_customer(1, membership=MembershipLevel.GOLD.value),
+            self.build_customer(2, phone_number=None),
+        ]
+        del customers[1]["password"]
+        response = self.client.post(self.url, {"customers": customers}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["email"], "customer1@email.com")
+        self.assertEqual(response.data[0]["phone_number"], "+254700000001")
+        self.assertEqual(response.data[0]["membership"], MembershipLevel.GOLD.value)
+        self.assertEqual(response.data[1]["membership"], MembershipLevel.BRONZE.value)
+
+        user = User.objects.get(email="customer1@email.com")
+        self.assertEqual(user.name, "Customer 1")
+        self.assertTrue(user.check_password(customers[0]["password"]))
+        self.assertTrue(hasattr(user, "customer"))
+        self.assertFalse(
+            User.objects.get(email="customer2@email.com").has_usable_password()
+        )
+
+    def test_bulk_create_query_count_is_independent_of_size(self) -> None:
+        """Test uniqueness checks and inserts are batched."""
+        query_counts = []
+        for start, size in [(0, 2), (10, 20)]:
+            data = {
+                "customers": [
+                    self.build_customer(index) for index in range(start, start + size)
+                ]
+            }
+            for customer in data["customers"]:
+                del customer["password"]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_phone_numbers_are_normalized_as_a_batch(self) -> None:
+        """Test the phone numbers of a batch are normalized together."""
+        customers = [self.build_customer(index) for index in range(3)]
+        customers.append(self.build_customer(3, phone_number="not a number"))
+        for customer in customers:
+            del customer["password"]
+
+        with (
+            patch(
+                "commons.serializers.normalize_phone_numbers",
+                wraps=normalize_phone_numbers,
+            ) as normalize_batch,
+            patch("commons.serializers.normalize_phone_number") as normalize_one,
+        ):
+            response = self.client.post(
+                self.url, {"customers": customers}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["customers"][3]["phone_number"],
+            [ErrorCodes.INVALID_PHONE_NUMBER.value],
+        )
+        normalize_batch.assert_called_once()
+        normalize_one.assert_not_called()
+
+        del customers[3]
+        response = self.client.post(self.url, {"customers": customers}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[2]["phone_number"], "+254700000002")
+
+    def test_taken_and_repeated_contacts_are_rejected(self) -> None:
+        """Test no customers are created when an email or phone is not unique."""
+        self.create_user()
+        customers = [
+            self.build_customer(1, email=self.email),
+            self.build_customer(2, phone_number=self.phone_number),
+            self.build_customer(3, email="same@email.com"),
+            self.build_customer(4, email="same@email.com"),
+        ]
+        response = self.client.post(self.url, {"customers": customers}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["customers"]
+        self.assertEqual(errors[0]["email"], [ErrorCodes.EMAIL_EXISTS.value])
+        self.assertEqual(
+            errors[1]["phone_number"], [ErrorCodes.PHONE_NUMBER_EXISTS.value]
+        )
+        self.assertEqual(errors[3]["email"], [ErrorCodes.DUPLICATE_IN_BATCH.value])
+        self.assertFalse(Customer.objects.exists())
+
+    def test_passwords_are_not_hashed_on_the_login_pool(self) -> None:
+        """Test bulk hashing does not queue ahead of logins."""
+        with patch.object(hashing_pool, "submit") as submit:
+            response = self.client.post(
+                self.url, {"customers": [self.build_customer(1)]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        submit.assert_not_called()
+
+    def test_too_many_passwords_are_rejected(self) -> None:
+        """Test batches with more passwords than can be hashed in time get 400."""
+        customers = [
+            self.build_customer(index)
+            for index in range(BULK_CUSTOMER_PASSWORD_LIMIT + 1)
+        ]
+        response = self.client.post(self.url, {"customers": customers}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["customers"], [ErrorCodes.TOO_MANY_PASSWORDS.value]
+        )
+
+    def test_non_staff_users_cannot_bulk_create_customers(self) -> None:
+        """Test only staff users can create customers."""
+        self.force_authenticate_user()
+        response = self.client.post(
+            self.url, {"customers": [self.build_customer(1)]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class CustomerListViewTests(UserBaseAPITestCase):
     def setUp(self) -> None:
         self.url = reverse("customers:list")
@@ -65,6 +211,30 @@ class CustomerListViewTests(UserBaseAPITestCase):
         self.assertIn("email", response.data["results"][0])
         self.assertIn("phone_number", response.data["results"][0])
 
+    def test_list_customers_has_no_per_row_queries(self) -> None:
+        """Assert customers and their users are loaded in a fixed number of queries."""
+
+        def add_customers() -> None:
+            for _ in range(3):
+                email = f"{uuid4().hex}@email.com"
+                user = User.objects.create_user(
+                    name="customer", email=email, password=uuid4().hex
+                )
+                Customer.objects.create(user=user)
+
+        self.assertQueryCountIsConstant(self.url, add_customers)
+        self.assertQueryCountIsConstant(self.url, add_customers, cursor="")
+
+    def test_search_customers_by_user_details(self) -> None:
+        """Assert customers are found by their user's email or phone number."""
+        response = self.client.get(self.url, {"search": "0712"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["email"], self.user.email)
+
+        response = self.client.get(self.url, {"search": "nobody"})
+        self.assertEqual(response.data["count"], 0)
+
     def test_non_staff_users_cannot_list_customers(self) -> None:
         """Assert non-staff users cannot list customers."""
         client = APIClient()
@@ -114,3 +284,31 @@ class CustomerRetrieveUpdateViewTests(UserBaseAPITestCase):
         client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
         response = client.get(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CustomerExportViewTests(UserBaseAPITestCase):
+    def setUp(self) -> None:
+        self.url = reverse("customers:export")
+        self.user = self.create_user()
+        self.customer = Customer.objects.create(
+            user=self.user, membership=MembershipLevel.GOLD.value
+        )
+        self.force_authenticate_staff_user()
+
+    def test_export_customers_with_user_details(self) -> None:
+        """Assert customers are exported with their user's contact details."""
+        response = self.client.get(self.url, {"format": "ndjson"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = self.get_streaming_content(response).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        customer = json.loads(lines[0])
+        self.assertEqual(customer["user__email"], self.email)
+        self.assertEqual(customer["user__phone_number"], self.phone_number)
+        self.assertEqual(customer["membership"], MembershipLevel.GOLD.value)
+
+    def test_non_staff_users_cannot_export_customers(self) -> None:
+        """Assert non-staff users cannot export customers."""
+        self.force_authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
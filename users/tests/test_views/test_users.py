@@ -1,3 +1,5 @@
+import base64
+import json
 from uuid import uuid4
 
 from django.urls import reverse
@@ -74,6 +76,110 @@ class UserListViewTests(UserBaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], User.objects.count())
 
+    def test_list_users_has_no_per_row_queries(self) -> None:
+        """Assert users and their groups are loaded in a fixed number of queries."""
+
+        def add_users() -> None:
+            for _ in range(3):
+                User.objects.create_user(
+                    name="user", email=f"{uuid4().hex}@email.com", password="x"
+                )
+
+        self.assertQueryCountIsConstant(self.url, add_users)
+
+    def test_staff_can_page_through_users_with_cursor(self) -> None:
+        """Assert cursor pages cover every user once, newest first."""
+        for index in range(3):
+            User.objects.create_user(
+                name=f"user{index}",
+                email=f"user{index}@email.com",
+                password=uuid4().hex,
+            )
+        expected = list(User.objects.values_list("email", flat=True))
+
+        emails = []
+        url = f"{self.url}?cursor=&page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            emails += [user["email"] for user in response.data["results"]]
+            url = response.data["next"]
+
+            # Users created while paging do not shift the following pages
+            User.objects.create_user(
+                name="late", email=f"late{len(emails)}@email.com", password="x"
+            )
+
+        self.assertEqual(emails, expected)
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [user["email"] for user in previous.data["results"]], expected[2:4]
+        )
+
+    def test_cursor_pagination_approximate_count(self) -> None:
+        """Assert an estimated count is only returned when asked for."""
+        response = self.client.get(self.url, {"cursor": "", "count": "approximate"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data["count"], int)
+
+    def test_search_users_by_prefix(self) -> None:
+        """Assert users are found by name, email or phone number prefixes."""
+        User.objects.create_user(
+            name="mary",
+            email="mary@shop.co.ke",
+            phone_number="0722000111",
+            password=uuid4().hex,
+        )
+
+        def search(term: str) -> list[str]:
+            response = self.client.get(self.url, {"search": term})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [user["email"] for user in response.data["results"]]
+
+        self.assertEqual(search("jo"), ["john@email.com"])
+        self.assertEqual(search("shop.co"), ["mary@shop.co.ke"])
+        self.assertEqual(search("mary@shop"), ["mary@shop.co.ke"])
+        self.assertEqual(search("0722"), ["mary@shop.co.ke"])
+        self.assertEqual(search("+254722"), ["mary@shop.co.ke"])
+        self.assertEqual(search("722000"), ["mary@shop.co.ke"])
+        self.assertEqual(search("mary 0711"), [])
+        self.assertEqual(search("&|!:*"), search(""))
+
+    def test_search_ranks_name_matches_first(self) -> None:
+        """Assert name matches are listed before email matches."""
+        User.objects.create_user(
+            name="peter", email="johnny@email.com", password=uuid4().hex
+        )
+        response = self.client.get(self.url, {"search": "john"})
+        emails = [user["email"] for user in response.data["results"]]
+        self.assertEqual(emails, ["john@email.com", "johnny@email.com"])
+
+    def test_cursor_pages_reject_orderings_other_than_created_at(self) -> None:
+        """Assert cursor pages are not silently reordered by created_at."""
+        response = self.client.get(self.url, {"cursor": "", "search": "john"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", response.data)
+
+        response = self.client.get(self.url, {"cursor": "", "ordering": "created_at"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursors_are_invalid(self) -> None:
+        """Test cursors with a malformed id or a naive date are not found."""
+        for position in [
+            ["2024-01-01T00:00:00+00:00", "abc", False],
+            ["2024-01-01T00:00:00+00:00", 1, False],
+            ["2024-01-01T00:00:00", str(uuid4()), False],
+        ]:
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode())
+            response = self.client.get(self.url, {"cursor": cursor.decode()})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_non_user_can_not_list_users(self) -> None:
         client = APIClient()
         access_token = self.create_access_token(self.user)
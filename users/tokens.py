@@ -0,0 +1,62 @@
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+def _blacklist_key(jti: str) -> str:
+    return f"token-blacklist:{jti}"
+
+
+def blacklist_jti(jti: str, exp: int) -> bool:
+    """
+    Blacklist the token `jti` in the cache until it expires at `exp`
+    (seconds since the epoch). False if it was already blacklisted.
+    """
+    # Expired tokens are rejected anyway, so there is nothing to keep
+    timeout = int(exp - time.time())
+    if timeout <= 0:
+        return True
+    return cache.add(_blacklist_key(jti), True, timeout=timeout)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh tokens checked against a blacklist kept in the cache, so a
+    check is a single lookup however many tokens have been blacklisted.
+
+    Blacklisted tokens are also recorded in the token_blacklist tables,
+    from which the cache can be restored (see the purge_expired_tokens
+    command).
+    """
+
+    def check_blacklist(self) -> None:
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if cache.get(_blacklist_key(jti)):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) -> BlacklistedToken:
+        # Adding the key is atomic, so a refresh token rotated by two
+        # concurrent requests is only accepted once
+        if not blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload["exp"]):
+            raise TokenError(_("Token is blacklisted"))
+        return super().blacklist()
+
+
+def restore_blacklist() -> int:
+    """Blacklist in the cache the unexpired tokens of the token_blacklist tables."""
+    restored = 0
+    rows = OutstandingToken.objects.filter(
+        blacklistedtoken__isnull=False, expires_at__gt=aware_utcnow()
+    ).values_list("jti", "expires_at")
+    for jti, expires_at in rows.iterator():
+        restored += blacklist_jti(jti, expires_at.timestamp())
+    return restored
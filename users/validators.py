@@ -1,3 +1,6 @@
+from collections.abc import Collection
+
+from django.db.models import Q
 from rest_framework import serializers
 
 from commons.errors import ErrorCodes
@@ -8,3 +11,19 @@ class PhoneNumberIsAvailableValidator:
     def __call__(self, phone) -> None:
         if User.objects.filter(phone_number=phone).exists():
             raise serializers.ValidationError(ErrorCodes.PHONE_NUMBER_EXISTS.value)
+
+
+def find_taken_contacts(
+    emails: Collection[str], phone_numbers: Collection[str]
+) -> tuple[set[str], set[str]]:
+    """The given emails and phone numbers already used by users, in one query."""
+    taken = User.objects.filter(
+        Q(email__in=emails) | Q(phone_number__in=phone_numbers)
+    ).values_list("email", "phone_number")
+
+    taken_emails, taken_phone_numbers = set(), set()
+    for email, phone_number in taken:
+        taken_emails.add(email)
+        if phone_number:
+            taken_phone_numbers.add(str(phone_number))
+    return taken_emails, taken_phone_numbers
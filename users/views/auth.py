@@ -0,0 +1,63 @@
+from django.contrib.auth.signals import user_login_failed
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from commons.views import AsyncAPIView, run_query
+from users.models import User
+from users.passwords import averify_password
+from users.serializers.auth import LoginSerializer, TokenObtainPairSerializer
+
+
+class TokenObtainPairView(AsyncAPIView):
+    """
+    Endpoint exchanging an email (User.USERNAME_FIELD) and password for a
+    refresh and access token pair. Passwords are checked on the bounded
+    pool of users.passwords, off the request thread, and rehashed when they
+    were hashed with other than the preferred hasher. Failed logins send
+    user_login_failed; like simplejwt, successful ones send no
+    user_logged_in, so no session is started and last_login is not written.
+    """
+
+    serializer_class = TokenObtainPairSerializer
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get_authenticate_header(self, request) -> str:
+        # Failed logins are answered with 401, as with an authenticator
+        return f'{api_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+
+    async def post(self, request) -> Response:
+        input_serializer = LoginSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        username = input_serializer.validated_data[User.USERNAME_FIELD]
+        password = input_serializer.validated_data["password"]
+
+        user = await run_query(
+            User.objects.filter(**{User.USERNAME_FIELD: username}).first
+        )
+        correct, rehashed = await averify_password(
+            password, user.password if user else None
+        )
+        if not correct or not api_settings.USER_AUTHENTICATION_RULE(user):
+            # As authenticate() does, so lockout and audit receivers see it
+            await user_login_failed.asend(
+                sender=__name__,
+                credentials={User.USERNAME_FIELD: username, "password": "*" * 20},
+                request=request._request,
+            )
+            raise AuthenticationFailed(
+                TokenObtainPairSerializer.default_error_messages["no_active_account"],
+                "no_active_account",
+            )
+
+        if rehashed:
+            user.password = rehashed
+            await run_query(User.objects.filter(pk=user.pk).update, password=rehashed)
+
+        refresh = await run_query(TokenObtainPairSerializer.get_token, user)
+        return Response(
+            {"refresh": str(refresh), "access": str(refresh.access_token)},
+            status=status.HTTP_200_OK,
+        )
@@ -1,11 +1,17 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
+from drf_spectacular.utils import extend_schema
+from rest_framework import filters, status
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from commons.pagination import StandardPageNumberPagination
+from commons.filters import FullTextSearchFilter
+from commons.pagination import PageNumberOrCursorPagination
 from commons.permissions import IsStaffPermission
+from commons.views import ExportView, QueryPlanMixin
 from users.models import Customer
 from users.serializers.customers import (
+    CustomerBulkCreateSerializer,
     CustomerCreateSerializer,
     CustomerListSerializer,
     CustomerRetrieveUpdateSerializer,
@@ -20,27 +26,67 @@ class CustomerCreateView(CreateAPIView):
     permission_classes = [IsStaffPermission]
 
 
-class CustomerListView(ListAPIView):
+class CustomerBulkCreateView(APIView):
+    """Create many customers and their users in one request."""
+
+    permission_classes = [IsStaffPermission]
+
+    @extend_schema(
+        request=CustomerBulkCreateSerializer,
+        responses=CustomerListSerializer(many=True),
+    )
+    def post(self, request) -> Response:
+        input_serializer = CustomerBulkCreateSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        customers = Customer.objects.create_customers(
+            input_serializer.validated_data["customers"]
+        )
+
+        serializer = CustomerListSerializer(customers, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class CustomerListView(QueryPlanMixin, ListAPIView):
     """List customers."""
 
     queryset = Customer.objects.all()
     serializer_class = CustomerListSerializer
     permission_classes = [IsStaffPermission]
-    pagination_class = StandardPageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     filter_backends = [
         DjangoFilterBackend,
+        FullTextSearchFilter,
         filters.OrderingFilter,
-        filters.SearchFilter,
     ]
-    search_fields = ["user__email", "user__phone_number", "membership"]
+    search_vector_field = "user__search_vector"
     filterset_fields = ["membership"]
     ordering_fields = ["created_at"]
 
 
-class CustomerRetrieveUpdateView(RetrieveUpdateAPIView):
+class CustomerRetrieveUpdateView(QueryPlanMixin, RetrieveUpdateAPIView):
     """Retrieve or update a customer."""
 
     lookup_field = "id"
     queryset = Customer.objects.all()
     permission_classes = [IsStaffPermission]
     serializer_class = CustomerRetrieveUpdateSerializer
+
+
+class CustomerExportView(ExportView):
+    """Export customers with their user details as CSV or NDJSON."""
+
+    queryset = Customer.objects.all()
+    permission_classes = [IsStaffPermission]
+    export_name = "customers"
+    export_fields = [
+        "id",
+        "user_id",
+        "user__name",
+        "user__email",
+        "user__phone_number",
+        "membership",
+        "created_at",
+        "updated_at",
+    ]
+    filterset_fields = {"membership": ["exact"], "created_at": ["gte", "lt"]}
@@ -2,8 +2,10 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateAPIView
 
-from commons.pagination import StandardPageNumberPagination
+from commons.filters import FullTextSearchFilter
+from commons.pagination import PageNumberOrCursorPagination
 from commons.permissions import IsStaffOrSelfPermission
+from commons.views import QueryPlanMixin
 from users.models import User
 from users.serializers.users import (
     UserCreateSerializer,
@@ -19,23 +21,23 @@ class UserCreateView(CreateAPIView):
     serializer_class = UserCreateSerializer
 
 
-class UserListView(ListAPIView):
+class UserListView(QueryPlanMixin, ListAPIView):
     "List users."
 
     queryset = User.objects.all()
     serializer_class = UserListSerializer
-    pagination_class = StandardPageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     filter_backends = [
         DjangoFilterBackend,
+        FullTextSearchFilter,
         filters.OrderingFilter,
-        filters.SearchFilter,
     ]
-    search_fields = ["phone_number", "username"]
+    search_vector_field = "search_vector"
     filterset_fields = ["is_active", "is_verified", "is_staff"]
     ordering_fields = ["created_at"]
 
 
-class UserRetrieveUpdateView(RetrieveUpdateAPIView):
+class UserRetrieveUpdateView(QueryPlanMixin, RetrieveUpdateAPIView):
     """Retrieve a user."""
 
     lookup_field = "id"